@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark query-focused context compression.
+Compares prompt size and answer latency with and without sentence-level compression.
+Each query runs through both agents in a random order per round, so model
+warm-up, cache state and Ollama load drift affect both sides alike.
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+import yaml
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.embeddings.vector_store import VectorStore
+from src.agents.rag_agent import AgricultureRAGAgent
+from src.agents.llm_client import AsyncOllamaClient
+from src.agents.context_packer import ContextPacker
+from src.agents.context_compressor import ContextCompressor
+
+TEST_QUERIES = [
+    ("When should I plant maize?", "Gokwe South"),
+    ("What fertilizer rate is recommended for sorghum?", "Binga"),
+    ("How do I control fall armyworm in maize?", None),
+    ("Which drought tolerant crops suit Natural Region IV?", "Mwenezi"),
+    ("What are the main diseases affecting cattle?", "Gwanda"),
+]
+ROUNDS = 3
+SEED = 42
+
+
+async def run_interleaved(agents: dict) -> dict:
+    """Run every test query through each agent, in shuffled order, ROUNDS times."""
+    rng = random.Random(SEED)
+    tokens = {label: [] for label in agents}
+    latencies = {label: [] for label in agents}
+
+    # Untimed warm-up so the first measured call doesn't pay the model load
+    for agent in agents.values():
+        await agent.query(TEST_QUERIES[0][0], include_translations=False)
+
+    for round_index in range(ROUNDS):
+        for query, district in TEST_QUERIES:
+            labels = list(agents)
+            rng.shuffle(labels)
+            for label in labels:
+                start = time.perf_counter()
+                result = await agents[label].query(query, district=district, include_translations=False)
+                latencies[label].append(time.perf_counter() - start)
+                tokens[label].append(result['context_stats']['packed_tokens'])
+                print(f"  [{round_index + 1}/{label:10s}] {query[:45]:45s} "
+                      f"{tokens[label][-1]:5d} tokens {latencies[label][-1]:6.2f}s")
+
+    return {
+        label: {
+            'mean_tokens': statistics.mean(tokens[label]),
+            'mean_latency': statistics.mean(latencies[label]),
+            'p95_latency': sorted(latencies[label])[int(0.95 * (len(latencies[label]) - 1))]
+        }
+        for label in agents
+    }
+
+
+async def main():
+    # Load configuration
+    config_path = Path(__file__).parent.parent / "config" / "config.yaml"
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+
+    vector_db_path = Path(__file__).parent.parent / "data" / "vector_db"
+    vector_store = VectorStore(
+        persist_directory=str(vector_db_path),
+        collection_name=config['vector_store']['collection_name'],
+        embedding_model=config['embeddings']['model_name']
+    )
+    llm_client = AsyncOllamaClient.from_config(config['llm'])
+    context_config = config.get('context', {})
+
+    baseline_agent = AgricultureRAGAgent(
+        vector_store=vector_store,
+        llm_model=config['llm']['model'],
+        llm_client=llm_client,
+        context_packer=ContextPacker.from_config(context_config)
+    )
+    compressed_agent = AgricultureRAGAgent(
+        vector_store=vector_store,
+        llm_model=config['llm']['model'],
+        llm_client=llm_client,
+        context_packer=ContextPacker.from_config(context_config),
+        context_compressor=ContextCompressor.from_config(
+            context_config.get('compression', {}),
+            vector_store.embedding_model
+        )
+    )
+
+    print("=" * 80)
+    print("CONTEXT COMPRESSION BENCHMARK")
+    print("=" * 80)
+
+    results = await run_interleaved({"full": baseline_agent, "compressed": compressed_agent})
+    baseline, compressed = results["full"], results["compressed"]
+    await llm_client.close()
+
+    print("\n" + "=" * 80)
+    print(f"{'':12s} {'prompt tokens':>15s} {'mean latency':>14s} {'p95 latency':>13s}")
+    for label, stats in (("full", baseline), ("compressed", compressed)):
+        print(f"{label:12s} {stats['mean_tokens']:15.0f} {stats['mean_latency']:13.2f}s {stats['p95_latency']:12.2f}s")
+
+    reduction = 1 - compressed['mean_tokens'] / baseline['mean_tokens'] if baseline['mean_tokens'] else 0
+    speedup = baseline['mean_latency'] / compressed['mean_latency'] if compressed['mean_latency'] else 0
+    print(f"\nPrompt-size reduction: {reduction:.0%}  |  Latency speedup: {speedup:.2f}x")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
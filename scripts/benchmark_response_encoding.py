@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark response encoding for the large-payload routes.
+Compares serialization CPU (FastAPI's default jsonable_encoder + json path vs orjson)
+and bytes on the wire (raw, gzip, brotli) for /query, the complete district profile,
+synced data and EVC evidence listings.
+"""
+
+import gzip
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+
+from src.api.responses import brotli, compress, dumps
+
+ROUNDS = 50
+WORDS = ("maize sorghum rainfall fertilizer planting yield district ward farmers hectare "
+         "drought tolerant variety season market price cattle soil region extension").split()
+
+
+def text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def query_payload(rng: random.Random) -> dict:
+    """Shape of a /query response with five 1000-word sources and full metadata."""
+    sources = [
+        {'content': text(rng, 1000), 'metadata': {'source': f'doc_{i}.pdf', 'page': i, 'district': 'Gokwe South'},
+         'score': rng.random()}
+        for i in range(5)
+    ]
+    return {
+        'query': 'When should I plant maize in Gokwe South?',
+        'response': text(rng, 300),
+        'sources': sources,
+        'tool_used': 'vector_search',
+        'geo_context': {'district': 'Gokwe South', 'province': 'Midlands', 'natural_region': 'III'},
+        'citations': {
+            'confidence': 0.82,
+            'citations': [{'id': i, 'source': f'doc_{i}.pdf', 'excerpt': text(rng, 60)} for i in range(5)]
+        },
+        'translations': {'shona': text(rng, 300), 'ndebele': text(rng, 300)},
+        'reconciliation': {'conflicts': [{'claim': text(rng, 20), 'sources': [1, 3]} for _ in range(3)]},
+        'degraded': False
+    }
+
+
+def profile_payload(rng: random.Random) -> dict:
+    """Shape of /api/district/{name}/complete-profile."""
+    return {
+        'district': 'Gokwe South',
+        'basic_info': {'province': 'Midlands', 'natural_region': 'III', 'rainfall': '650-800mm'},
+        'agricultural_profile': {'summary': text(rng, 800), 'main_crops': WORDS[:6]},
+        'markets': [{'name': f'Market {i}', 'prices': {w: rng.uniform(0.2, 900) for w in WORDS}} for i in range(10)],
+        'profitability': [
+            {'crop': w, 'gross_margin': rng.uniform(-200, 1500), 'costs': {c: rng.uniform(5, 300) for c in WORDS[:8]}}
+            for w in WORDS
+        ]
+    }
+
+
+def sync_payload(rng: random.Random) -> dict:
+    """Shape of /api/sync/data/{type} with 500 synced entries."""
+    data = [
+        {'id': f'entry_{i}', 'source': 'ZIMSTAT', 'data_type': 'market_price', 'timestamp': '2025-01-15T10:00:00',
+         'data': {'commodity': rng.choice(WORDS), 'price': rng.uniform(0.2, 900), 'market': 'Mbare Musika'},
+         'verified': bool(i % 2)}
+        for i in range(500)
+    ]
+    return {'data_type': 'market_price', 'count': len(data), 'data': data}
+
+
+def evidence_payload(rng: random.Random) -> dict:
+    """Shape of /api/evc/evidence/status/{status} with 200 evidence records."""
+    evidence = [
+        {'evidence_id': f'ev_{i}', 'claim': text(rng, 40), 'description': text(rng, 150), 'status': 'pending',
+         'submitted_by': f'verifier_{i % 7}', 'reviews': [{'reviewer': 'extension', 'comment': text(rng, 30)}]}
+        for i in range(200)
+    ]
+    return {'status': 'pending', 'count': len(evidence), 'evidence': evidence}
+
+
+def time_ms(func, payload) -> float:
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func(payload)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def default_path(payload) -> bytes:
+    """What FastAPI does for a returned dict: jsonable_encoder, then JSONResponse.render."""
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def main():
+    rng = random.Random(42)
+    payloads = {
+        '/query': query_payload(rng),
+        'complete-profile': profile_payload(rng),
+        'sync/data': sync_payload(rng),
+        'evc/evidence': evidence_payload(rng)
+    }
+
+    print(f"{'Route':<18} {'default ms':>10} {'orjson ms':>10} {'raw KB':>8} {'gzip KB':>8} "
+          f"{'gzip ms':>8} {'br KB':>8} {'br ms':>8}")
+    print("-" * 86)
+    for name, payload in payloads.items():
+        body = dumps(payload)
+        default_ms = time_ms(default_path, payload)
+        orjson_ms = time_ms(dumps, payload)
+        gzip_ms = time_ms(lambda b: gzip.compress(b, compresslevel=6, mtime=0), body)
+        gzip_kb = len(compress(body, 'gzip')) / 1024
+        if brotli is not None:
+            br_ms = f"{time_ms(lambda b: compress(b, 'br'), body):8.2f}"
+            br_kb = f"{len(compress(body, 'br')) / 1024:8.1f}"
+        else:
+            br_ms = br_kb = f"{'n/a':>8}"
+        print(f"{name:<18} {default_ms:10.2f} {orjson_ms:10.2f} {len(body) / 1024:8.1f} {gzip_kb:8.1f} "
+              f"{gzip_ms:8.2f} {br_kb} {br_ms}")
+
+    if brotli is None:
+        print("\nbrotli not installed; responses fall back to gzip")
+
+
+if __name__ == "__main__":
+    main()
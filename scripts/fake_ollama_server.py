@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Stand-in Ollama server for exercising the multi-backend LLM pool locally.
+Serves /api/tags, /api/generate and /api/chat (streaming and non-streaming)
+from FakeLLMBackend, with optional random first-token stalls to test hedging.
+
+Usage:
+    python scripts/fake_ollama_server.py --port 11501
+    python scripts/fake_ollama_server.py --port 11502 --stall-probability 0.2 --stall-ms 3000
+
+Then list the servers under llm.backends in config.yaml.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.agents.llm_backends import FakeLLMBackend
+
+
+def build_app(backend: FakeLLMBackend, stall_probability: float, stall_ms: float) -> web.Application:
+    async def tags(request):
+        return web.json_response({'models': [{'name': 'mistral:latest'}]})
+
+    async def complete(request, chat: bool):
+        body = await request.json()
+        if random.random() < stall_probability:
+            await asyncio.sleep(stall_ms / 1000.0)
+
+        model = body.get('model', '')
+        if chat:
+            prompt = '\n\n'.join(m.get('content', '') for m in body.get('messages', []))
+        else:
+            prompt = body.get('prompt', '')
+
+        def run(on_first_token=None):
+            if chat:
+                return backend.chat(model, body.get('messages', []), on_first_token=on_first_token)
+            return backend.generate(model, prompt, context=body.get('context'), on_first_token=on_first_token)
+
+        if not body.get('stream', True):
+            return web.json_response(await run())
+
+        # Stream: first word when the simulated first token arrives, the rest at the end
+        first_token = asyncio.Event()
+        task = asyncio.ensure_future(run(first_token.set))
+
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        words = backend.complete(prompt).split(' ')
+
+        def chunk(text: str, **extra) -> bytes:
+            piece = {'message': {'role': 'assistant', 'content': text}} if chat else {'response': text}
+            return (json.dumps({'model': model, **piece, **extra}) + '\n').encode('utf-8')
+
+        try:
+            await first_token.wait()
+            await response.write(chunk(words[0], done=False))
+            result = await task
+        finally:
+            # Client went away (e.g. a cancelled hedge); stop the simulated work
+            task.cancel()
+        await response.write(chunk(' ' + ' '.join(words[1:]), done=False))
+        final = {k: v for k, v in result.items() if k not in ('response', 'message', 'model')}
+        await response.write(chunk('', **final))
+        await response.write_eof()
+        return response
+
+    async def generate(request):
+        return await complete(request, chat=False)
+
+    async def chat(request):
+        return await complete(request, chat=True)
+
+    app = web.Application()
+    app.router.add_get('/api/tags', tags)
+    app.router.add_post('/api/generate', generate)
+    app.router.add_post('/api/chat', chat)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Ollama server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11501)
+    parser.add_argument('--tokens-per-second', type=float, default=20.0)
+    parser.add_argument('--prefill-tokens-per-second', type=float, default=400.0)
+    parser.add_argument('--max-concurrency', type=int, default=1)
+    parser.add_argument('--stall-probability', type=float, default=0.0,
+                        help="Chance a request stalls before its first token")
+    parser.add_argument('--stall-ms', type=float, default=2000.0)
+    args = parser.parse_args()
+
+    backend = FakeLLMBackend(
+        tokens_per_second=args.tokens_per_second,
+        prefill_tokens_per_second=args.prefill_tokens_per_second,
+        max_concurrency=args.max_concurrency
+    )
+    print(f"Fake Ollama server on http://{args.host}:{args.port}")
+    web.run_app(build_app(backend, args.stall_probability, args.stall_ms), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Index Zimbabwe District Profiles into Vector Database
 Processes the comprehensive district profiles and adds them to the RAG system.
 """
 
+import asyncio
 import os
 import sys
 import re
@@ -137,11 +138,11 @@ def main():
     
     # Test query
     print("\n🧪 Testing with sample query...")
-    result = agent.query(
+    result = asyncio.run(agent.query(
         user_query="What are the main crops grown in Beitbridge district?",
         district="Beitbridge",
         include_translations=False
-    )
+    ))
     
     print(f"\n📝 Sample Answer:\n{result['response'][:300]}...")
     print(f"\n📊 Retrieved {len(result.get('sources', []))} sources")
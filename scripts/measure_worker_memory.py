@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Measure memory per worker: pre-forked workers sharing the master's preloaded
+services vs. independent single-process servers that each load their own.
+Reports RSS, PSS (shared pages split between the processes mapping them)
+and shared/private memory of every process once the API is ready and a few
+requests have touched the shared data.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.api.prefork import process_memory
+
+PROJECT_ROOT = Path(__file__).parent.parent
+WARM_PATHS = ('/districts', '/markets', '/advisory/districts', '/api/district/Gokwe%20South/complete-profile')
+
+
+def get(port: int, path: str):
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=30) as response:
+        return json.loads(response.read())
+
+
+def wait_ready(port: int, timeout: float) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status = get(port, '/ready')
+            if not status['loading'] and status['startup']['time_to_ready_ms'] is not None:
+                return status
+        except Exception:
+            pass
+        time.sleep(1)
+    raise TimeoutError(f"API on port {port} not ready after {timeout}s")
+
+
+def warm(port: int, rounds: int):
+    """Hit the read-only routes (on every worker, given enough rounds)."""
+    for _ in range(rounds):
+        for path in WARM_PATHS:
+            try:
+                get(port, path)
+            except Exception:
+                pass
+
+
+def children(pid: int) -> list:
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def report(label: str, rows: list) -> float:
+    print(f"\n{label}")
+    print(f"{'process':<12} {'RSS MB':>9} {'PSS MB':>9} {'shared MB':>10} {'private MB':>11}")
+    for name, memory in rows:
+        print(f"{name:<12} {memory.get('rss_mb', 0):9.1f} {memory.get('pss_mb', 0):9.1f} "
+              f"{memory.get('shared_mb', 0):10.1f} {memory.get('private_mb', 0):11.1f}")
+    total = sum(memory.get('pss_mb', 0) for _, memory in rows)
+    print(f"{'total PSS':<12} {total:9.1f}")
+    return total
+
+
+def measure_prefork(workers: int, port: int, timeout: float, rounds: int) -> float:
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'src.api.prefork', '--workers', str(workers), '--port', str(port)],
+        cwd=PROJECT_ROOT
+    )
+    try:
+        wait_ready(port, timeout)
+        warm(port, rounds * workers)
+        time.sleep(1)
+        rows = [('master', process_memory(server.pid))]
+        rows += [(f'worker {i}', process_memory(pid)) for i, pid in enumerate(children(server.pid))]
+        return report(f"Pre-forked: master + {workers} workers", rows)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def measure_single(port: int, timeout: float, rounds: int) -> float:
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'src.api.main:app', '--port', str(port)],
+        cwd=PROJECT_ROOT
+    )
+    try:
+        wait_ready(port, timeout)
+        warm(port, rounds)
+        time.sleep(1)
+        return report("Single process (each extra worker loads its own copy)", [('server', process_memory(server.pid))])
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--timeout', type=float, default=600, help="Seconds to wait for models to load")
+    parser.add_argument('--rounds', type=int, default=5, help="Warm-up passes over the read-only routes")
+    args = parser.parse_args()
+
+    prefork_total = measure_prefork(args.workers, args.port, args.timeout, args.rounds)
+    single_total = measure_single(args.port, args.timeout, args.rounds)
+    print(f"\n{args.workers} independent workers: ~{single_total * args.workers:.0f} MB; "
+          f"pre-forked: {prefork_total:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Two-tier answer cache for the Agriculture RAG Platform.
+Tier 1 matches the exact normalized query key; tier 2 matches recent
+questions for the same district whose embeddings are near-duplicates.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerCache:
+    """LRU answer cache with an embedding-similarity second tier."""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 86400,
+        semantic_threshold: float = 0.95,
+        semantic_max_per_group: int = 200,
+        data_files: Optional[List[str]] = None,
+        data_check_interval: float = 30.0,
+        on_data_change: Optional[Callable[[], None]] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached answers (LRU eviction)
+            ttl_seconds: Answer lifetime
+            semantic_threshold: Minimum cosine similarity for a tier-2 hit
+            semantic_max_per_group: Recent queries kept per district for tier 2
+            data_files: District/geo data files; any change invalidates the cache
+            data_check_interval: Seconds between data file checks
+            on_data_change: Reloads the data files; called before invalidating
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_per_group = semantic_max_per_group
+        self.data_files = [Path(p) for p in (data_files or [])]
+        self.data_check_interval = data_check_interval
+        self.on_data_change = on_data_change
+
+        self._entries: "OrderedDict[Hashable, Dict]" = OrderedDict()
+        # group (key minus query text) -> OrderedDict[key, embedding]
+        self._semantic: Dict[Hashable, "OrderedDict[Hashable, np.ndarray]"] = {}
+        self._data_fingerprint = self._fingerprint()
+        self._last_data_check = time.monotonic()
+
+        self.hits_exact = 0
+        self.hits_semantic = 0
+        self.misses = 0
+        self.saved_llm_seconds = 0.0
+        self.invalidations = 0
+
+    @classmethod
+    def from_config(
+        cls,
+        cache_config: Dict,
+        data_files: Optional[List[str]] = None,
+        on_data_change: Optional[Callable[[], None]] = None
+    ) -> 'AnswerCache':
+        """Build a cache from the `cache` section of config.yaml."""
+        return cls(
+            max_entries=cache_config.get('max_entries', 1000),
+            ttl_seconds=cache_config.get('ttl_seconds', 86400),
+            semantic_threshold=cache_config.get('semantic_threshold', 0.95),
+            semantic_max_per_group=cache_config.get('semantic_max_per_district', 200),
+            data_files=data_files,
+            data_check_interval=cache_config.get('data_check_interval', 30.0),
+            on_data_change=on_data_change
+        )
+
+    def _fingerprint(self) -> Tuple:
+        stamps = []
+        for path in self.data_files:
+            try:
+                stat = os.stat(path)
+                stamps.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append((str(path), None, None))
+        return tuple(stamps)
+
+    def _check_data_files(self):
+        """Invalidate everything if district data changed on disk."""
+        now = time.monotonic()
+        if now - self._last_data_check < self.data_check_interval:
+            return
+        self._last_data_check = now
+        fingerprint = self._fingerprint()
+        if fingerprint != self._data_fingerprint:
+            logger.info("District data changed on disk; invalidating answer cache")
+            self._data_fingerprint = fingerprint
+            if self.on_data_change is not None:
+                # Reload first, or the next answer would be cached from the old data
+                try:
+                    self.on_data_change()
+                except Exception as e:
+                    logger.warning(f"Could not reload district data: {e}")
+            self.invalidate()
+
+    @staticmethod
+    def _group(key: Tuple) -> Tuple:
+        """Semantic group: everything in the key except the query text."""
+        return key[1:]
+
+    def _drop(self, key: Hashable):
+        self._entries.pop(key, None)
+        group = self._semantic.get(self._group(key))
+        if group is not None:
+            group.pop(key, None)
+            if not group:
+                del self._semantic[self._group(key)]
+
+    def _live(self, key: Hashable) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry['stored_at'] > self.ttl_seconds:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get_exact(self, key: Tuple) -> Optional[Dict]:
+        """Tier 1: exact normalized-key lookup."""
+        self._check_data_files()
+        entry = self._live(key)
+        if entry is None:
+            return None
+        self.hits_exact += 1
+        self.saved_llm_seconds += entry['llm_seconds']
+        return entry['result']
+
+    def get_semantic(self, key: Tuple, embedding: List[float]) -> Optional[Dict]:
+        """Tier 2: nearest recent query in the same group above the threshold."""
+        group = self._semantic.get(self._group(key))
+        if group:
+            keys = list(group.keys())
+            matrix = np.stack(list(group.values()))
+            scores = matrix @ np.asarray(embedding, dtype=np.float32)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.semantic_threshold:
+                entry = self._live(keys[best])
+                if entry is not None:
+                    self.hits_semantic += 1
+                    self.saved_llm_seconds += entry['llm_seconds']
+                    logger.info(f"Semantic cache hit (similarity {scores[best]:.3f}): '{entry['result'].get('query')}'")
+                    return entry['result']
+        self.misses += 1
+        return None
+
+    def put(self, key: Tuple, embedding: Optional[List[float]], result: Dict, llm_seconds: float = 0.0):
+        """Store an answer."""
+        self._entries[key] = {
+            'result': result,
+            'llm_seconds': llm_seconds,
+            'stored_at': time.monotonic()
+        }
+        self._entries.move_to_end(key)
+
+        if embedding is not None:
+            group = self._semantic.setdefault(self._group(key), OrderedDict())
+            group[key] = np.asarray(embedding, dtype=np.float32)
+            group.move_to_end(key)
+            while len(group) > self.semantic_max_per_group:
+                group.popitem(last=False)
+
+        while len(self._entries) > self.max_entries:
+            oldest, _ = next(iter(self._entries.items()))
+            self._drop(oldest)
+
+    def invalidate(self, district: Optional[str] = None):
+        """Drop all entries, or only those for one district."""
+        self.invalidations += 1
+        if district is None:
+            self._entries.clear()
+            self._semantic.clear()
+            return
+        district_key = district.strip().lower()
+        for key in [k for k in self._entries if k[1] == district_key]:
+            self._drop(key)
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics."""
+        lookups = self.hits_exact + self.hits_semantic + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits_exact': self.hits_exact,
+            'hits_semantic': self.hits_semantic,
+            'misses': self.misses,
+            'hit_ratio': round((self.hits_exact + self.hits_semantic) / lookups, 4) if lookups else 0.0,
+            'saved_llm_seconds': round(self.saved_llm_seconds, 2),
+            'invalidations': self.invalidations
+        }
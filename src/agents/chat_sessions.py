@@ -0,0 +1,113 @@
+"""
+Server-side chat sessions for the Agriculture RAG Platform.
+Keeps conversation history, the last retrieval and the LLM's context
+state so follow-up turns don't resend or re-process the whole conversation.
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChatSession:
+    """State for one conversation."""
+    session_id: str
+    district: Optional[str] = None
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    history: List[Dict[str, str]] = field(default_factory=list)
+    # Evidence from the last retrieval and the query embedding it was retrieved for
+    retrieval_embedding: Optional[List[float]] = None
+    retrieved_chunks: List[Dict] = field(default_factory=list)
+    # Token state returned by Ollama's /api/generate, resumed on the next turn
+    llm_context: Optional[List[int]] = None
+    # Messages of `history` already folded into a conversation summary
+    summarized_upto: int = 0
+    created_at: float = field(default_factory=time.time)
+    last_active: float = field(default_factory=time.monotonic)
+    turns: int = 0
+    retrievals: int = 0
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def to_dict(self) -> Dict:
+        return {
+            'session_id': self.session_id,
+            'district': self.district,
+            'turns': self.turns,
+            'retrievals': self.retrievals,
+            'history_messages': len(self.history),
+            'has_llm_context': self.llm_context is not None
+        }
+
+
+class ChatSessionStore:
+    """In-memory session store with TTL and LRU eviction."""
+
+    def __init__(self, ttl_seconds: float = 1800, max_sessions: int = 500):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self.created = 0
+        self.expired = 0
+
+    @classmethod
+    def from_config(cls, chat_config: Dict) -> 'ChatSessionStore':
+        """Build a store from the `chat` section of config.yaml."""
+        return cls(
+            ttl_seconds=chat_config.get('session_ttl_seconds', 1800),
+            max_sessions=chat_config.get('max_sessions', 500)
+        )
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        # Sessions are kept in last-active order, so stop at the first live one
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_active <= self.ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self.expired += 1
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """Get a live session and mark it active."""
+        self._evict_expired()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.touch()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def create(
+        self,
+        district: Optional[str] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None
+    ) -> ChatSession:
+        """Create a new session, evicting the least recently used if full."""
+        self._evict_expired()
+        while len(self._sessions) >= self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.expired += 1
+        session = ChatSession(session_id=uuid.uuid4().hex, district=district, lat=lat, lon=lon)
+        self._sessions[session.session_id] = session
+        self.created += 1
+        return session
+
+    def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def get_stats(self) -> Dict:
+        self._evict_expired()
+        return {
+            'active_sessions': len(self._sessions),
+            'created': self.created,
+            'expired': self.expired
+        }
@@ -0,0 +1,103 @@
+"""
+Circuit breaker for LLM calls in the Agriculture RAG Platform.
+After repeated failures the breaker opens and calls fail fast, so a slow or
+down model server does not hold every request until its timeout.
+"""
+
+import time
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures.
+
+    While open, calls are refused for `reset_seconds`; then one trial call
+    is let through (half-open). Its success closes the circuit, its failure
+    re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 30.0):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_seconds: Time the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_started: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_config(cls, breaker_config: Dict) -> 'CircuitBreaker':
+        """Build a breaker from the `llm.circuit_breaker` section of config.yaml."""
+        return cls(
+            failure_threshold=breaker_config.get('failure_threshold', 3),
+            reset_seconds=breaker_config.get('reset_seconds', 30.0)
+        )
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_started = None
+        if self.state == self.HALF_OPEN:
+            now = time.monotonic()
+            # A trial that never reported back (e.g. cancelled) expires after reset_seconds
+            if self._trial_started is not None and now - self._trial_started < self.reset_seconds:
+                self.rejected += 1
+                return False
+            self._trial_started = now
+        return True
+
+    def check(self):
+        """Raise CircuitOpenError if a call may not proceed."""
+        if not self.allow():
+            raise CircuitOpenError("LLM circuit is open")
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("LLM circuit closed")
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._trial_started = None
+
+    def record_failure(self):
+        self._consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(
+                    f"LLM circuit opened after {self._consecutive_failures} consecutive failures; "
+                    f"failing fast for {self.reset_seconds:.0f}s"
+                )
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_started = None
+
+    def get_stats(self) -> Dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self._consecutive_failures,
+            'times_opened': self.times_opened,
+            'rejected': self.rejected
+        }
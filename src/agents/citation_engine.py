@@ -211,17 +211,19 @@ class CitationEngine:
             title = self.extract_document_title(filename, metadata)
             pdf_link = self.get_pdf_link(filename, metadata)
             page = metadata.get('page', None)
+            # Compressed or packed chunks keep the number of their retrieved chunk
+            number = metadata.get('chunk_rank', idx)
             
             # Create citation
             citation = {
-                'number': idx,
+                'number': number,
                 'organization': organization,
                 'title': title,
                 'filename': filename,
                 'pdf_link': pdf_link,
                 'page': page,
                 'display': self._format_citation_display(
-                    idx, organization, title, pdf_link, page
+                    number, organization, title, pdf_link, page
                 ),
                 'relevance_score': source.get('similarity_score', 0.0),
                 'quality_tier': self.calculate_source_quality(organization, metadata)
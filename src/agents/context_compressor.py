@@ -0,0 +1,146 @@
+"""
+Query-focused context compression for the Agriculture RAG Platform.
+Keeps only the sentences of each retrieved chunk that are relevant to the
+question (plus their neighbours) before the prompt is built.
+"""
+
+import re
+from typing import Dict, List
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(])')
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences on terminal punctuation."""
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+
+
+class ContextCompressor:
+    """Scores chunk sentences against the query and keeps the top ones."""
+
+    def __init__(
+        self,
+        embedding_model,
+        top_sentences: int = 12,
+        neighbors: int = 1,
+        min_similarity: float = 0.2,
+        batch_size: int = 64
+    ):
+        """
+        Initialize the compressor.
+
+        Args:
+            embedding_model: SentenceTransformer used by the vector store
+            top_sentences: Sentences to keep across all chunks
+            neighbors: Sentences kept either side of each selected sentence
+            min_similarity: Sentences below this cosine similarity are never selected
+            batch_size: Encode batch size
+        """
+        self.embedding_model = embedding_model
+        self.top_sentences = top_sentences
+        self.neighbors = neighbors
+        self.min_similarity = min_similarity
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_config(cls, compression_config: Dict, embedding_model) -> 'ContextCompressor':
+        """Build a compressor from the `context.compression` section of config.yaml."""
+        return cls(
+            embedding_model=embedding_model,
+            top_sentences=compression_config.get('top_sentences', 12),
+            neighbors=compression_config.get('neighbors', 1),
+            min_similarity=compression_config.get('min_similarity', 0.2)
+        )
+
+    def compress(self, query: str, chunks: List[Dict]) -> Dict:
+        """
+        Compress chunks to their query-relevant sentences.
+
+        Each output chunk keeps its original metadata (source, page, ...)
+        plus 'chunk_rank' so citations still map to the retrieved chunk.
+
+        Returns:
+            Dict with 'chunks' (compressed) and 'stats'
+        """
+        sentences = []
+        owners = []
+        for chunk_idx, chunk in enumerate(chunks):
+            for sent_idx, sentence in enumerate(split_sentences(chunk.get('content', ''))):
+                sentences.append(sentence)
+                owners.append((chunk_idx, sent_idx))
+
+        original_chars = sum(len(c.get('content', '')) for c in chunks)
+        if len(sentences) <= self.top_sentences:
+            return {
+                'chunks': chunks,
+                'stats': {'original_chars': original_chars, 'compressed_chars': original_chars,
+                          'sentences_total': len(sentences), 'sentences_kept': len(sentences)}
+            }
+
+        # One batched encode for the query and every sentence
+        embeddings = self.embedding_model.encode(
+            [query] + sentences,
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        scores = embeddings[1:] @ embeddings[0]
+
+        ranked = np.argsort(-scores)[:self.top_sentences]
+        selected = set()
+        for idx in ranked:
+            if scores[idx] < self.min_similarity:
+                break
+            chunk_idx, sent_idx = owners[idx]
+            for offset in range(-self.neighbors, self.neighbors + 1):
+                selected.add((chunk_idx, sent_idx + offset))
+
+        if not selected:
+            logger.info("No sentence passed the similarity floor; keeping full chunks")
+            return {
+                'chunks': chunks,
+                'stats': {'original_chars': original_chars, 'compressed_chars': original_chars,
+                          'sentences_total': len(sentences), 'sentences_kept': len(sentences)}
+            }
+
+        compressed = []
+        kept = 0
+        seen = set()  # overlapping chunks repeat sentences
+        for chunk_idx, chunk in enumerate(chunks):
+            chunk_sentences = split_sentences(chunk.get('content', ''))
+            parts = []
+            last = None
+            for sent_idx, sentence in enumerate(chunk_sentences):
+                if (chunk_idx, sent_idx) not in selected or sentence in seen:
+                    continue
+                if last is not None and sent_idx != last + 1:
+                    parts.append('...')
+                parts.append(sentence)
+                seen.add(sentence)
+                last = sent_idx
+
+            if not parts:
+                continue
+            kept += sum(1 for p in parts if p != '...')
+            metadata = dict(chunk.get('metadata', {}))
+            # Keep a rank assigned upstream; dropped chunks must not shift the others
+            metadata.setdefault('chunk_rank', chunk_idx + 1)
+            compressed.append({'content': ' '.join(parts), 'metadata': metadata})
+
+        stats = {
+            'original_chars': original_chars,
+            'compressed_chars': sum(len(c['content']) for c in compressed),
+            'sentences_total': len(sentences),
+            'sentences_kept': kept
+        }
+        logger.info(
+            f"Context compressed: {stats['sentences_kept']}/{stats['sentences_total']} sentences, "
+            f"{stats['original_chars']} -> {stats['compressed_chars']} chars"
+        )
+        return {'chunks': compressed, 'stats': stats}
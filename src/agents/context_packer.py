@@ -0,0 +1,265 @@
+"""
+Token-budgeted context packing for the Agriculture RAG Platform.
+Merges overlapping chunks from the same document and fills a prompt
+token budget in relevance order.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken is in requirements.txt
+    tiktoken = None
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken, falling back to a word-based estimate."""
+
+    # Rough tokens-per-word ratio for English agricultural text
+    WORDS_TO_TOKENS = 1.3
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                logger.warning(f"tiktoken encoding '{encoding_name}' unavailable, estimating tokens: {e}")
+
+    def count(self, text: str) -> int:
+        """Count tokens in text."""
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return int(len(text.split()) * self.WORDS_TO_TOKENS)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Truncate text to at most max_tokens tokens."""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            return self.encoding.decode(tokens[:max_tokens])
+        words = text.split()
+        max_words = int(max_tokens / self.WORDS_TO_TOKENS)
+        return ' '.join(words[:max_words])
+
+
+@dataclass
+class PackedContext:
+    """Result of packing retrieved chunks into a token budget."""
+    chunks: List[Dict]
+    original_tokens: int
+    packed_tokens: int
+    merged_spans: int = 0
+    dropped_chunks: int = 0
+    truncated_chunks: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.packed_tokens
+
+    def to_dict(self) -> Dict:
+        return {
+            'original_tokens': self.original_tokens,
+            'packed_tokens': self.packed_tokens,
+            'tokens_saved': self.tokens_saved,
+            'merged_spans': self.merged_spans,
+            'dropped_chunks': self.dropped_chunks,
+            'truncated_chunks': self.truncated_chunks
+        }
+
+
+class ContextPacker:
+    """Packs retrieved chunks into a token budget, deduplicating overlaps."""
+
+    def __init__(
+        self,
+        max_tokens: int = 1500,
+        min_chunk_tokens: int = 64,
+        encoding_name: str = "cl100k_base",
+        min_overlap_words: int = 20
+    ):
+        """
+        Initialize the packer.
+
+        Args:
+            max_tokens: Token budget for all evidence in the prompt
+            min_chunk_tokens: Smallest truncated chunk worth including
+            encoding_name: tiktoken encoding used for counting
+            min_overlap_words: Shortest end/start overlap treated as the
+                ingestion chunk overlap rather than a coincidence
+        """
+        self.max_tokens = max_tokens
+        self.min_chunk_tokens = min_chunk_tokens
+        self.min_overlap_words = max(1, min_overlap_words)
+        self.counter = TokenCounter(encoding_name)
+
+    @classmethod
+    def from_config(cls, context_config: Dict, chunk_overlap: Optional[int] = None) -> 'ContextPacker':
+        """
+        Build a packer from the `context` section of config.yaml.
+
+        `chunk_overlap` is the ingestion overlap in words
+        (embeddings.chunk_overlap); real overlaps are never shorter.
+        """
+        min_overlap_words = context_config.get('min_overlap_words', 20)
+        if chunk_overlap:
+            min_overlap_words = min(min_overlap_words, chunk_overlap)
+        return cls(
+            max_tokens=context_config.get('max_tokens', 1500),
+            min_chunk_tokens=context_config.get('min_chunk_tokens', 64),
+            encoding_name=context_config.get('encoding', 'cl100k_base'),
+            min_overlap_words=min_overlap_words
+        )
+
+    @staticmethod
+    def _source_key(chunk: Dict) -> Optional[str]:
+        metadata = chunk.get('metadata', {})
+        return metadata.get('source') or metadata.get('filename')
+
+    @staticmethod
+    def _adjacent(chunk: Dict, members: List[Dict]) -> bool:
+        """Whether chunk is next to (or the same as) one of a span's chunks in its document."""
+        metadata = chunk.get('metadata', {})
+        for member in members:
+            other = member.get('metadata', {})
+            for field in ('chunk_index', 'page'):
+                if isinstance(metadata.get(field), int) and isinstance(other.get(field), int):
+                    if abs(metadata[field] - other[field]) <= 1:
+                        return True
+                    break
+            else:
+                return True  # no position to compare
+        return False
+
+    @staticmethod
+    def _merge_words(first: List[str], second: List[str], min_overlap: int = 1) -> Optional[List[str]]:
+        """
+        Merge two word sequences if one contains the other or the end of
+        `first` overlaps the start of `second` by at least `min_overlap`
+        words. Returns None otherwise.
+        """
+        if not first or not second:
+            return None
+
+        # Containment
+        n, m = len(first), len(second)
+        if m <= n:
+            head = second[0]
+            for pos in range(n - m + 1):
+                if first[pos] == head and first[pos:pos + m] == second:
+                    return first
+
+        # Suffix of first == prefix of second (chunk_text overlap)
+        head = second[0]
+        for pos in range(max(0, n - m), n - min_overlap + 1):
+            if first[pos] == head and first[pos:] == second[:n - pos]:
+                return first + second[n - pos:]
+        return None
+
+    def _merge_overlaps(self, chunks: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Merge chunks from neighbouring positions in the same document whose
+        text overlaps.
+
+        Merged spans keep the position of their best member. Every output
+        chunk carries 'chunk_rank', its (best member's) 1-based position in
+        the retrieved list, so prompt labels match the citation numbers
+        however many chunks are merged or dropped.
+        """
+        spans: List[Dict] = []
+        merged = 0
+
+        for position, chunk in enumerate(chunks, 1):
+            # Compressed chunks already carry their retrieval rank
+            chunk = dict(chunk, rank=chunk.get('metadata', {}).get('chunk_rank', position))
+            content = chunk.get('content', chunk.get('text', ''))
+            words = content.split()
+            source = self._source_key(chunk)
+            absorbed = False
+
+            if source is not None:
+                for span in spans:
+                    if span['source'] != source or not self._adjacent(chunk, span['members']):
+                        continue
+                    combined = self._merge_words(span['words'], words, self.min_overlap_words)
+                    if combined is None:
+                        combined = self._merge_words(words, span['words'], self.min_overlap_words)
+                    if combined is not None:
+                        span['words'] = combined
+                        span['members'].append(chunk)
+                        merged += 1
+                        absorbed = True
+                        break
+
+            if not absorbed:
+                spans.append({'source': source, 'words': words, 'members': [chunk]})
+
+        packed = []
+        for span in spans:
+            lead = span['members'][0]
+            metadata = dict(lead.get('metadata', {}))
+            metadata['chunk_rank'] = lead['rank']
+            if len(span['members']) > 1:
+                # 'page' stays the lead chunk's page; member pages are listed separately
+                pages = [m.get('metadata', {}).get('page') for m in span['members']]
+                metadata['pages'] = list(dict.fromkeys(p for p in pages if p is not None))
+                metadata['merged_ranks'] = [m['rank'] for m in span['members']]
+                metadata['merged_chunks'] = len(span['members'])
+            packed.append({'content': ' '.join(span['words']), 'metadata': metadata})
+
+        return packed, merged
+
+    def pack(self, chunks: List[Dict], max_tokens: Optional[int] = None) -> PackedContext:
+        """
+        Pack chunks (in relevance order) into the token budget.
+
+        Args:
+            chunks: Retrieved chunks with 'content' and 'metadata'
+            max_tokens: Override the configured budget
+
+        Returns:
+            PackedContext with the chunks to put in the prompt
+        """
+        budget = max_tokens if max_tokens is not None else self.max_tokens
+        original_tokens = sum(
+            self.counter.count(c.get('content', c.get('text', ''))) for c in chunks
+        )
+
+        spans, merged = self._merge_overlaps(chunks)
+
+        packed_chunks = []
+        used = 0
+        dropped = 0
+        truncated = 0
+        for span in spans:
+            tokens = self.counter.count(span['content'])
+            remaining = budget - used
+            if tokens <= remaining:
+                packed_chunks.append(span)
+                used += tokens
+            elif remaining >= self.min_chunk_tokens:
+                span = dict(span, content=self.counter.truncate(span['content'], remaining - 2) + ' ...')
+                packed_chunks.append(span)
+                used += self.counter.count(span['content'])
+                truncated += 1
+            else:
+                dropped += 1
+
+        result = PackedContext(
+            chunks=packed_chunks,
+            original_tokens=original_tokens,
+            packed_tokens=used,
+            merged_spans=merged,
+            dropped_chunks=dropped,
+            truncated_chunks=truncated
+        )
+        logger.info(
+            f"Context packed: {original_tokens} -> {used} tokens "
+            f"({result.tokens_saved} saved, {merged} merged, {dropped} dropped)"
+        )
+        return result
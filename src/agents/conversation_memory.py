@@ -0,0 +1,164 @@
+"""
+Rolling conversation summarization for the Agriculture RAG Platform.
+Keeps chat prompts roughly constant in size by folding older turns into a
+cached memory message, summarized in the background.
+"""
+
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from .context_packer import TokenCounter
+from .llm_scheduler import llm_priority_scope
+from .llm_client import LLMUnavailableError
+
+logger = logging.getLogger(__name__)
+
+MEMORY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+class ConversationCompactor:
+    """Replaces older chat turns with a cached rolling summary.
+
+    Summaries are keyed by a hash of the messages they cover, so a client
+    that resends its full history each turn (REST /chat) hits the same
+    cache entry as a server-side session would.
+    """
+
+    def __init__(
+        self,
+        llm,
+        max_history_tokens: int = 1500,
+        keep_recent_messages: int = 4,
+        max_cached: int = 500,
+        encoding_name: str = "cl100k_base"
+    ):
+        """
+        Initialize the compactor.
+
+        Args:
+            llm: OllamaLLM used to write summaries
+            max_history_tokens: History size that triggers summarization
+            keep_recent_messages: Latest messages always sent verbatim
+            max_cached: Summaries kept (LRU)
+            encoding_name: tiktoken encoding used for counting
+        """
+        self.llm = llm
+        self.max_history_tokens = max_history_tokens
+        self.keep_recent_messages = keep_recent_messages
+        self.max_cached = max_cached
+        self.counter = TokenCounter(encoding_name)
+        # prefix hash -> summary of messages[:k]
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self.summaries_written = 0
+        self.turns_compacted = 0
+
+    @classmethod
+    def from_config(cls, chat_config: Dict, llm) -> 'ConversationCompactor':
+        """Build a compactor from the `chat` section of config.yaml."""
+        return cls(
+            llm=llm,
+            max_history_tokens=chat_config.get('history_token_budget', 1500),
+            keep_recent_messages=chat_config.get('keep_recent_messages', 4)
+        )
+
+    @staticmethod
+    def _prefix_hashes(messages: List[Dict]) -> List[str]:
+        """hashes[k] identifies messages[:k]."""
+        h = hashlib.sha1()
+        hashes = [h.hexdigest()]
+        for message in messages:
+            h.update(message.get('role', '').encode('utf-8') + b'\x00')
+            h.update(message.get('content', '').encode('utf-8') + b'\x01')
+            hashes.append(h.hexdigest())
+        return hashes
+
+    def _tokens(self, messages: List[Dict]) -> int:
+        return sum(self.counter.count(m.get('content', '')) for m in messages)
+
+    def compact(self, messages: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Compact history to fit the token budget.
+
+        Uses the longest cached summary of a prefix of `messages`. If the
+        result is still over budget, schedules a background summary that
+        extends the covered prefix and trims the oldest uncovered messages
+        for this turn only.
+
+        Returns:
+            Tuple of (messages to send, number of original messages covered by the summary)
+        """
+        if self._tokens(messages) <= self.max_history_tokens:
+            return messages, 0
+
+        hashes = self._prefix_hashes(messages)
+        boundary = max(0, len(messages) - self.keep_recent_messages)
+
+        covered = 0
+        summary = None
+        for k in range(boundary, 0, -1):
+            if hashes[k] in self._summaries:
+                covered = k
+                summary = self._summaries[hashes[k]]
+                self._summaries.move_to_end(hashes[k])
+                break
+
+        head = [{'role': 'system', 'content': MEMORY_PREFIX + summary}] if summary else []
+        tail = messages[covered:]
+
+        if self._tokens(head + tail) > self.max_history_tokens and boundary > covered:
+            self._schedule(hashes[boundary], summary, messages[covered:boundary])
+            # Until the summary lands, drop the oldest uncovered turns
+            keep_from = len(tail) - self.keep_recent_messages
+            while keep_from > 0 and self._tokens(head + tail) > self.max_history_tokens:
+                tail = tail[1:]
+                keep_from -= 1
+
+        self.turns_compacted += 1
+        return head + tail, covered
+
+    def _schedule(self, key: str, previous: Optional[str], new_messages: List[Dict]):
+        if key in self._summaries or key in self._pending:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._summarize(key, previous, new_messages))
+        except RuntimeError:
+            return
+        self._pending[key] = task
+        task.add_done_callback(lambda _t: self._pending.pop(key, None))
+
+    async def _summarize(self, key: str, previous: Optional[str], new_messages: List[Dict]):
+        transcript = '\n'.join(f"{m['role'].upper()}: {m['content']}" for m in new_messages)
+        earlier = f"Existing summary:\n{previous}\n\n" if previous else ""
+        prompt = f"""Summarize this conversation between a farmer and an agricultural assistant
+into a compact memory (at most 120 words). Keep the farmer's location, crops, livestock,
+constraints, decisions made and any figures or dates. Drop greetings and repetition.
+
+{earlier}New conversation turns:
+{transcript}
+
+Compact memory:"""
+        try:
+            with llm_priority_scope('background'):
+                summary = await self.llm(prompt)
+        except LLMUnavailableError:
+            logger.warning("Conversation summarization failed; will retry on a later turn")
+            return
+        self._summaries[key] = summary.strip()
+        self._summaries.move_to_end(key)
+        while len(self._summaries) > self.max_cached:
+            self._summaries.popitem(last=False)
+        self.summaries_written += 1
+        logger.info(f"Conversation summary cached ({len(new_messages)} turns folded in)")
+
+    def get_stats(self) -> Dict:
+        return {
+            'cached_summaries': len(self._summaries),
+            'pending_summaries': len(self._pending),
+            'summaries_written': self.summaries_written,
+            'turns_compacted': self.turns_compacted,
+            'max_history_tokens': self.max_history_tokens
+        }
@@ -0,0 +1,159 @@
+"""
+Bounded executors for blocking work in the Agriculture RAG Platform.
+Embedding/search and disk I/O each get their own thread pool with a queue
+limit, so async handlers never block the event loop and overload is
+rejected with a Retry-After hint instead of queueing without bound.
+"""
+
+import asyncio
+import contextvars
+import functools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when an executor's queue is full; the API maps it to 429/503."""
+
+    def __init__(self, pool: str, retry_after: float, status_code: int = 503):
+        super().__init__(f"{pool} executor is saturated; retry after {retry_after:.0f}s")
+        self.pool = pool
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class BoundedExecutor:
+    """Thread pool that admits at most `max_workers + max_queue` jobs."""
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int = 4,
+        max_queue: int = 64,
+        reject_status: int = 503,
+        max_retry_after: float = 30.0
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            name: Pool name (search, io) used in errors and stats
+            max_workers: Threads running jobs at once
+            max_queue: Jobs allowed to wait for a thread; more are rejected
+            reject_status: HTTP status for rejected jobs (429 or 503)
+            max_retry_after: Upper bound on the Retry-After estimate, seconds
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.reject_status = reject_status
+        self.max_retry_after = max_retry_after
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._service_ewma = 0.05
+        self.completed = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+
+    @classmethod
+    def from_config(cls, name: str, pool_config: Dict) -> 'BoundedExecutor':
+        """Build an executor from one entry of the `executors` section of config.yaml."""
+        return cls(
+            name=name,
+            max_workers=pool_config.get('max_workers', 4),
+            max_queue=pool_config.get('max_queue', 64),
+            reject_status=pool_config.get('reject_status', 503),
+            max_retry_after=pool_config.get('max_retry_after', 30.0)
+        )
+
+    def retry_after(self) -> float:
+        """Seconds until the current backlog should have drained."""
+        backlog = max(self._pending - self.max_workers, 0) + 1
+        estimate = backlog * self._service_ewma / self.max_workers
+        return min(max(1.0, math.ceil(estimate)), self.max_retry_after)
+
+    def _execute(self, submitted: float, func: Callable, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        with self._lock:
+            self._wait_total += start - submitted
+            self._running += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self._running -= 1
+                self.completed += 1
+                self._service_ewma = 0.9 * self._service_ewma + 0.1 * seconds
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run `func(*args, **kwargs)` on the pool and await its result.
+
+        Raises:
+            ExecutorSaturatedError: If the pool's queue is full
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturatedError(self.name, self.retry_after(), self.reject_status)
+            self._pending += 1
+
+        # Context vars (e.g. LLM priority) follow the job onto the worker thread
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, self._execute, time.perf_counter(), func, *args, **kwargs)
+        future = self._pool.submit(call)
+        # A job holds its slot until its thread finishes, even if the caller is cancelled
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict:
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'running': self._running,
+            'queued': max(self._pending - self._running, 0),
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'mean_wait_ms': round(self._wait_total / self.completed * 1000, 2) if self.completed else None,
+            'service_ewma_ms': round(self._service_ewma * 1000, 2)
+        }
+
+
+class ExecutorGroup:
+    """The platform's executors: `search` (embedding, vector search) and `io` (file writes)."""
+
+    def __init__(self, search: Optional[BoundedExecutor] = None, io: Optional[BoundedExecutor] = None):
+        self.search = search or BoundedExecutor('search')
+        # One io worker: the JSON stores rewrite whole files and are not thread-safe
+        self.io = io or BoundedExecutor('io', max_workers=1, max_queue=32)
+
+    @classmethod
+    def from_config(cls, executors_config: Dict) -> 'ExecutorGroup':
+        """Build the executors from the `executors` section of config.yaml."""
+        return cls(
+            search=BoundedExecutor.from_config('search', executors_config.get('search', {})),
+            io=BoundedExecutor.from_config('io', executors_config.get('io', {'max_workers': 1, 'max_queue': 32}))
+        )
+
+    def shutdown(self):
+        self.search.shutdown()
+        self.io.shutdown()
+
+    def get_stats(self) -> Dict:
+        return {'search': self.search.get_stats(), 'io': self.io.get_stats()}
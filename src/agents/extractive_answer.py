@@ -0,0 +1,131 @@
+"""
+Extractive fallback answers for the Agriculture RAG Platform.
+When the LLM is slow or down, ranks sentences from the retrieved chunks
+against the question and returns them as a cited bullet summary.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from .context_compressor import split_sentences
+
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r"[a-z0-9]+")
+
+DEGRADED_HEADER = (
+    "The AI assistant is temporarily unavailable, so here are the most relevant "
+    "passages from the knowledge base:"
+)
+DEGRADED_FOOTER = (
+    "This is an automatically extracted summary, not a full answer. "
+    "Please try again shortly or consult your local AGRITEX extension officer."
+)
+
+
+class ExtractiveAnswerer:
+    """Builds a cited bullet summary without calling the LLM."""
+
+    def __init__(
+        self,
+        embedding_model=None,
+        max_bullets: int = 5,
+        max_per_source: int = 2,
+        max_candidates: int = 150,
+        min_words: int = 6,
+        max_words: int = 60
+    ):
+        """
+        Initialize the answerer.
+
+        Args:
+            embedding_model: SentenceTransformer for scoring (word overlap if None)
+            max_bullets: Sentences in the summary
+            max_per_source: Sentences taken from any one chunk
+            max_candidates: Sentences scored at most (keeps latency bounded)
+            min_words: Shorter sentences (headings, fragments) are skipped
+            max_words: Longer sentences (tables, run-ons) are skipped
+        """
+        self.embedding_model = embedding_model
+        self.max_bullets = max_bullets
+        self.max_per_source = max_per_source
+        self.max_candidates = max_candidates
+        self.min_words = min_words
+        self.max_words = max_words
+
+    def _candidates(self, chunks: List[Dict]) -> List[Tuple[int, str]]:
+        seen = set()
+        candidates = []
+        for source_index, chunk in enumerate(chunks, 1):
+            for sentence in split_sentences(chunk.get('content', '')):
+                sentence = ' '.join(sentence.split())
+                words = len(sentence.split())
+                key = sentence.lower()
+                if words < self.min_words or words > self.max_words or key in seen:
+                    continue
+                seen.add(key)
+                candidates.append((source_index, sentence))
+                if len(candidates) >= self.max_candidates:
+                    return candidates
+        return candidates
+
+    def _score(self, question: str, sentences: List[str]) -> np.ndarray:
+        if self.embedding_model is not None:
+            try:
+                embeddings = self.embedding_model.encode(
+                    [question] + sentences,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
+                )
+                return embeddings[1:] @ embeddings[0]
+            except Exception as e:
+                logger.warning(f"Embedding scoring failed, using word overlap: {e}")
+
+        question_words = set(WORD.findall(question.lower()))
+        scores = []
+        for sentence in sentences:
+            words = set(WORD.findall(sentence.lower()))
+            scores.append(len(question_words & words) / (len(words) ** 0.5 or 1.0))
+        return np.asarray(scores, dtype=np.float32)
+
+    def answer(self, question: str, chunks: List[Dict], reason: Optional[str] = None) -> str:
+        """
+        Assemble an extractive answer from retrieved chunks.
+
+        Args:
+            question: User question
+            chunks: Retrieved chunks, in the order they are returned as sources
+            reason: Why the LLM was skipped (logged only)
+
+        Returns:
+            Bullet summary citing (Source N, Page P)
+        """
+        if reason:
+            logger.warning(f"Serving extractive answer: {reason}")
+
+        candidates = self._candidates(chunks)
+        if not candidates:
+            return (
+                "The AI assistant is temporarily unavailable and no matching passages were found "
+                "in the knowledge base. Please try again shortly."
+            )
+
+        scores = self._score(question, [sentence for _, sentence in candidates])
+        per_source: Dict[int, int] = {}
+        bullets = []
+        for i in np.argsort(-scores):
+            source_index, sentence = candidates[int(i)]
+            if scores[i] <= 0 and bullets:
+                break
+            if per_source.get(source_index, 0) >= self.max_per_source:
+                continue
+            per_source[source_index] = per_source.get(source_index, 0) + 1
+            page = chunks[source_index - 1].get('metadata', {}).get('page', 'N/A')
+            bullets.append(f"- {sentence} (Source {source_index}, Page {page})")
+            if len(bullets) >= self.max_bullets:
+                break
+
+        return '\n'.join([DEGRADED_HEADER, ''] + bullets + ['', DEGRADED_FOOTER])
@@ -0,0 +1,313 @@
+"""
+Intent router for the Agriculture RAG Platform.
+Answers structured lookups (prices, weather, rainfall, gross margins) straight
+from the market, weather, geo and profitability engines, so only open-ended
+questions reach retrieval and the LLM.
+"""
+
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Extra surface forms -> canonical names, by entity type
+ALIASES = {
+    'district': {'gokwe': 'Gokwe South', 'darwin': 'Mount Darwin', 'vic falls': 'Hwange', 'victoria falls': 'Hwange'},
+    'market': {'mbare': 'Mbare Musika'},
+    'commodity': {
+        'soya': 'soya_beans', 'soybeans': 'soya_beans', 'soybean': 'soya_beans', 'soya bean': 'soya_beans',
+        'sugar bean': 'sugar_beans', 'beans': 'sugar_beans', 'cattle': 'cattle_live', 'cows': 'cattle_live',
+        'goat': 'goats_live', 'goats': 'goats_live', 'tomato': 'tomatoes', 'onion': 'onions',
+        'groundnut': 'groundnuts', 'peanuts': 'groundnuts'
+    },
+    'crop': {'groundnut': 'groundnuts', 'peanuts': 'groundnuts', 'vegetable': 'vegetables'}
+}
+
+INTENT_PATTERNS = [
+    ('gross_margin', re.compile(r'\b(gross margins?|profit margins?|profitab\w*|how much profit)\b', re.IGNORECASE)),
+    ('price', re.compile(r'\b(prices?|cost of|selling (for|at)|how much (is|are|does|do)|per kg)\b', re.IGNORECASE)),
+    ('rainfall', re.compile(r'\b(rainfall|rain|precipitation)\b', re.IGNORECASE)),
+    ('weather', re.compile(r'\b(weather|forecast|temperature)\b', re.IGNORECASE))
+]
+
+# Questions that need reasoning, not a lookup
+OPEN_ENDED = re.compile(
+    r'\b(why|explain|what causes|how (do|can|should|to)|should i|advice|advise|recommend\w*|best way)\b',
+    re.IGNORECASE
+)
+RECENT_WEATHER = re.compile(r'\b(this week|today|tomorrow|forecast|next \d+ days|coming days|last month|recent(ly)?)\b', re.IGNORECASE)
+
+# Words a pure lookup may contain besides entity names and the intent keyword.
+# Any other word ("varieties", "seed", "grow", "pests") means the question
+# asks for more than the lookup answers, so it goes to retrieval.
+LOOKUP_WORDS = frozenset("""
+    a an the of in at for on to from is are was what what's whats me tell show give get please
+    current currently latest today now average annual typical usual total expected
+    market markets district area region per kg tonne ton ha hectare usd
+    this week tomorrow next coming days last month recent recently
+""".split())
+WORD = re.compile(r"[a-z']+")
+
+
+class EntityMatcher:
+    """One compiled alternation over every known entity name."""
+
+    def __init__(self, names: Dict[str, Dict[str, str]]):
+        """
+        Args:
+            names: entity type -> {surface form: canonical name}
+        """
+        self._lookup: Dict[str, List[Tuple[str, str]]] = {}
+        for entity_type, forms in names.items():
+            for surface, canonical in forms.items():
+                self._lookup.setdefault(surface.lower(), []).append((entity_type, canonical))
+        # Longest first so "gokwe south" wins over "gokwe"
+        alternation = '|'.join(re.escape(s) for s in sorted(self._lookup, key=len, reverse=True))
+        self._pattern = re.compile(r'\b(?:' + alternation + r')\b', re.IGNORECASE)
+
+    def match(self, text: str) -> Dict[str, str]:
+        """First canonical name found per entity type."""
+        found: Dict[str, str] = {}
+        for m in self._pattern.finditer(text):
+            for entity_type, canonical in self._lookup[m.group(0).lower()]:
+                found.setdefault(entity_type, canonical)
+        return found
+
+    def strip(self, text: str) -> str:
+        """`text` with every entity name removed."""
+        return self._pattern.sub(' ', text)
+
+
+class IntentRouter:
+    """Routes price, weather, rainfall and gross margin lookups to structured engines."""
+
+    def __init__(
+        self,
+        geo_context=None,
+        weather_api=None,
+        market_api=None,
+        margin_calculator=None,
+        gross_margins: bool = False
+    ):
+        """
+        Initialize the router. Any engine may be None; its intents then fall through.
+
+        Args:
+            geo_context: GeoContext (district names, rainfall, coordinates)
+            weather_api: WeatherAPI (forecast and recent rainfall)
+            market_api: MarketPricesAPI (markets and commodity prices)
+            margin_calculator: GrossMarginCalculator (crop gross margins)
+            gross_margins: Answer gross margin questions from the calculator. Its
+                sample prices (ZWL/t) and cost templates are not in one currency,
+                so by default these questions go to retrieval instead.
+        """
+        self.geo_context = geo_context
+        self.weather_api = weather_api
+        self.market_api = market_api
+        self.margin_calculator = margin_calculator
+        self.gross_margins = gross_margins
+
+        names: Dict[str, Dict[str, str]] = {t: dict(a) for t, a in ALIASES.items()}
+        if geo_context is not None:
+            for district in geo_context.district_index.values():
+                names['district'][district['name']] = district['name']
+        if market_api is not None:
+            for market_name, market in market_api.data['markets'].items():
+                names['market'][market_name] = market_name
+                for commodity in market['commodities']:
+                    names['commodity'][commodity.replace('_', ' ')] = commodity
+        if margin_calculator is not None:
+            for crop in margin_calculator.COST_TEMPLATES:
+                names['crop'][crop] = crop
+        self.matcher = EntityMatcher(names)
+
+        self.routed: Dict[str, int] = {}
+        self.fallthrough = 0
+
+    def classify(self, query: str) -> Tuple[Optional[str], Dict[str, str]]:
+        """Return (intent or None, matched entities).
+
+        A query has an intent only if it is nothing but entity names, the
+        intent keyword and LOOKUP_WORDS.
+        """
+        entities = self.matcher.match(query)
+        if OPEN_ENDED.search(query):
+            return None, entities
+        for intent, pattern in INTENT_PATTERNS:
+            if pattern.search(query):
+                residue = self.matcher.strip(pattern.sub(' ', RECENT_WEATHER.sub(' ', query)))
+                if any(word not in LOOKUP_WORDS for word in WORD.findall(residue.lower())):
+                    return None, entities
+                return intent, entities
+        return None, entities
+
+    async def route(
+        self,
+        query: str,
+        district: Optional[str] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None
+    ) -> Optional[Dict]:
+        """
+        Answer `query` from structured data if it is a supported lookup.
+
+        Returns:
+            Response dictionary shaped like AgricultureRAGAgent.query, or None
+            if the query should go to retrieval and the LLM
+        """
+        start = time.perf_counter()
+        intent, entities = self.classify(query)
+        if district and 'district' not in entities and self.geo_context is not None:
+            info = self.geo_context.get_district_by_name(district)
+            if info:
+                entities['district'] = info['name']
+
+        answer = None
+        if intent == 'price':
+            answer = self._price(entities)
+        elif intent == 'gross_margin' and self.gross_margins:
+            answer = self._gross_margin(entities)
+        elif intent == 'rainfall' and not RECENT_WEATHER.search(query):
+            answer = self._rainfall(entities)
+        elif intent in ('rainfall', 'weather'):
+            answer = await self._weather(entities, lat, lon)
+
+        if answer is None:
+            self.fallthrough += 1
+            return None
+
+        self.routed[intent] = self.routed.get(intent, 0) + 1
+        response, data, source = answer
+        logger.info(f"Intent router answered '{query}' as {intent} in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return {
+            'query': query,
+            'response': response,
+            'sources': [{'content': source, 'metadata': {'source': source, 'category': intent}}],
+            'citations': None,
+            'translations': None,
+            'reconciliation': None,
+            'tool_used': f'intent_router:{intent}',
+            'geo_context': self._geo_context(entities.get('district')),
+            'intent': {'name': intent, 'entities': entities},
+            'data': data,
+            'degraded': False
+        }
+
+    def _geo_context(self, district: Optional[str]) -> Optional[Dict]:
+        """Geographic context in the shape the RAG agent returns (GeoContext.format_context)."""
+        if self.geo_context is None or not district:
+            return None
+        info = self.geo_context.get_district_by_name(district)
+        return self.geo_context.format_context(info) if info else None
+
+    def _price(self, entities: Dict[str, str]) -> Optional[Tuple[str, Dict, str]]:
+        if self.market_api is None or 'commodity' not in entities:
+            return None
+        commodity = entities['commodity']
+        label = commodity.replace('_live', '').replace('_', ' ')
+        currency = self.market_api.data['currency']
+        source = f"Market price data (last updated {self.market_api.data['last_updated']})"
+
+        market = None
+        if 'market' in entities:
+            market = self.market_api.get_market_prices(entities['market'])
+        elif 'district' in entities:
+            market = self.market_api.get_district_prices(entities['district'])
+
+        trend = self.market_api.data['price_trends'].get(commodity, {})
+        trend_text = f" Trend: {trend['trend']} ({trend.get('change_30d', 'n/a')} over 30 days)." if trend else ""
+
+        if market and commodity in market['commodities']:
+            price = market['commodities'][commodity]
+            note = f" {market['note']}." if market.get('note') else ""
+            text = (
+                f"{label.capitalize()} at {market['market']} ({market['district']}): "
+                f"{currency} {price['price_per_kg']:.2f}/{price['unit']}, {price['availability']} availability."
+                f"{trend_text}{note}"
+            )
+            return text, {'market': market['market'], 'commodity': commodity, 'currency': currency, **price, 'trend': trend}, source
+
+        comparison = self.market_api.get_commodity_comparison(commodity)
+        if not comparison['all_markets']:
+            return None
+        prefix = f"{label.capitalize()} is not traded at {market['market']}. " if market else ""
+        text = (
+            f"{prefix}{label.capitalize()} averages {currency} {comparison['average_price']:.2f}/kg across "
+            f"{len(comparison['all_markets'])} markets: lowest at {comparison['lowest_price']['market']} "
+            f"({comparison['lowest_price']['price']:.2f}), highest at {comparison['highest_price']['market']} "
+            f"({comparison['highest_price']['price']:.2f}).{trend_text}"
+        )
+        return text, comparison, source
+
+    def _gross_margin(self, entities: Dict[str, str]) -> Optional[Tuple[str, Dict, str]]:
+        if self.margin_calculator is None or 'crop' not in entities or 'district' not in entities:
+            return None
+        crop, district = entities['crop'], entities['district']
+        if not self.margin_calculator.YIELD_BY_DISTRICT.get(district, {}).get(crop):
+            # No yield data: a zero-yield margin would mislead, let the LLM answer
+            return None
+        margin = self.margin_calculator.calculate_margin(crop, district).to_dict()
+        text = (
+            f"Indicative gross margin for {crop} in {district} (sample model): {margin['gross_margin']:,.2f} per hectare "
+            f"({margin['profit_margin_percentage']:.1f}% of income). "
+            f"Yield {margin['yield_tonnes_per_ha']} t/ha at {margin['price_per_tonne']:,.0f} per tonne gives "
+            f"gross income {margin['gross_income']:,.2f}; variable costs total {margin['total_variable_costs']:,.2f}."
+        )
+        return text, margin, "Gross margin model (default district yields and cost templates)"
+
+    def _rainfall(self, entities: Dict[str, str]) -> Optional[Tuple[str, Dict, str]]:
+        if self.geo_context is None or 'district' not in entities:
+            return None
+        info = self.geo_context.get_district_by_name(entities['district'])
+        if not info:
+            return None
+        text = (
+            f"{info['name']} ({info['province']}) is in Natural {info['region']} "
+            f"with average annual rainfall of {info['rainfall']}."
+        )
+        region = self.geo_context.get_region_info(info['region'])
+        if region and region.get('farming_system'):
+            text += f" Farming system: {region['farming_system']}."
+        return text, {'district': info['name'], 'region': info['region'], 'rainfall': info['rainfall']}, "District geographic profile"
+
+    async def _weather(
+        self,
+        entities: Dict[str, str],
+        lat: Optional[float],
+        lon: Optional[float]
+    ) -> Optional[Tuple[str, Dict, str]]:
+        if self.weather_api is None:
+            return None
+        place = None
+        if 'district' in entities and self.geo_context is not None:
+            info = self.geo_context.get_district_by_name(entities['district'])
+            if info:
+                lat, lon = info['coordinates']['lat'], info['coordinates']['lon']
+                place = info['name']
+        if lat is None or lon is None:
+            return None
+
+        summary = await self.weather_api.get_agricultural_summary(lat, lon)
+        if not summary:
+            return None
+        current = summary['current']
+        forecast = summary['forecast_7day']
+        text = (
+            f"Weather{' in ' + place if place else ''}: {current['description']}, {current['temperature']}°C, "
+            f"humidity {current['humidity']}%. Next 7 days: {forecast['total_rain_mm']} mm of rain over "
+            f"{forecast['rainy_days']} rainy days. Last 30 days: {summary['historical_30day']['total_rain_mm']} mm."
+        )
+        if summary['agricultural_insights']:
+            text += ' ' + ' '.join(summary['agricultural_insights'])
+        return text, summary, "Open-Meteo weather data"
+
+    def get_stats(self) -> Dict:
+        routed = sum(self.routed.values())
+        total = routed + self.fallthrough
+        return {
+            'routed': dict(self.routed),
+            'fallthrough': self.fallthrough,
+            'routed_ratio': round(routed / total, 4) if total else 0.0
+        }
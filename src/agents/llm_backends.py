@@ -0,0 +1,278 @@
+"""
+Pluggable LLM backends for the Agriculture RAG Platform.
+Defines the backend protocol used by the agents and translation packages,
+an Ollama implementation and a deterministic stand-in for load tests.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from typing import Callable, Dict, List, Optional, Any, Protocol, runtime_checkable
+import logging
+
+from .llm_client import AsyncOllamaClient, LLMTimeoutError
+from .llm_pool import LLMBackendPool
+from .llm_scheduler import LLMScheduler
+from .llm_session import LLMSessionManager
+
+logger = logging.getLogger(__name__)
+
+
+@runtime_checkable
+class LLMBackend(Protocol):
+    """Interface every LLM backend implements.
+
+    Responses use Ollama's response shape ('response' for generate,
+    'message' for chat, plus 'eval_count' / 'eval_duration' etc.) so callers
+    do not care which backend served them.
+    """
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        ...
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        ...
+
+    async def close(self):
+        ...
+
+    async def health_check(self) -> bool:
+        ...
+
+    def get_stats(self) -> Dict:
+        ...
+
+
+class FakeLLMBackend:
+    """Deterministic LLM stand-in with simulated latency and token rate.
+
+    Completions are picked from `responses` (first pattern found in the
+    prompt wins) or rendered from `template`. Latency follows a simple CPU
+    model: fixed overhead + prompt tokens / prefill rate + output tokens /
+    generation rate, with calls serialised through `max_concurrency` slots.
+    """
+
+    DEFAULT_TEMPLATE = (
+        "Based on the evidence provided, here is guidance on: {question}\n\n"
+        "1. Follow the recommendations for your natural region (Source 1, Page N/A).\n"
+        "2. Plant with the first effective rains and use certified seed (Source 2, Page N/A).\n"
+        "3. Consult your local AGRITEX extension officer for field-specific advice."
+    )
+
+    def __init__(
+        self,
+        responses: Optional[Dict[str, str]] = None,
+        template: Optional[str] = None,
+        base_latency_ms: float = 50.0,
+        prefill_tokens_per_second: float = 400.0,
+        tokens_per_second: float = 20.0,
+        max_concurrency: int = 1,
+        time_scale: float = 1.0,
+        load_ms: float = 0.0
+    ):
+        """
+        Initialize the fake backend.
+
+        Args:
+            responses: Map of regex pattern -> canned completion
+            template: Completion template; may use {question}, {prompt_tokens}, {digest}
+            base_latency_ms: Fixed per-call overhead
+            prefill_tokens_per_second: Simulated prompt processing rate
+            tokens_per_second: Simulated generation rate
+            max_concurrency: Calls the simulated server runs at once
+            time_scale: Multiplier on all simulated delays (0 disables sleeping)
+            load_ms: Simulated model load time paid by the first call
+        """
+        self.responses = [(re.compile(p, re.IGNORECASE), r) for p, r in (responses or {}).items()]
+        self.template = template or self.DEFAULT_TEMPLATE
+        self.base_latency_ms = base_latency_ms
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.tokens_per_second = tokens_per_second
+        self.max_concurrency = max_concurrency
+        self.time_scale = time_scale
+        self.load_ms = load_ms
+        self._loaded = False
+        self._semaphore = None
+        self.in_flight = 0
+        self.calls = 0
+
+    @classmethod
+    def from_config(cls, fake_config: Dict) -> 'FakeLLMBackend':
+        """Build a fake backend from the `llm.fake` section of config.yaml."""
+        return cls(
+            responses=fake_config.get('responses'),
+            template=fake_config.get('template'),
+            base_latency_ms=fake_config.get('base_latency_ms', 50.0),
+            prefill_tokens_per_second=fake_config.get('prefill_tokens_per_second', 400.0),
+            tokens_per_second=fake_config.get('tokens_per_second', 20.0),
+            max_concurrency=fake_config.get('max_concurrency', 1),
+            time_scale=fake_config.get('time_scale', 1.0),
+            load_ms=fake_config.get('load_ms', 0.0)
+        )
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @staticmethod
+    def _count_tokens(text: str) -> int:
+        return max(1, int(len(text.split()) * 1.3))
+
+    @staticmethod
+    def _extract_question(prompt: str) -> str:
+        """Pull the user question out of an AgriEvidence prompt, else the last line."""
+        match = re.search(r'\[USER QUESTION\]\s*\n(.+?)(?:\n\n|$)', prompt, re.DOTALL)
+        if match:
+            return match.group(1).strip()
+        lines = [line for line in prompt.strip().splitlines() if line.strip()]
+        return lines[-1][:200] if lines else ''
+
+    def complete(self, prompt: str) -> str:
+        """Completion text returned for `prompt`."""
+        for pattern, response in self.responses:
+            if pattern.search(prompt):
+                return response
+        return self.template.format(
+            question=self._extract_question(prompt),
+            prompt_tokens=self._count_tokens(prompt),
+            digest=hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]
+        )
+
+    async def _simulate(
+        self,
+        model: str,
+        prompt: str,
+        timeout: Optional[float],
+        on_first_token: Optional[Callable[[], None]] = None,
+        on_dispatch: Optional[Callable[[], None]] = None
+    ) -> Dict:
+        # Like Ollama, an empty prompt only loads the model
+        completion = self.complete(prompt) if prompt.strip() else ''
+        prompt_tokens = self._count_tokens(prompt) if prompt.strip() else 0
+        eval_tokens = self._count_tokens(completion) if completion else 0
+        prefill_s = prompt_tokens / self.prefill_tokens_per_second
+        eval_s = eval_tokens / self.tokens_per_second
+        load_s = 0.0 if self._loaded else self.load_ms / 1000.0
+        self._loaded = True
+        first_token_delay = (load_s + self.base_latency_ms / 1000.0 + prefill_s) * self.time_scale
+
+        async def _call():
+            async with self._get_semaphore():
+                if on_dispatch is not None:
+                    on_dispatch()
+                self.in_flight += 1
+                self.calls += 1
+                try:
+                    if first_token_delay > 0:
+                        await asyncio.sleep(first_token_delay)
+                    if on_first_token is not None:
+                        on_first_token()
+                    if eval_s * self.time_scale > 0:
+                        await asyncio.sleep(eval_s * self.time_scale)
+                finally:
+                    self.in_flight -= 1
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(_call(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise LLMTimeoutError(f"Fake LLM call exceeded {timeout:.1f}s")
+        total_ns = int((time.perf_counter() - start) * 1e9)
+
+        return {
+            'model': model,
+            'done': True,
+            'completion': completion,
+            'load_duration': int(load_s * self.time_scale * 1e9),
+            'prompt_eval_count': prompt_tokens,
+            'prompt_eval_duration': int(prefill_s * self.time_scale * 1e9),
+            'eval_count': eval_tokens,
+            'eval_duration': int(eval_s * self.time_scale * 1e9),
+            'total_duration': total_ns
+        }
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        result = await self._simulate(
+            model, prompt, timeout, kwargs.get('on_first_token'), kwargs.get('on_dispatch')
+        )
+        result['response'] = result.pop('completion')
+        # Mimic Ollama's token state so callers can resume conversations
+        context = list(kwargs.get('context') or [])
+        result['context'] = context + [0] * (result['prompt_eval_count'] + result['eval_count'])
+        return result
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        prompt = '\n\n'.join(m.get('content', '') for m in messages)
+        result = await self._simulate(
+            model, prompt, timeout, kwargs.get('on_first_token'), kwargs.get('on_dispatch')
+        )
+        result['message'] = {'role': 'assistant', 'content': result.pop('completion')}
+        return result
+
+    async def close(self):
+        pass
+
+    async def health_check(self) -> bool:
+        return True
+
+    def get_stats(self) -> Dict:
+        return {
+            'backend': 'fake',
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'calls': self.calls
+        }
+
+
+def create_llm_backend(llm_config: Dict) -> LLMBackend:
+    """
+    Create the LLM backend named by `llm.provider` in config.yaml.
+
+    Supported providers: 'ollama' (default) and 'fake'. If `llm.backends`
+    lists several Ollama servers they are load-balanced as one pool. The backend is
+    wrapped in an LLMScheduler so every call is queued by priority, and in an
+    LLMSessionManager that sets num_ctx / keep_alive and handles warm-up.
+    """
+    provider = llm_config.get('provider', 'ollama')
+
+    if provider == 'ollama' and llm_config.get('backends'):
+        backend = LLMBackendPool.from_config(llm_config)
+    elif provider == 'ollama':
+        backend = AsyncOllamaClient.from_config(llm_config)
+    elif provider == 'fake':
+        logger.info("Using fake LLM backend (no model server)")
+        backend = FakeLLMBackend.from_config(llm_config.get('fake', {}))
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider}. Valid providers are: ollama, fake")
+
+    return LLMSessionManager.from_config(LLMScheduler.from_config(backend, llm_config), llm_config)
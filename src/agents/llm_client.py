@@ -0,0 +1,211 @@
+"""
+Async LLM client for the Agriculture RAG Platform.
+Talks to the Ollama REST API over a pooled aiohttp session so LLM calls
+never block the FastAPI event loop.
+"""
+
+import asyncio
+import json
+from typing import Callable, Dict, List, Optional, Any
+import logging
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class LLMTimeoutError(Exception):
+    """Raised when an LLM call exceeds its deadline."""
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the LLM cannot answer (deadline, failure, overload or open circuit)."""
+
+
+class AsyncOllamaClient:
+    """Pooled, concurrency-limited async client for an Ollama server."""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        max_concurrency: int = 2,
+        pool_size: int = 10,
+        timeout: float = 120.0
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Ollama server URL
+            max_concurrency: Maximum LLM calls in flight at once
+            pool_size: Maximum pooled HTTP connections to the server
+            timeout: Default per-call timeout in seconds
+        """
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = None
+        self._semaphore = None
+        self.in_flight = 0
+
+    @classmethod
+    def from_config(cls, llm_config: Dict) -> 'AsyncOllamaClient':
+        """Build a client from the `llm` section of config.yaml."""
+        return cls(
+            base_url=llm_config.get('base_url', 'http://localhost:11434'),
+            max_concurrency=llm_config.get('max_concurrency', 2),
+            pool_size=llm_config.get('pool_size', 10),
+            timeout=llm_config.get('timeout', 120.0)
+        )
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get or create the pooled aiohttp session."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(base_url=self.base_url, connector=connector)
+        return self.session
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get or create the in-flight limiter."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def close(self):
+        """Close the aiohttp session."""
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+    async def health_check(self, timeout: float = 5.0) -> bool:
+        """Return True if the server answers /api/tags."""
+        try:
+            session = await self._get_session()
+            async with session.get('/api/tags', timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    @staticmethod
+    async def _read_stream(response, on_first_token: Optional[Callable[[], None]]) -> Dict:
+        """Collect a streamed (NDJSON) Ollama response into one response dict."""
+        parts = []
+        final = {}
+        async for line in response.content:
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            if 'error' in chunk:
+                raise RuntimeError(f"Ollama stream error: {chunk['error']}")
+            text = chunk['response'] if 'response' in chunk else chunk.get('message', {}).get('content', '')
+            if text:
+                if not parts and on_first_token is not None:
+                    on_first_token()
+                parts.append(text)
+            if chunk.get('done'):
+                final = chunk
+
+        result = dict(final)
+        if 'message' in result:
+            result['message'] = {'role': 'assistant', 'content': ''.join(parts)}
+        else:
+            result['response'] = ''.join(parts)
+        return result
+
+    async def _post(
+        self,
+        path: str,
+        payload: Dict,
+        timeout: Optional[float],
+        on_first_token: Optional[Callable[[], None]] = None
+    ) -> Dict:
+        """POST a request, holding an in-flight slot.
+
+        With `on_first_token` the response is streamed and the callback
+        fires when the first token arrives.
+        """
+        deadline = timeout if timeout is not None else self.timeout
+        payload['stream'] = on_first_token is not None
+
+        async def _call():
+            async with self._get_semaphore():
+                self.in_flight += 1
+                try:
+                    session = await self._get_session()
+                    async with session.post(path, json=payload) as response:
+                        if response.status != 200:
+                            body = await response.text()
+                            raise RuntimeError(f"Ollama returned {response.status}: {body[:200]}")
+                        if payload['stream']:
+                            return await self._read_stream(response, on_first_token)
+                        return await response.json()
+                finally:
+                    self.in_flight -= 1
+
+        try:
+            return await asyncio.wait_for(_call(), timeout=deadline)
+        except asyncio.TimeoutError:
+            raise LLMTimeoutError(f"LLM call to {self.base_url}{path} exceeded {deadline:.1f}s")
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        """
+        Call /api/generate.
+
+        Pass `on_first_token=callback` to stream the response and be
+        notified when generation starts. `on_dispatch` is called as the
+        request is sent (the client has no queue of its own).
+
+        Returns:
+            Raw Ollama response dict ('response', 'eval_count', ...)
+        """
+        on_first_token = kwargs.pop('on_first_token', None)
+        on_dispatch = kwargs.pop('on_dispatch', None)
+        if on_dispatch is not None:
+            on_dispatch()
+        payload = {'model': model, 'prompt': prompt}
+        if options:
+            payload['options'] = options
+        payload.update(kwargs)
+        return await self._post('/api/generate', payload, timeout, on_first_token)
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        """
+        Call /api/chat.
+
+        Returns:
+            Raw Ollama response dict ('message', 'eval_count', ...)
+        """
+        on_first_token = kwargs.pop('on_first_token', None)
+        on_dispatch = kwargs.pop('on_dispatch', None)
+        if on_dispatch is not None:
+            on_dispatch()
+        payload = {'model': model, 'messages': messages}
+        if options:
+            payload['options'] = options
+        payload.update(kwargs)
+        return await self._post('/api/chat', payload, timeout, on_first_token)
+
+    def get_stats(self) -> Dict:
+        """Get current client statistics."""
+        return {
+            'backend': 'ollama',
+            'base_url': self.base_url,
+            'max_concurrency': self.max_concurrency,
+            'in_flight': self.in_flight,
+            'pool_size': self.pool_size,
+            'timeout': self.timeout
+        }
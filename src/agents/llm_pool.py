@@ -0,0 +1,234 @@
+"""
+Multi-server LLM pool for the Agriculture RAG Platform.
+Spreads LLM calls across several Ollama servers with health checks,
+least-outstanding-requests routing and optional hedged requests.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+import logging
+
+from .llm_client import AsyncOllamaClient, LLMTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackendPool:
+    """Routes each call to the healthy backend with the fewest calls outstanding.
+
+    With `hedge_after_ms` set, a call that has not produced its first token
+    within that time is also sent to a second backend; whichever starts
+    generating first wins and the other is cancelled.
+    """
+
+    def __init__(
+        self,
+        backends: List,
+        health_check_interval: float = 10.0,
+        hedge_after_ms: Optional[float] = None
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            backends: LLMBackend instances, one per server
+            health_check_interval: Seconds between health checks (0 disables)
+            hedge_after_ms: First-token delay that triggers a hedged request (None disables)
+        """
+        if not backends:
+            raise ValueError("LLMBackendPool needs at least one backend")
+        self.backends = backends
+        self.health_check_interval = health_check_interval
+        self.hedge_after_ms = hedge_after_ms
+        self.max_concurrency = sum(getattr(b, 'max_concurrency', 1) for b in backends)
+
+        self._outstanding = [0] * len(backends)
+        self._healthy = [True] * len(backends)
+        self._served = [0] * len(backends)
+        self._failures = [0] * len(backends)
+        self._health_task = None
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_config(cls, llm_config: Dict) -> 'LLMBackendPool':
+        """Build a pool from `llm.backends` in config.yaml.
+
+        Each entry is a URL or a dict with `base_url` and optional
+        `max_concurrency` / `pool_size` / `timeout` overriding the `llm` defaults.
+        """
+        backends = []
+        for entry in llm_config['backends']:
+            if isinstance(entry, str):
+                entry = {'base_url': entry}
+            backends.append(AsyncOllamaClient.from_config({**llm_config, **entry}))
+        return cls(
+            backends=backends,
+            health_check_interval=llm_config.get('health_check_interval', 10.0),
+            hedge_after_ms=llm_config.get('hedge_after_ms') or None
+        )
+
+    def _pick(self, exclude: Set[int] = frozenset()) -> Optional[int]:
+        """Least outstanding calls among healthy backends (any backend if none are healthy)."""
+        candidates = [i for i in range(len(self.backends)) if i not in exclude]
+        healthy = [i for i in candidates if self._healthy[i]]
+        candidates = healthy or candidates
+        if not candidates:
+            return None
+        return min(candidates, key=lambda i: (self._outstanding[i], self._served[i]))
+
+    def _ensure_health_checks(self):
+        if self._health_task is None and self.health_check_interval:
+            self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            await self.check_health()
+
+    async def check_health(self) -> List[bool]:
+        """Probe every backend and update its health flag."""
+        results = await asyncio.gather(*(b.health_check() for b in self.backends), return_exceptions=True)
+        for i, ok in enumerate(results):
+            healthy = ok is True
+            if healthy != self._healthy[i]:
+                name = self.backends[i].get_stats().get('base_url', i)
+                logger.info(f"LLM backend {name} is now {'healthy' if healthy else 'unhealthy'}")
+            self._healthy[i] = healthy
+        return list(self._healthy)
+
+    async def health_check(self) -> bool:
+        return any(await self.check_health())
+
+    async def _call(self, index: int, method: str, args: tuple, kwargs: Dict) -> Dict:
+        self._outstanding[index] += 1
+        try:
+            result = await getattr(self.backends[index], method)(*args, **kwargs)
+        except LLMTimeoutError:
+            self._failures[index] += 1
+            raise
+        except Exception as e:
+            # Take the server out of rotation until a health check passes
+            self._failures[index] += 1
+            self._healthy[index] = False
+            logger.warning(f"LLM backend {index} failed: {e}")
+            raise
+        finally:
+            self._outstanding[index] -= 1
+        self._served[index] += 1
+        return result
+
+    async def _dispatch(self, method: str, *args: Any, **kwargs: Any) -> Dict:
+        self._ensure_health_checks()
+        primary = self._pick()
+        if self.hedge_after_ms is None or len(self.backends) < 2:
+            try:
+                return await self._call(primary, method, args, kwargs)
+            except LLMTimeoutError:
+                raise
+            except Exception:
+                fallback = self._pick(exclude={primary})
+                if fallback is None:
+                    raise
+                return await self._call(fallback, method, args, kwargs)
+        return await self._hedged(primary, method, args, kwargs)
+
+    async def _hedged(self, primary: int, method: str, args: tuple, kwargs: Dict) -> Dict:
+        started = asyncio.Event()
+        tasks: Dict[int, asyncio.Task] = {}
+
+        def launch(index: int):
+            def on_first_token():
+                if not started.is_set():
+                    started.set()
+                    for other, task in tasks.items():
+                        if other != index:
+                            task.cancel()
+            tasks[index] = asyncio.ensure_future(
+                self._call(index, method, args, dict(kwargs, on_first_token=on_first_token))
+            )
+
+        launch(primary)
+        try:
+            waiter = asyncio.ensure_future(started.wait())
+            done, _ = await asyncio.wait(
+                {tasks[primary], waiter},
+                timeout=self.hedge_after_ms / 1000.0,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            waiter.cancel()
+            if not done:
+                secondary = self._pick(exclude={primary})
+                if secondary is not None:
+                    self.hedged += 1
+                    launch(secondary)
+
+            error = None
+            pending = set(tasks.values())
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is None:
+                        if task is not tasks[primary]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+                if not pending and not started.is_set() and len(tasks) < 2:
+                    # Primary failed before generating; retry once elsewhere
+                    secondary = self._pick(exclude={primary})
+                    if secondary is not None:
+                        launch(secondary)
+                        pending = {tasks[secondary]}
+            raise error
+        finally:
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        return await self._dispatch('generate', model, prompt, options=options, timeout=timeout, **kwargs)
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        return await self._dispatch('chat', model, messages, options=options, timeout=timeout, **kwargs)
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        await asyncio.gather(*(b.close() for b in self.backends))
+
+    def get_stats(self) -> Dict:
+        backends = []
+        for i, backend in enumerate(self.backends):
+            stats = backend.get_stats()
+            stats.update({
+                'healthy': self._healthy[i],
+                'outstanding': self._outstanding[i],
+                'served': self._served[i],
+                'failures': self._failures[i]
+            })
+            backends.append(stats)
+        return {
+            'backend': 'pool',
+            'max_concurrency': self.max_concurrency,
+            'hedge_after_ms': self.hedge_after_ms,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'backends': backends
+        }
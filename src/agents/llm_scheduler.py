@@ -0,0 +1,227 @@
+"""
+Priority-aware LLM request scheduler for the Agriculture RAG Platform.
+Every LLM call waits here for a slot, so interactive requests are not
+stuck behind translations and batch work on a single model server.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lower rank is served first
+PRIORITY_CLASSES = {
+    'interactive': 0,  # /query, /chat, /ws/chat
+    'batch': 1,        # /query/batch
+    'background': 2    # translations, district page Q&A, conversation summaries
+}
+
+llm_priority: ContextVar[str] = ContextVar('llm_priority', default='interactive')
+
+
+@contextlib.contextmanager
+def llm_priority_scope(priority: str) -> Iterator[None]:
+    """Run LLM calls made inside this block (and tasks it spawns) at `priority`."""
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown LLM priority: {priority}. Valid classes are: {', '.join(PRIORITY_CLASSES)}")
+    token = llm_priority.set(priority)
+    try:
+        yield
+    finally:
+        llm_priority.reset(token)
+
+
+class LLMQueueFullError(Exception):
+    """Raised when a priority class's wait queue is full."""
+
+
+class LLMScheduler:
+    """Wraps an LLM backend with per-class bounded queues and aging.
+
+    A waiting request's effective rank is its class rank minus
+    wait_seconds / aging_seconds, so background work waiting long enough
+    eventually outranks fresh interactive work instead of starving.
+    """
+
+    def __init__(
+        self,
+        backend,
+        max_concurrency: int = 2,
+        queue_limits: Optional[Dict[str, int]] = None,
+        aging_seconds: float = 15.0
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            backend: LLMBackend that performs the calls
+            max_concurrency: Calls dispatched to the backend at once
+            queue_limits: Max waiting requests per priority class
+            aging_seconds: Wait time that promotes a request by one class
+        """
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.queue_limits = {'interactive': 64, 'batch': 256, 'background': 128}
+        self.queue_limits.update(queue_limits or {})
+        self.aging_seconds = aging_seconds
+
+        self._queues: Dict[str, Deque] = {name: deque() for name in PRIORITY_CLASSES}
+        self._active = 0
+        self._stats = {
+            name: {'dispatched': 0, 'rejected': 0, 'waits': deque(maxlen=500)}
+            for name in PRIORITY_CLASSES
+        }
+
+    @classmethod
+    def from_config(cls, backend, llm_config: Dict) -> 'LLMScheduler':
+        """Build a scheduler from the `llm` section of config.yaml."""
+        scheduler_config = llm_config.get('scheduler', {})
+        return cls(
+            backend=backend,
+            # A backend pool admits the sum of its members' slots
+            max_concurrency=getattr(backend, 'max_concurrency', llm_config.get('max_concurrency', 2)),
+            queue_limits=scheduler_config.get('queue_limits'),
+            aging_seconds=scheduler_config.get('aging_seconds', 15.0)
+        )
+
+    @staticmethod
+    def _pending(queue: Deque) -> int:
+        """Waiters in `queue` that still want a slot."""
+        return sum(1 for _, future in queue if not future.done())
+
+    def _waiting(self) -> int:
+        return sum(self._pending(q) for q in self._queues.values())
+
+    def _dispatch(self):
+        """Hand free slots to the best-ranked waiters."""
+        now = time.monotonic()
+        while self._active < self.max_concurrency and any(self._queues.values()):
+            best_name = None
+            best_rank = None
+            for name, queue in self._queues.items():
+                if not queue:
+                    continue
+                enqueued_at, _ = queue[0]
+                rank = PRIORITY_CLASSES[name] - (now - enqueued_at) / self.aging_seconds
+                if best_rank is None or rank < best_rank:
+                    best_name, best_rank = name, rank
+            enqueued_at, future = self._queues[best_name].popleft()
+            if future.done():  # cancelled while waiting
+                continue
+            self._active += 1
+            self._record_dispatch(best_name, now - enqueued_at)
+            future.set_result(None)
+
+    def _record_dispatch(self, priority: str, wait: float):
+        stats = self._stats[priority]
+        stats['dispatched'] += 1
+        stats['waits'].append(wait)
+
+    async def _acquire(self, priority: str):
+        if self._active < self.max_concurrency and not self._waiting():
+            self._active += 1
+            self._record_dispatch(priority, 0.0)
+            return
+
+        queue = self._queues[priority]
+        waiting = self._pending(queue)
+        if waiting >= self.queue_limits[priority]:
+            self._stats[priority]['rejected'] += 1
+            raise LLMQueueFullError(f"LLM queue for '{priority}' requests is full ({waiting} waiting)")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (time.monotonic(), future)
+        queue.append(entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                # Client went away while queued; don't hold a place in the queue
+                with contextlib.suppress(ValueError):
+                    queue.remove(entry)
+            else:
+                # Slot was granted just as we were cancelled; give it back
+                self._release()
+            raise
+
+    def _release(self):
+        self._active -= 1
+        self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: Optional[str] = None):
+        """Hold one backend slot for the duration of the block."""
+        priority = priority or llm_priority.get()
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        """Wait for a slot, then call the backend.
+
+        Pass `on_dispatch=callback` to be notified when the call leaves the queue.
+        """
+        on_dispatch = kwargs.pop('on_dispatch', None)
+        async with self.slot():
+            if on_dispatch is not None:
+                on_dispatch()
+            return await self.backend.generate(model, prompt, options=options, timeout=timeout, **kwargs)
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        on_dispatch = kwargs.pop('on_dispatch', None)
+        async with self.slot():
+            if on_dispatch is not None:
+                on_dispatch()
+            return await self.backend.chat(model, messages, options=options, timeout=timeout, **kwargs)
+
+    async def close(self):
+        await self.backend.close()
+
+    async def health_check(self) -> bool:
+        return await self.backend.health_check()
+
+    def get_queue_stats(self) -> Dict:
+        """Queue depth and wait times per priority class."""
+        classes = {}
+        for name in PRIORITY_CLASSES:
+            stats = self._stats[name]
+            waits = sorted(stats['waits'])
+            classes[name] = {
+                'queue_depth': self._pending(self._queues[name]),
+                'queue_limit': self.queue_limits[name],
+                'dispatched': stats['dispatched'],
+                'rejected': stats['rejected'],
+                'mean_wait_seconds': round(sum(waits) / len(waits), 4) if waits else 0.0,
+                'p95_wait_seconds': round(waits[int(0.95 * (len(waits) - 1))], 4) if waits else 0.0
+            }
+        return {
+            'active': self._active,
+            'max_concurrency': self.max_concurrency,
+            'classes': classes
+        }
+
+    def get_stats(self) -> Dict:
+        stats = self.backend.get_stats()
+        stats['scheduler'] = self.get_queue_stats()
+        return stats
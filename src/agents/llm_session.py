@@ -0,0 +1,251 @@
+"""
+LLM session management for the Agriculture RAG Platform.
+Warms the model at startup, keeps it resident with keep_alive pings, sizes
+num_ctx per model from the prompts seen and records cold versus warm call
+latency.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import logging
+
+from .context_packer import TokenCounter
+from .llm_scheduler import llm_priority_scope
+from ..monitoring.metrics import REGISTRY, timed
+from ..monitoring.tracing import set_attributes
+
+logger = logging.getLogger(__name__)
+
+LLM_TOKENS = REGISTRY.counter('agri_llm_tokens_total', 'Tokens processed by the LLM', ['kind'])
+
+
+class LLMSessionManager:
+    """Wraps an LLM backend with warm-up, keep-alive and adaptive num_ctx.
+
+    num_ctx is rounded up to one of a few `context_sizes` and is sticky per
+    model: Ollama reloads the model whenever num_ctx changes, so once a
+    prompt needed a larger context every later call keeps it rather than
+    switching back and forth.
+    """
+
+    def __init__(
+        self,
+        backend,
+        model: str,
+        keep_alive: str = "30m",
+        ping_interval: float = 600.0,
+        context_sizes: Optional[List[int]] = None,
+        default_num_ctx: int = 4096,
+        response_reserve: int = 512,
+        token_margin: float = 1.15,
+        cold_load_seconds: float = 0.5,
+        encoding_name: str = "cl100k_base"
+    ):
+        """
+        Initialize the session manager.
+
+        Args:
+            backend: LLMBackend that performs the calls
+            model: Model to warm up and keep resident
+            keep_alive: How long Ollama keeps the model loaded after a call
+            ping_interval: Idle seconds before a keep-alive ping (0 disables)
+            context_sizes: Allowed num_ctx values, ascending
+            default_num_ctx: Context the model is loaded with before any traffic
+            response_reserve: Tokens reserved for the answer when num_predict is unset
+            token_margin: Multiplier on counted prompt tokens (tokenizer mismatch)
+            cold_load_seconds: load_duration above which a call counts as cold
+            encoding_name: tiktoken encoding used for counting
+        """
+        self.backend = backend
+        self.model = model
+        self.keep_alive = keep_alive
+        self.ping_interval = ping_interval
+        self.context_sizes = sorted(context_sizes or [2048, 4096, 8192])
+        self.default_num_ctx = default_num_ctx
+        self.response_reserve = response_reserve
+        self.token_margin = token_margin
+        self.cold_load_seconds = cold_load_seconds
+        self.counter = TokenCounter(encoding_name)
+        self.max_concurrency = getattr(backend, 'max_concurrency', 1)
+
+        self._last_call = time.monotonic()
+        self._ping_task = None
+        self.warm_up_seconds: Optional[float] = None
+        self.pings = 0
+        self.num_ctx_counts: Dict[int, int] = {}
+        self._num_ctx: Dict[str, int] = {}  # model -> largest num_ctx used so far
+        self.overflows = 0
+        self._cold: Deque[float] = deque(maxlen=200)
+        self._warm: Deque[float] = deque(maxlen=500)
+
+    @classmethod
+    def from_config(cls, backend, llm_config: Dict) -> 'LLMSessionManager':
+        """Build a session manager from the `llm` section of config.yaml."""
+        return cls(
+            backend=backend,
+            model=llm_config.get('model', 'mistral'),
+            keep_alive=llm_config.get('keep_alive', '30m'),
+            ping_interval=llm_config.get('keep_alive_ping_seconds', 600),
+            context_sizes=llm_config.get('num_ctx_sizes'),
+            default_num_ctx=llm_config.get('default_num_ctx', 4096),
+            response_reserve=llm_config.get('response_reserve_tokens', 512)
+        )
+
+    def choose_num_ctx(self, prompt_tokens: int, num_predict: Optional[int] = None) -> int:
+        """Smallest allowed context that fits the prompt plus the answer."""
+        needed = int(prompt_tokens * self.token_margin) + (num_predict or self.response_reserve)
+        for size in self.context_sizes:
+            if needed <= size:
+                return size
+        self.overflows += 1
+        logger.warning(f"Prompt needs ~{needed} tokens; capping num_ctx at {self.context_sizes[-1]}")
+        return self.context_sizes[-1]
+
+    def model_num_ctx(self, model: str) -> int:
+        """Context `model` is (or will be) loaded with: the largest one used so far."""
+        return self._num_ctx.get(model, self.default_num_ctx)
+
+    def _prepare(self, model: str, text: str, options: Optional[Dict], kwargs: Dict) -> Dict:
+        options = dict(options or {})
+        if 'num_ctx' not in options:
+            # Resumed conversation tokens occupy the context window too
+            prompt_tokens = self.counter.count(text) + len(kwargs.get('context') or [])
+            needed = self.choose_num_ctx(prompt_tokens, options.get('num_predict'))
+            options['num_ctx'] = self._num_ctx[model] = max(needed, self.model_num_ctx(model))
+        self.num_ctx_counts[options['num_ctx']] = self.num_ctx_counts.get(options['num_ctx'], 0) + 1
+        kwargs.setdefault('keep_alive', self.keep_alive)
+        return options
+
+    @staticmethod
+    def _annotate(response: Dict, options: Dict):
+        """Attach Ollama's own timings to the current trace span (prefill vs generation)."""
+        set_attributes(
+            num_ctx=options.get('num_ctx'),
+            prompt_eval_count=response.get('prompt_eval_count'),
+            prompt_eval_ms=round((response.get('prompt_eval_duration') or 0) / 1e6, 1),
+            eval_count=response.get('eval_count'),
+            eval_ms=round((response.get('eval_duration') or 0) / 1e6, 1),
+            load_ms=round((response.get('load_duration') or 0) / 1e6, 1)
+        )
+
+    def _record(self, response: Dict, seconds: float):
+        self._last_call = time.monotonic()
+        LLM_TOKENS.labels('prompt').inc(response.get('prompt_eval_count') or 0)
+        LLM_TOKENS.labels('completion').inc(response.get('eval_count') or 0)
+        load_seconds = response.get('load_duration', 0) / 1e9
+        if load_seconds >= self.cold_load_seconds:
+            self._cold.append(seconds)
+            logger.info(f"Cold LLM call: model load took {load_seconds:.1f}s of {seconds:.1f}s")
+        else:
+            self._warm.append(seconds)
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        options = self._prepare(model, prompt, options, kwargs)
+        start = time.perf_counter()
+        with timed('llm_generate'):
+            response = await self.backend.generate(model, prompt, options=options, timeout=timeout, **kwargs)
+            self._annotate(response, options)
+        self._record(response, time.perf_counter() - start)
+        return response
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict],
+        options: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any
+    ) -> Dict:
+        text = '\n'.join(m.get('content', '') for m in messages)
+        options = self._prepare(model, text, options, kwargs)
+        start = time.perf_counter()
+        with timed('llm_chat'):
+            response = await self.backend.chat(model, messages, options=options, timeout=timeout, **kwargs)
+            self._annotate(response, options)
+        self._record(response, time.perf_counter() - start)
+        return response
+
+    async def _load(self) -> float:
+        """Load the model (empty prompt) at its current context size."""
+        start = time.perf_counter()
+        with llm_priority_scope('background'):
+            response = await self.backend.generate(
+                self.model, '',
+                options={'num_ctx': self.model_num_ctx(self.model)},
+                keep_alive=self.keep_alive
+            )
+        seconds = time.perf_counter() - start
+        self._last_call = time.monotonic()
+        # Only loads count towards cold latency; no-op pings would skew warm latency
+        if response.get('load_duration', 0) / 1e9 >= self.cold_load_seconds:
+            self._cold.append(seconds)
+        return seconds
+
+    async def warm_up(self):
+        """Load the model before the first user request and start keep-alive pings."""
+        try:
+            self.warm_up_seconds = await self._load()
+            logger.info(f"✓ LLM model '{self.model}' warmed up in {self.warm_up_seconds:.1f}s")
+        except Exception as e:
+            logger.warning(f"LLM warm-up failed: {e}")
+        if self.ping_interval and self._ping_task is None:
+            self._ping_task = asyncio.get_running_loop().create_task(self._ping_loop())
+
+    async def _ping_loop(self):
+        while True:
+            await asyncio.sleep(self.ping_interval / 4)
+            if time.monotonic() - self._last_call < self.ping_interval:
+                continue
+            try:
+                await self._load()
+                self.pings += 1
+            except Exception as e:
+                logger.warning(f"LLM keep-alive ping failed: {e}")
+                self._last_call = time.monotonic()
+
+    async def close(self):
+        if self._ping_task is not None:
+            self._ping_task.cancel()
+            self._ping_task = None
+        await self.backend.close()
+
+    async def health_check(self) -> bool:
+        return await self.backend.health_check()
+
+    @staticmethod
+    def _summary(samples: Deque[float]) -> Dict:
+        if not samples:
+            return {'calls': 0, 'mean_seconds': None, 'p95_seconds': None}
+        ordered = sorted(samples)
+        return {
+            'calls': len(ordered),
+            'mean_seconds': round(sum(ordered) / len(ordered), 3),
+            'p95_seconds': round(ordered[int(0.95 * (len(ordered) - 1))], 3)
+        }
+
+    def get_session_stats(self) -> Dict:
+        return {
+            'model': self.model,
+            'keep_alive': self.keep_alive,
+            'warm_up_seconds': round(self.warm_up_seconds, 3) if self.warm_up_seconds is not None else None,
+            'keep_alive_pings': self.pings,
+            'num_ctx': {str(k): v for k, v in sorted(self.num_ctx_counts.items())},
+            'model_num_ctx': {model: self.model_num_ctx(model) for model in {self.model, *self._num_ctx}},
+            'num_ctx_overflows': self.overflows,
+            'cold': self._summary(self._cold),
+            'warm': self._summary(self._warm)
+        }
+
+    def get_stats(self) -> Dict:
+        stats = self.backend.get_stats()
+        stats['session'] = self.get_session_stats()
+        return stats
@@ -3,60 +3,146 @@ Agentic RAG system for agriculture knowledge base.
 Provides intelligent retrieval with multiple tools and reasoning.
 """
 
+import asyncio
 import json
-from typing import List, Dict, Optional, Any
+import time
+from typing import List, Dict, Optional, Any, AsyncIterator, Tuple
 import logging
 
-import ollama
+import numpy as np
 from langchain.agents import Tool, AgentExecutor, create_react_agent
 from langchain.prompts import PromptTemplate
 from langchain.schema import BaseMessage
 
 from ..embeddings.vector_store import VectorStore
 from ..geo.enrich_context import ContextEnricher
+from ..geo.geo_context import GeoContext
 from ..agents.citation_engine import CitationEngine
+from ..agents.llm_client import AsyncOllamaClient, LLMUnavailableError
+from ..agents.llm_backends import LLMBackend
+from ..agents.llm_scheduler import LLMQueueFullError
+from ..agents.circuit_breaker import CircuitBreaker, CircuitOpenError
+from ..agents.extractive_answer import ExtractiveAnswerer
+from ..agents.executors import ExecutorGroup
+from ..agents.tool_fanout import ToolFanout
+from ..agents.single_flight import SingleFlight, query_key
+from ..agents.context_packer import ContextPacker
+from ..agents.context_compressor import ContextCompressor
+from ..agents.answer_cache import AnswerCache
+from ..agents.chat_sessions import ChatSession
+from ..agents.conversation_memory import ConversationCompactor
 from ..translation.local_language import LocalLanguageTranslator
 from ..reconciliation.source_reconciler import SourceReconciler
+from ..monitoring.metrics import timed
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class OllamaLLM:
-    """Wrapper for Ollama LLM to work with LangChain."""
+    """Wrapper for Ollama LLM to work with LangChain.
     
-    def __init__(self, model: str = "mistral", base_url: str = "http://localhost:11434"):
+    Every call runs under a deadline and a circuit breaker; failures raise
+    LLMUnavailableError so callers can fall back instead of returning
+    error text as an answer. The deadline includes the wait for a
+    scheduler slot, but only failures of dispatched calls count against
+    the breaker: a long queue is overload, not a broken model server.
+    """
+    
+    def __init__(
+        self,
+        model: str = "mistral",
+        base_url: str = "http://localhost:11434",
+        client: Optional[LLMBackend] = None,
+        deadline_seconds: Optional[float] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
         self.model = model
         self.base_url = base_url
-        self.client = ollama.Client(host=base_url)
+        self.client = client or AsyncOllamaClient(base_url=base_url)
+        self.deadline_seconds = deadline_seconds
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
     
-    def __call__(self, prompt: str, stop: Optional[List[str]] = None) -> str:
-        """Generate response from Ollama."""
+    async def _call(self, method: str, **kwargs) -> Dict:
+        """Run one backend call under the deadline (queue wait included) and circuit breaker."""
         try:
-            response = self.client.generate(
-                model=self.model,
-                prompt=prompt,
-                options={
-                    'temperature': 0.7,
-                    'stop': stop if stop else []
-                }
+            self.circuit_breaker.check()
+        except CircuitOpenError as e:
+            raise LLMUnavailableError(str(e)) from e
+        
+        dispatched = False
+        
+        def on_dispatch():
+            nonlocal dispatched
+            dispatched = True
+        
+        try:
+            response = await asyncio.wait_for(
+                getattr(self.client, method)(model=self.model, on_dispatch=on_dispatch, **kwargs),
+                timeout=self.deadline_seconds
             )
-            return response['response']
+        except LLMQueueFullError as e:
+            # Overload, not a server fault: degrade this call without tripping the breaker
+            raise LLMUnavailableError(str(e)) from e
+        except asyncio.TimeoutError as e:
+            if not dispatched:
+                # Timed out still queued for a slot: degrade without tripping the breaker
+                logger.warning(f"LLM call spent its {self.deadline_seconds:.0f}s deadline waiting for a slot")
+                raise LLMUnavailableError(
+                    f"LLM call waited {self.deadline_seconds:.0f}s for a free slot"
+                ) from e
+            self.circuit_breaker.record_failure()
+            logger.error(f"LLM call exceeded its {self.deadline_seconds:.0f}s deadline")
+            raise LLMUnavailableError(f"LLM call exceeded {self.deadline_seconds:.0f}s deadline") from e
         except Exception as e:
+            self.circuit_breaker.record_failure()
             logger.error(f"Error calling Ollama: {e}")
-            return f"Error: {str(e)}"
+            raise LLMUnavailableError(str(e)) from e
+        
+        self.circuit_breaker.record_success()
+        return response
+    
+    async def __call__(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+        """Generate response from Ollama."""
+        response = await self._call(
+            'generate',
+            prompt=prompt,
+            options={
+                'temperature': 0.7,
+                'stop': stop if stop else []
+            }
+        )
+        return response['response']
     
-    def generate(self, messages: List[Dict], **kwargs) -> str:
+    async def generate(self, messages: List[Dict], **kwargs) -> str:
         """Generate chat completion."""
-        try:
-            response = self.client.chat(
-                model=self.model,
-                messages=messages
-            )
-            return response['message']['content']
-        except Exception as e:
-            logger.error(f"Error in chat completion: {e}")
-            return f"Error: {str(e)}"
+        response = await self._call('chat', messages=messages, **kwargs)
+        return response['message']['content']
+    
+    async def generate_with_context(
+        self,
+        prompt: str,
+        context: Optional[List[int]] = None,
+        keep_alive: Optional[str] = None
+    ) -> Dict:
+        """Generate a completion that resumes from a previous turn's context.
+        
+        Returns:
+            Dict with 'response' and the new 'context' (None if the backend
+            does not return one)
+        """
+        kwargs = {}
+        if context:
+            kwargs['context'] = context
+        if keep_alive:
+            kwargs['keep_alive'] = keep_alive
+        response = await self._call(
+            'generate',
+            prompt=prompt,
+            options={'temperature': 0.7},
+            **kwargs
+        )
+        return {'response': response['response'], 'context': response.get('context')}
 
 
 class AgricultureRAGTools:
@@ -154,15 +240,56 @@ class AgricultureRAGAgent:
         self,
         vector_store: VectorStore,
         llm_model: str = "mistral",
-        llm_base_url: str = "http://localhost:11434"
+        llm_base_url: str = "http://localhost:11434",
+        llm_client: Optional[LLMBackend] = None,
+        context_packer: Optional[ContextPacker] = None,
+        context_compressor: Optional[ContextCompressor] = None,
+        answer_cache: Optional[AnswerCache] = None,
+        chat_drift_threshold: float = 0.75,
+        llm_keep_alive: str = "30m",
+        conversation_compactor: Optional[ConversationCompactor] = None,
+        llm_deadline_seconds: Optional[float] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retrieval_mode: str = "semantic",
+        tool_fanout: Optional[ToolFanout] = None,
+        executors: Optional[ExecutorGroup] = None,
+        geo_context: Optional[GeoContext] = None,
+        translator: Optional[LocalLanguageTranslator] = None
     ):
         self.vector_store = vector_store
-        self.llm = OllamaLLM(model=llm_model, base_url=llm_base_url)
+        self.executors = executors or ExecutorGroup()
+        self.llm_client = llm_client or AsyncOllamaClient(base_url=llm_base_url)
+        self.llm = OllamaLLM(
+            model=llm_model,
+            base_url=llm_base_url,
+            client=self.llm_client,
+            deadline_seconds=llm_deadline_seconds,
+            circuit_breaker=circuit_breaker
+        )
+        self.extractive = ExtractiveAnswerer(getattr(vector_store, 'embedding_model', None))
+        if retrieval_mode not in ('semantic', 'fanout'):
+            raise ValueError(f"Unknown retrieval mode: {retrieval_mode}. Valid modes are: semantic, fanout")
+        self.retrieval_mode = retrieval_mode
+        self.tool_fanout = tool_fanout or ToolFanout(
+            vector_store, search_executor=self.executors.search, io_executor=self.executors.io
+        )
         self.tools_handler = AgricultureRAGTools(vector_store)
-        self.context_enricher = ContextEnricher()
+        self.context_enricher = ContextEnricher(geo_context)
         self.citation_engine = CitationEngine()
-        self.translator = LocalLanguageTranslator(llm_model=llm_model, llm_base_url=llm_base_url)
+        self.translator = translator or LocalLanguageTranslator(
+            llm_model=llm_model,
+            llm_base_url=llm_base_url,
+            client=self.llm_client
+        )
         self.reconciler = SourceReconciler()
+        self.single_flight = SingleFlight()
+        self.context_packer = context_packer or ContextPacker()
+        self.context_compressor = context_compressor
+        self.answer_cache = answer_cache
+        self._cached_index_version = vector_store.index_version
+        self.chat_drift_threshold = chat_drift_threshold
+        self.llm_keep_alive = llm_keep_alive
+        self.conversation_compactor = conversation_compactor or ConversationCompactor(self.llm)
         
         # Initialize tools
         self.tools = [
@@ -193,37 +320,142 @@ class AgricultureRAGAgent:
         
         logger.info(f"Agriculture RAG Agent initialized with {len(self.tools)} tools")
     
-    def query(
+    async def query(
         self, 
         user_query: str, 
         district: Optional[str] = None,
         lat: Optional[float] = None,
         lon: Optional[float] = None,
         max_iterations: int = 3,
-        include_translations: bool = True
+        include_translations: bool = True,
+        include_reconciliation: bool = True,
+        include_citations: bool = True
     ) -> Dict[str, Any]:
         """Process a user query using the RAG system with optional geo-context.
         
+        Answers are served from the answer cache when the same (or a
+        near-duplicate) question was answered for this district and index
+        version. Identical queries already in flight share one computation.
+        
         Args:
             user_query: User's question
             district: District name (optional)
             lat: Latitude (optional)
             lon: Longitude (optional)
             max_iterations: Maximum tool iterations (not used in simple mode)
+            include_translations: Generate the multilingual summary (an extra LLM call)
+            include_reconciliation: Check retrieved sources for conflicts
+            include_citations: Format citations and the confidence score
             
         Returns:
-            Dictionary with query, response, sources, and metadata
+            Dictionary with query, response, sources, and metadata; skipped
+            sections are None
         """
+        sections = (include_translations, include_reconciliation, include_citations)
+        key = self._query_key(user_query, district, lat, lon, sections)
+        return await self._answer(key, user_query, district, lat, lon, sections)
+    
+    def _query_key(
+        self,
+        user_query: str,
+        district: Optional[str],
+        lat: Optional[float],
+        lon: Optional[float],
+        sections: Tuple[bool, bool, bool]
+    ) -> Tuple:
+        return query_key(
+            user_query, district, lat, lon,
+            index_version=self.vector_store.index_version,
+            extra=sections
+        )
+    
+    async def _answer(
+        self,
+        key: Tuple,
+        user_query: str,
+        district: Optional[str],
+        lat: Optional[float],
+        lon: Optional[float],
+        sections: Tuple[bool, bool, bool],
+        query_embedding: Optional[List[float]] = None,
+        results: Optional[List[Dict]] = None,
+        geo_context: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Serve from the answer cache, else compute once per in-flight key."""
+        if self.answer_cache is not None:
+            with timed('answer_cache'):
+                if self.vector_store.index_version != self._cached_index_version:
+                    self.answer_cache.invalidate()
+                    self._cached_index_version = self.vector_store.index_version
+            
+                cached = self.answer_cache.get_exact(key)
+                if cached is not None:
+                    return dict(cached, query=user_query, cache='exact')
+            
+                if query_embedding is None:
+                    query_embedding = await self.executors.search.run(self.vector_store.embed_query, user_query)
+                cached = self.answer_cache.get_semantic(key, query_embedding)
+                if cached is not None:
+                    return dict(cached, query=user_query, cache='semantic')
+        
+        async def compute():
+            result = await self._query(
+                user_query, district, lat, lon, sections,
+                query_embedding=query_embedding,
+                results=results,
+                geo_context=geo_context
+            )
+            if self.answer_cache is not None and not result['degraded']:
+                self.answer_cache.put(
+                    key, query_embedding, result,
+                    llm_seconds=result['timings']['llm_seconds']
+                )
+            return result
+        
+        result = await self.single_flight.do(key, compute)
+        # Each caller gets its own top-level dict; nested data is shared read-only
+        return dict(result, query=user_query)
+    
+    async def _query(
+        self,
+        user_query: str,
+        district: Optional[str],
+        lat: Optional[float],
+        lon: Optional[float],
+        sections: Tuple[bool, bool, bool],
+        query_embedding: Optional[List[float]] = None,
+        results: Optional[List[Dict]] = None,
+        geo_context: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Run retrieval, generation, citations, reconciliation and translation.
+        
+        `sections` is (translations, reconciliation, citations); sections the
+        caller did not ask for are not computed. Batch callers pass
+        already-retrieved `results` and a resolved `geo_context` so those
+        steps are shared across items.
+        """
+        include_translations, include_reconciliation, include_citations = sections
         logger.info(f"Processing query: {user_query}")
         if district:
             logger.info(f"With district context: {district}")
         
         # Search for relevant documents
-        results = self.vector_store.search_with_score_threshold(
-            query=user_query,
-            top_k=5,
-            score_threshold=0.5
-        )
+        retrieval_stats = None
+        with timed('retrieval'):
+            if results is None and self.retrieval_mode == 'fanout':
+                results, retrieval_stats = await self.tool_fanout.retrieve(user_query, query_embedding)
+            elif results is None:
+                results = await self.executors.search.run(
+                    self.vector_store.search_with_score_threshold,
+                    query=user_query,
+                    top_k=5,
+                    score_threshold=0.5,
+                    query_embedding=query_embedding
+                )
+        
+        # Get geo context for the prompt and metadata
+        if geo_context is None and (district or (lat and lon)):
+            geo_context = self.context_enricher._get_geo_context(district, lat, lon)
         
         # Format results as chunks for enricher
         retrieved_chunks = []
@@ -233,33 +465,52 @@ class AgricultureRAGAgent:
                 'metadata': result.get('metadata', {})
             })
         
-        # Build AgriEvidence prompt with geo-context
-        enriched_prompt = self.context_enricher.build_agrievidence_prompt(
-            question=user_query,
-            retrieved_chunks=retrieved_chunks,
-            district=district,
-            lat=lat,
-            lon=lon
-        )
+        # Compress and fit evidence into the prompt token budget
+        with timed('prompt_build'):
+            prompt_chunks, context_stats = await self.executors.search.run(
+                self._prepare_evidence, user_query, retrieved_chunks
+            )
+            if retrieval_stats:
+                context_stats['retrieval'] = retrieval_stats
+        
+            # Build AgriEvidence prompt with geo-context
+            enriched_prompt = self.context_enricher.build_agrievidence_prompt(
+                question=user_query,
+                retrieved_chunks=prompt_chunks,
+                district=district,
+                lat=lat,
+                lon=lon,
+                geo_context=geo_context
+            )
         
         # Generate response
         messages = [
             {"role": "user", "content": enriched_prompt}
         ]
         
-        response = self.llm.generate(messages)
-        
-        # Get geo context for metadata
-        geo_context = None
-        if district or (lat and lon):
-            geo_context = self.context_enricher._get_geo_context(district, lat, lon)
+        llm_start = time.perf_counter()
+        degraded = False
+        try:
+            response = await self.llm.generate(messages)
+            llm_seconds = time.perf_counter() - llm_start
+        except LLMUnavailableError as e:
+            # Time spent on the failed call, not on the fallback answer
+            llm_seconds = time.perf_counter() - llm_start
+            with timed('extractive_fallback'):
+                response = await self.executors.search.run(
+                    self.extractive.answer, user_query, retrieved_chunks, reason=str(e)
+                )
+            degraded = True
         
         # Generate citations with confidence scoring
-        citations = self.citation_engine.format_citations(results, include_confidence=True)
+        citations = None
+        if include_citations:
+            with timed('citations'):
+                citations = self.citation_engine.format_citations(results, include_confidence=True)
         
         # Check for conflicting sources and reconcile if needed
         reconciliation_result = None
-        if len(results) >= 2:
+        if include_reconciliation and len(results) >= 2:
             try:
                 # Prepare sources for reconciliation
                 sources_for_reconciliation = [
@@ -269,19 +520,22 @@ class AgricultureRAGAgent:
                     }
                     for result in results
                 ]
-                reconciliation_result = self.reconciler.reconcile_sources(
-                    sources_for_reconciliation,
-                    user_query
-                )
+                with timed('reconciliation'):
+                    reconciliation_result = self.reconciler.reconcile_sources(
+                        sources_for_reconciliation,
+                        user_query
+                    )
                 logger.info(f"Reconciliation: {reconciliation_result.get('summary', 'Complete')}")
             except Exception as e:
                 logger.warning(f"Source reconciliation failed: {e}")
         
         # Generate multilingual summary
         translations = None
-        if include_translations:
+        if include_translations and not degraded:
             try:
-                translations = self.translator.generate_multilingual_summary(response)
+                translation_start = time.perf_counter()
+                translations = await self.translator.generate_multilingual_summary(response)
+                llm_seconds += time.perf_counter() - translation_start
             except Exception as e:
                 logger.warning(f"Translation failed: {e}")
                 translations = {'english': 'Key points: ' + response[:200]}
@@ -293,17 +547,130 @@ class AgricultureRAGAgent:
             'citations': citations,
             'translations': translations,
             'reconciliation': reconciliation_result,
-            'tool_used': 'semantic_search_with_geo_context',
-            'geo_context': geo_context
+            'tool_used': 'agentic_fanout_with_geo_context' if retrieval_stats else 'semantic_search_with_geo_context',
+            'geo_context': geo_context,
+            'context_stats': context_stats,
+            'degraded': degraded,
+            'timings': {'llm_seconds': round(llm_seconds, 3)}
         }
     
-    def chat(
+    async def query_batch(
+        self,
+        items: List[Dict[str, Any]],
+        include_translations: bool = False,
+        max_workers: int = 4
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """Answer many queries, yielding (index, result) as each completes.
+        
+        All queries are embedded in one batched encode and retrieved with a
+        single multi-query search. In 'fanout' retrieval mode each item runs
+        the fan-out tools instead, as query() does, once its answer is not
+        cached. Geo context is resolved once per district.
+        Generation runs on at most `max_workers` concurrent items. Failed
+        items yield the exception instead of a result.
+        
+        Args:
+            items: Dicts with 'query' and optional 'district', 'lat', 'lon'
+            include_translations: Whether to translate each answer
+            max_workers: Items generating at once
+        """
+        if not items:
+            return
+        
+        sections = (include_translations, True, True)
+        keys = [
+            self._query_key(
+                item['query'], item.get('district'), item.get('lat'), item.get('lon'),
+                sections
+            )
+            for item in items
+        ]
+        
+        # One batched encode, and in semantic mode one multi-query search for the unique queries
+        embeddings = await self.executors.search.run(
+            self.vector_store.embed_queries, [item['query'] for item in items]
+        )
+        results_by_key = {}
+        if self.retrieval_mode != 'fanout':
+            first_index = {}
+            for i, key in enumerate(keys):
+                first_index.setdefault(key, i)
+            unique = list(first_index.values())
+            batched_results = await self.executors.search.run(
+                self.vector_store.search_batch,
+                [embeddings[i] for i in unique],
+                5,
+                0.5
+            )
+            results_by_key = {keys[i]: r for i, r in zip(unique, batched_results)}
+        
+        # Items sharing a location share one geo lookup (key[1:4] = district, lat, lon bucket)
+        geo_by_location = {}
+        for item, key in zip(items, keys):
+            location = key[1:4]
+            if location not in geo_by_location:
+                district, lat, lon = item.get('district'), item.get('lat'), item.get('lon')
+                geo_by_location[location] = (
+                    self.context_enricher._get_geo_context(district, lat, lon)
+                    if district or (lat and lon) else None
+                )
+        
+        semaphore = asyncio.Semaphore(max_workers)
+        
+        async def run(i: int) -> Tuple[int, Any]:
+            item = items[i]
+            async with semaphore:
+                try:
+                    result = await self._answer(
+                        keys[i], item['query'], item.get('district'), item.get('lat'), item.get('lon'),
+                        sections,
+                        query_embedding=embeddings[i],
+                        results=results_by_key.get(keys[i]),
+                        geo_context=geo_by_location[keys[i][1:4]]
+                    )
+                    return i, result
+                except Exception as e:
+                    logger.error(f"Batch item {i} failed: {e}")
+                    return i, e
+        
+        tasks = [asyncio.ensure_future(run(i)) for i in range(len(items))]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Client went away mid-stream: stop the remaining work
+            for task in tasks:
+                task.cancel()
+    
+    def _prepare_evidence(self, question: str, retrieved_chunks: List[Dict]):
+        """Compress (if enabled) and pack retrieved chunks for the prompt.
+        
+        Returns:
+            Tuple of (chunks for the prompt, context statistics)
+        """
+        chunks = retrieved_chunks
+        compression_stats = None
+        if self.context_compressor is not None and chunks:
+            try:
+                compressed = self.context_compressor.compress(question, chunks)
+                chunks = compressed['chunks']
+                compression_stats = compressed['stats']
+            except Exception as e:
+                logger.warning(f"Context compression failed, using full chunks: {e}")
+        
+        packed = self.context_packer.pack(chunks)
+        stats = packed.to_dict()
+        if compression_stats:
+            stats['compression'] = compression_stats
+        return packed.chunks, stats
+    
+    async def chat(
         self, 
         messages: List[Dict[str, str]],
         district: Optional[str] = None,
         lat: Optional[float] = None,
         lon: Optional[float] = None
-    ) -> str:
+    ) -> Dict[str, Any]:
         """Handle multi-turn conversations with optional geo-context.
         
         Args:
@@ -313,21 +680,25 @@ class AgricultureRAGAgent:
             lon: Longitude (optional)
             
         Returns:
-            Assistant's response string
+            Dictionary with the assistant's 'response', the retrieved 'sources'
+            and a 'degraded' flag (True when the LLM was unavailable and an
+            extractive answer was served)
         """
         # Get last user message for retrieval
         user_messages = [m for m in messages if m['role'] == 'user']
         if not user_messages:
-            return "No user message found."
+            return {'response': "No user message found.", 'sources': [], 'degraded': False}
         
         last_query = user_messages[-1]['content']
         
         # Retrieve relevant context
-        results = self.vector_store.search_with_score_threshold(
-            query=last_query,
-            top_k=5,
-            score_threshold=0.5
-        )
+        with timed('retrieval'):
+            results = await self.executors.search.run(
+                self.vector_store.search_with_score_threshold,
+                query=last_query,
+                top_k=5,
+                score_threshold=0.5
+            )
         
         # Format results as chunks
         retrieved_chunks = []
@@ -337,23 +708,148 @@ class AgricultureRAGAgent:
                 'metadata': result.get('metadata', {})
             })
         
-        # Build enriched prompt
-        enriched_content = self.context_enricher.build_agrievidence_prompt(
-            question=last_query,
-            retrieved_chunks=retrieved_chunks,
-            district=district,
-            lat=lat,
-            lon=lon
-        )
+        with timed('prompt_build'):
+            prompt_chunks, _ = await self.executors.search.run(self._prepare_evidence, last_query, retrieved_chunks)
+        
+            # Build enriched prompt
+            enriched_content = self.context_enricher.build_agrievidence_prompt(
+                question=last_query,
+                retrieved_chunks=prompt_chunks,
+                district=district,
+                lat=lat,
+                lon=lon
+            )
+        
+        # Fold older turns into a cached summary once history exceeds its budget
+        history, _ = self.conversation_compactor.compact(messages[:-1])
         
         # Replace last user message with enriched version
-        enhanced_messages = messages[:-1] + [
+        enhanced_messages = history + [
             {'role': 'user', 'content': enriched_content}
         ]
         
         # Generate response
-        response = self.llm.generate(enhanced_messages)
-        return response
+        try:
+            response = await self.llm.generate(enhanced_messages)
+        except LLMUnavailableError as e:
+            return {
+                'response': await self.executors.search.run(
+                    self.extractive.answer, last_query, retrieved_chunks, reason=str(e)
+                ),
+                'sources': retrieved_chunks,
+                'degraded': True
+            }
+        return {'response': response, 'sources': retrieved_chunks, 'degraded': False}
+    
+    async def chat_turn(self, session: ChatSession, message: str) -> Dict[str, Any]:
+        """Handle one turn of a stateful chat session.
+        
+        Retrieval is only re-run when the new message drifts semantically
+        from the question the current evidence was retrieved for. The
+        LLM resumes from the context it returned last turn, so earlier turns
+        are not resent or re-processed.
+        
+        Args:
+            session: Server-side session (updated in place)
+            message: New user message
+            
+        Returns:
+            Dictionary with response, whether retrieval ran, and sources
+        """
+        history = session.history
+        if session.history:
+            history, covered = self.conversation_compactor.compact(session.history)
+            if covered > session.summarized_upto:
+                # A newer summary landed: restart the LLM context from the
+                # compact memory instead of carrying every old token forward
+                session.summarized_upto = covered
+                session.llm_context = None
+                session.retrieval_embedding = None
+        
+        embedding = await self.executors.search.run(self.vector_store.embed_query, message)
+        
+        similarity = None
+        if session.retrieval_embedding is not None:
+            similarity = float(np.dot(embedding, session.retrieval_embedding))
+        drifted = similarity is None or similarity < self.chat_drift_threshold
+        
+        if drifted:
+            with timed('retrieval'):
+                results = await self.executors.search.run(
+                    self.vector_store.search_with_score_threshold,
+                    query=message,
+                    top_k=5,
+                    score_threshold=0.5,
+                    query_embedding=embedding
+                )
+            session.retrieved_chunks = [
+                {'content': r['content'], 'metadata': r.get('metadata', {})}
+                for r in results
+            ]
+            session.retrieval_embedding = embedding
+            session.retrievals += 1
+        
+        if drifted or session.llm_context is None:
+            # Nothing in the model's context to refer back to (new evidence, a
+            # new summary, or a backend that returns no context): send it all
+            prompt_chunks, _ = await self.executors.search.run(
+                self._prepare_evidence, message, session.retrieved_chunks
+            )
+            prompt = self.context_enricher.build_agrievidence_prompt(
+                question=message,
+                retrieved_chunks=prompt_chunks,
+                district=session.district,
+                lat=session.lat,
+                lon=session.lon
+            )
+        else:
+            # Evidence and location are already in the model's context
+            prompt = f"""[FOLLOW-UP QUESTION]
+{message}
+
+Answer using the evidence and location context provided earlier in this conversation, with citations."""
+        
+        if session.llm_context is None and history:
+            # No resumable context; the compacted transcript goes ahead of the evidence
+            transcript = '\n'.join(
+                f"{m['role'].upper()}: {m['content']}" for m in history
+            )
+            prompt = f"[CONVERSATION SO FAR]\n{transcript}\n\n{prompt}"
+        
+        degraded = False
+        try:
+            result = await self.llm.generate_with_context(
+                prompt,
+                context=session.llm_context,
+                keep_alive=self.llm_keep_alive
+            )
+            session.llm_context = result['context']
+        except LLMUnavailableError as e:
+            result = {'response': await self.executors.search.run(
+                self.extractive.answer, message, session.retrieved_chunks, reason=str(e)
+            )}
+            degraded = True
+        
+        session.history.append({'role': 'user', 'content': message})
+        session.history.append({'role': 'assistant', 'content': result['response']})
+        session.turns += 1
+        session.touch()
+        
+        return {
+            'session_id': session.session_id,
+            'response': result['response'],
+            'degraded': degraded,
+            'retrieved': drifted,
+            'similarity_to_evidence': round(similarity, 3) if similarity is not None else None,
+            'sources': [
+                {
+                    'content': c['content'][:300],
+                    'metadata': c['metadata']
+                }
+                for c in session.retrieved_chunks
+            ] if drifted else None,
+            'turn': session.turns
+        }
 
 
 if __name__ == "__main__":
@@ -368,5 +864,5 @@ if __name__ == "__main__":
     agent = AgricultureRAGAgent(vector_store)
     
     # Test query
-    result = agent.query("What are the best practices for maize farming in Zimbabwe?")
+    result = asyncio.run(agent.query("What are the best practices for maize farming in Zimbabwe?"))
     print("Response:", result['response'])
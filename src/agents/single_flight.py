@@ -0,0 +1,85 @@
+"""
+Single-flight request coalescing for the Agriculture RAG Platform.
+Concurrent identical queries share one retrieval + LLM computation.
+"""
+
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for keying: lowercase, collapse whitespace, drop trailing punctuation."""
+    text = re.sub(r'\s+', ' ', query.lower()).strip()
+    return text.rstrip('?!. ')
+
+
+def query_key(
+    query: str,
+    district: Optional[str] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    index_version: Any = None,
+    coord_precision: int = 2,
+    extra: Tuple = ()
+) -> Tuple:
+    """
+    Build a coalescing key for a query.
+
+    Coordinates are bucketed (2 decimals is roughly 1 km) so nearby users
+    asking the same question share a key.
+    """
+    lat_bucket = round(lat, coord_precision) if lat is not None else None
+    lon_bucket = round(lon, coord_precision) if lon is not None else None
+    return (
+        normalize_query(query),
+        district.strip().lower() if district else None,
+        lat_bucket,
+        lon_bucket,
+        index_version
+    ) + extra
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one computation."""
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func() once per key; concurrent callers await the same result.
+
+        The shared task is shielded so one caller disconnecting does not
+        cancel the computation for the others.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.coalesced += 1
+            logger.info(f"Coalesced query onto in-flight computation ({len(self._in_flight)} in flight)")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        """Drop a finished task so the next call recomputes."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def get_stats(self) -> Dict:
+        """Get coalescing statistics."""
+        total = self.executed + self.coalesced
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._in_flight),
+            'coalesce_ratio': round(self.coalesced / total, 4) if total else 0.0
+        }
@@ -0,0 +1,206 @@
+"""
+Agentic fan-out retrieval for the Agriculture RAG Platform.
+Classifies the query, runs the agent's search tools concurrently on one
+shared batch of query embeddings and fuses their results by rank.
+"""
+
+import asyncio
+import re
+import time
+from itertools import zip_longest
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from ..embeddings.vector_store import VectorStore
+from .executors import BoundedExecutor
+
+logger = logging.getLogger(__name__)
+
+# Query keywords per document category (mirrors the ingestion categories)
+QUERY_CATEGORIES = {
+    'crop': ['maize', 'sorghum', 'millet', 'wheat', 'soya', 'bean', 'groundnut', 'tobacco', 'cotton',
+             'pepper', 'crop', 'seed', 'plant', 'fertili', 'armyworm', 'pest', 'harvest', 'yield', 'horticultur'],
+    'livestock': ['cattle', 'goat', 'sheep', 'pig', 'broiler', 'chicken', 'poultry', 'fish', 'livestock',
+                  'dairy', 'dip', 'tick', 'vaccin', 'veterinar', 'graz', 'pasture'],
+    'policy': ['policy', 'framework', 'strategy', 'vision', 'pfumvudza', 'subsid', 'government', 'programme', 'scheme'],
+    'climate': ['climate', 'rain', 'drought', 'weather', 'temperature', 'season', 'irrigat', 'flood', 'csa'],
+    'market': ['market', 'price', 'sell', 'buyer', 'gmb', 'contract', 'export', 'value chain', 'profit', 'margin'],
+    'food_security': ['food security', 'hunger', 'nutrition', 'famine', 'food aid', 'zimvac', 'livelihood', 'vulnerab']
+}
+
+QUERY_VARIATIONS = ["{query}", "best practices for {query}", "guidelines for {query}"]
+
+
+def classify_query(query: str, max_categories: int = 2) -> List[str]:
+    """Document categories a query is about, most keyword hits first."""
+    text = query.lower()
+    hits = []
+    for category, keywords in QUERY_CATEGORIES.items():
+        count = sum(1 for keyword in keywords if re.search(r'\b' + re.escape(keyword), text))
+        if count:
+            hits.append((count, category))
+    hits.sort(key=lambda h: -h[0])
+    return [category for _, category in hits[:max_categories]]
+
+
+class ToolFanout:
+    """Runs semantic, category and multi-query search concurrently and fuses by rank."""
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        top_k: int = 5,
+        score_threshold: float = 0.5,
+        category_top_k: int = 3,
+        variation_top_k: int = 2,
+        rrf_k: int = 60,
+        search_executor: Optional[BoundedExecutor] = None,
+        io_executor: Optional[BoundedExecutor] = None
+    ):
+        """
+        Initialize the fan-out retriever.
+
+        Args:
+            vector_store: Vector store searched by every tool
+            top_k: Fused results returned
+            score_threshold: Minimum similarity for any tool's results
+            category_top_k: Results per category search
+            variation_top_k: Results per multi-query variation
+            rrf_k: Reciprocal rank fusion constant
+            search_executor: Pool the searches run on (a private one if None)
+            io_executor: Pool for collection metadata lookups (the search pool if None)
+        """
+        self.vector_store = vector_store
+        self.top_k = top_k
+        self.score_threshold = score_threshold
+        self.category_top_k = category_top_k
+        self.variation_top_k = variation_top_k
+        self.rrf_k = rrf_k
+        self.search_executor = search_executor or BoundedExecutor('search')
+        self.io_executor = io_executor or self.search_executor
+        self._indexed_categories: Optional[set] = None
+        self._categories_version = None
+
+    @classmethod
+    def from_config(
+        cls,
+        vector_store: VectorStore,
+        fanout_config: Dict,
+        search_executor: Optional[BoundedExecutor] = None,
+        io_executor: Optional[BoundedExecutor] = None
+    ) -> 'ToolFanout':
+        """Build a fan-out retriever from the `retrieval.fanout` section of config.yaml."""
+        return cls(
+            vector_store=vector_store,
+            top_k=fanout_config.get('top_k', 5),
+            score_threshold=fanout_config.get('score_threshold', 0.5),
+            category_top_k=fanout_config.get('category_top_k', 3),
+            variation_top_k=fanout_config.get('variation_top_k', 2),
+            rrf_k=fanout_config.get('rrf_k', 60),
+            search_executor=search_executor,
+            io_executor=io_executor
+        )
+
+    async def _categories_in_index(self) -> set:
+        """Query categories with documents in the collection, cached per index version."""
+        version = self.vector_store.index_version
+        if self._indexed_categories is None or self._categories_version != version:
+            try:
+                present = await self.io_executor.run(self.vector_store.categories_present, list(QUERY_CATEGORIES))
+                self._indexed_categories = set(present)
+            except Exception as e:
+                # Unknown: search every matched category rather than none
+                logger.warning(f"Could not list categories: {e}")
+                self._indexed_categories = set(QUERY_CATEGORIES)
+            self._categories_version = version
+        return self._indexed_categories
+
+    async def _run(self, name: str, func, *args, **kwargs) -> Tuple[str, List[List[Dict]], float]:
+        start = time.perf_counter()
+        results = await self.search_executor.run(func, *args, **kwargs)
+        return name, results, time.perf_counter() - start
+
+    def fuse(self, ranked_lists: Dict[str, List[Dict]]) -> List[Dict]:
+        """Reciprocal rank fusion across tool result lists, keyed by document id."""
+        fused: Dict[str, Dict] = {}
+        for tool, results in ranked_lists.items():
+            for rank, result in enumerate(results):
+                doc_id = result.get('id') or result['content'][:200]
+                entry = fused.get(doc_id)
+                if entry is None:
+                    entry = dict(result, fusion_score=0.0, tools=[])
+                    fused[doc_id] = entry
+                entry['fusion_score'] += 1.0 / (self.rrf_k + rank + 1)
+                entry['similarity_score'] = max(entry.get('similarity_score', 0), result.get('similarity_score', 0))
+                if tool not in entry['tools']:
+                    entry['tools'].append(tool)
+        return sorted(fused.values(), key=lambda r: -r['fusion_score'])[:self.top_k]
+
+    async def retrieve(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[Dict], Dict]:
+        """
+        Run all relevant tools concurrently and fuse their results.
+
+        Args:
+            query: User question
+            query_embedding: Normalized embedding of `query`, if already computed
+
+        Returns:
+            Tuple of (fused results, retrieval statistics)
+        """
+        start = time.perf_counter()
+        categories = classify_query(query)
+        if categories:
+            indexed = await self._categories_in_index()
+            categories = [c for c in categories if c in indexed]
+
+        # One batched encode for the query and all its variations
+        texts = [template.format(query=query) for template in QUERY_VARIATIONS]
+        if query_embedding is None:
+            embeddings = await self.search_executor.run(self.vector_store.embed_queries, texts)
+        else:
+            embeddings = [list(query_embedding)]
+            embeddings += await self.search_executor.run(self.vector_store.embed_queries, texts[1:])
+        embed_seconds = time.perf_counter() - start
+
+        calls = [
+            self._run('semantic_search', self.vector_store.search_batch, [embeddings[0]],
+                      top_k=self.top_k, score_threshold=self.score_threshold),
+            self._run('multi_query_search', self.vector_store.search_batch, embeddings,
+                      top_k=self.variation_top_k, score_threshold=self.score_threshold)
+        ]
+        for category in categories:
+            calls.append(self._run(
+                f'category_search:{category}', self.vector_store.search_batch, [embeddings[0]],
+                top_k=self.category_top_k, score_threshold=self.score_threshold,
+                filter_metadata={'category': category}
+            ))
+
+        ranked_lists = {}
+        tool_stats = {}
+        for name, results, seconds in await asyncio.gather(*calls):
+            if name == 'multi_query_search':
+                # Interleave variations so each contributes its best hit first
+                merged, seen = [], set()
+                for result in (r for rank in zip_longest(*results) for r in rank if r is not None):
+                    if result['id'] not in seen:
+                        seen.add(result['id'])
+                        merged.append(result)
+            else:
+                merged = results[0] if results else []
+            ranked_lists[name] = merged
+            tool_stats[name] = {'results': len(merged), 'seconds': round(seconds, 4)}
+
+        fused = self.fuse(ranked_lists)
+        stats = {
+            'mode': 'fanout',
+            'categories': categories,
+            'embed_seconds': round(embed_seconds, 4),
+            'tools': tool_stats,
+            'seconds': round(time.perf_counter() - start, 4)
+        }
+        logger.info(f"Fan-out retrieval: {len(fused)} results from {len(calls)} tools in {stats['seconds']:.3f}s")
+        return fused, stats
@@ -7,17 +7,14 @@ from fastapi import APIRouter, HTTPException
 from typing import Optional, List
 import logging
 
-from src.embeddings.vector_store import VectorStore
-from src.geo.geo_context import GeoContext
-from src.profitability.margin_calculator import GrossMarginCalculator
-from src.markets.market_api import MarketPricesAPI
+from src.api.responses import json_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/districts-complete", tags=["district-profiles"])
 
 
-def add_complete_district_endpoints(app, vector_store: VectorStore):
+def add_complete_district_endpoints(app, services, executors=None):
     """
     Add comprehensive district profile endpoints to the FastAPI app.
     
@@ -27,24 +24,15 @@ def add_complete_district_endpoints(app, vector_store: VectorStore):
     - Market information per district
     - Profitability calculations per district
     - Crop recommendations per district
-    """
-    from src.agents.rag_agent import AgricultureRAGAgent
-    import yaml
-    from pathlib import Path
     
-    # Load config for RAG agent
-    config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    Routes are registered at startup; the shared vector store, RAG agent,
+    GeoContext, market API and margin calculator are resolved from the
+    `services` container per request, waiting while they load.
+    """
+    from src.agents.llm_scheduler import llm_priority_scope
+    from src.agents.executors import ExecutorGroup, ExecutorSaturatedError
     
-    geo_context = GeoContext()
-    margin_calc = GrossMarginCalculator()
-    market_api = MarketPricesAPI()
-    rag_agent = AgricultureRAGAgent(
-        vector_store=vector_store,
-        llm_model=config['llm']['model'],
-        llm_base_url=config['llm']['base_url']
-    )
+    executors = executors or ExecutorGroup()
     
     @app.get("/api/district/{district_name}/complete-profile")
     async def get_complete_district_profile(district_name: str):
@@ -58,6 +46,10 @@ def add_complete_district_endpoints(app, vector_store: VectorStore):
         - Profitability estimates for main crops
         - Weather data
         """
+        geo_context = await services.get('geo_context')
+        market_api = await services.get('market_api')
+        margin_calc = await services.get('margin_calculator')
+        vector_store = await services.get('vector_store')
         try:
             # 1. Get geographic context
             district_info = geo_context.get_district_by_name(district_name)
@@ -66,7 +58,8 @@ def add_complete_district_endpoints(app, vector_store: VectorStore):
             
             # 2. Search vector database for district profile data
             profile_query = f"{district_name} district profile agriculture crops markets irrigation opportunities challenges"
-            profile_results = vector_store.search(
+            profile_results = await executors.search.run(
+                vector_store.search,
                 query=profile_query,
                 top_k=10,
                 filter_metadata={'source': 'zimbabwe_district_profiles'}
@@ -233,9 +226,9 @@ def add_complete_district_endpoints(app, vector_store: VectorStore):
                 }
             }
             
-            return response
+            return json_response(response)
             
-        except HTTPException:
+        except (HTTPException, ExecutorSaturatedError):
             raise
         except Exception as e:
             logger.error(f"Error getting complete district profile: {e}")
@@ -255,14 +248,20 @@ def add_complete_district_endpoints(app, vector_store: VectorStore):
         - "Which crop is most profitable?"
         - "When do we plant maize?"
         """
+        rag_agent = await services.get('rag_agent')
         try:
             # Use RAG agent to get proper answer with district context
             contextualized_query = f"For {district_name} district in Zimbabwe: {question}"
             
-            result = rag_agent.query(
-                user_query=contextualized_query,
-                district=district_name
-            )
+            # District page Q&A yields to interactive /query and /chat traffic
+            with llm_priority_scope('background'):
+                result = await rag_agent.query(
+                    user_query=contextualized_query,
+                    district=district_name,
+                    include_translations=False,
+                    include_reconciliation=False,
+                    include_citations=False
+                )
             
             # Format sources with full metadata
             sources = []
@@ -284,9 +283,12 @@ def add_complete_district_endpoints(app, vector_store: VectorStore):
                 "question": question,
                 "answer": result.get('response', 'No answer available'),
                 "sources": sources,
-                "source_count": len(sources)
+                "source_count": len(sources),
+                "degraded": result.get('degraded', False)
             }
             
+        except ExecutorSaturatedError:
+            raise
         except Exception as e:
             logger.error(f"Error answering district question: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -302,6 +304,8 @@ def add_complete_district_endpoints(app, vector_store: VectorStore):
         - Export opportunities
         - Contract farming opportunities
         """
+        geo_context = await services.get('geo_context')
+        market_api = await services.get('market_api')
         try:
             # Get market data
             try:
@@ -393,6 +397,7 @@ def add_complete_district_endpoints(app, vector_store: VectorStore):
         Compare profitability of different crops in a specific district.
         Shows which crops are most profitable to grow.
         """
+        margin_calc = await services.get('margin_calculator')
         try:
             if not crops:
                 crops = ['maize', 'sorghum', 'groundnuts', 'cotton', 'tobacco', 'soya']
@@ -8,6 +8,10 @@ from pydantic import BaseModel
 from typing import List, Dict, Optional
 import logging
 
+from src.agents.executors import BoundedExecutor, ExecutorSaturatedError
+from src.api.services import ServiceContainer
+from src.api.responses import json_response
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,14 +24,14 @@ class SyncRequest(BaseModel):
     source_data: Dict
     
 
-def add_sync_endpoints(app, data_sync):
-    """Add external data sync endpoints to FastAPI app."""
+def add_sync_endpoints(app, services: ServiceContainer, io_executor: Optional[BoundedExecutor] = None):
+    """Add external data sync endpoints to FastAPI app (data_sync is resolved from `services` per request)."""
+    io_executor = io_executor or BoundedExecutor('io', max_workers=1, max_queue=32)
     
     @app.get("/api/sync/status")
     async def get_sync_status():
         """Get sync status for all sources."""
-        if data_sync is None:
-            raise HTTPException(status_code=503, detail="Data sync not initialized")
+        data_sync = await services.get('data_sync')
         
         try:
             status = data_sync.get_sync_status()
@@ -42,8 +46,7 @@ def add_sync_endpoints(app, data_sync):
     @app.post("/api/sync/{source}")
     async def sync_source(source: str, request: SyncRequest):
         """Sync data from a specific source."""
-        if data_sync is None:
-            raise HTTPException(status_code=503, detail="Data sync not initialized")
+        data_sync = await services.get('data_sync')
         
         try:
             from src.external.data_sync import DataSource
@@ -52,7 +55,7 @@ def add_sync_endpoints(app, data_sync):
             source_enum = DataSource(source.lower())
             
             # Perform sync
-            record = data_sync.sync_source(source_enum, request.source_data)
+            record = await io_executor.run(data_sync.sync_source, source_enum, request.source_data)
             
             return {
                 "status": record.status,
@@ -64,6 +67,8 @@ def add_sync_endpoints(app, data_sync):
             }
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid source: {source}")
+        except ExecutorSaturatedError:
+            raise
         except Exception as e:
             logger.error(f"Error syncing source {source}: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -71,16 +76,15 @@ def add_sync_endpoints(app, data_sync):
     @app.get("/api/sync/data/{data_type}")
     async def get_synced_data_by_type(data_type: str):
         """Get all synced data of a specific type."""
-        if data_sync is None:
-            raise HTTPException(status_code=503, detail="Data sync not initialized")
+        data_sync = await services.get('data_sync')
         
         try:
             data = data_sync.get_data_by_type(data_type)
-            return {
+            return json_response({
                 "data_type": data_type,
                 "count": len(data),
                 "data": [entry.to_dict() for entry in data]
-            }
+            })
         except Exception as e:
             logger.error(f"Error getting synced data: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -88,8 +92,7 @@ def add_sync_endpoints(app, data_sync):
     @app.get("/api/sync/statistics")
     async def get_sync_statistics():
         """Get overall sync statistics."""
-        if data_sync is None:
-            raise HTTPException(status_code=503, detail="Data sync not initialized")
+        data_sync = await services.get('data_sync')
         
         try:
             stats = data_sync.get_statistics()
@@ -135,17 +138,18 @@ class EvidenceReview(BaseModel):
     changes_requested: Optional[List[str]] = None
 
 
-def add_evc_endpoints(app, evc_tracker):
-    """Add EVC tracking endpoints to FastAPI app."""
+def add_evc_endpoints(app, services: ServiceContainer, io_executor: Optional[BoundedExecutor] = None):
+    """Add EVC tracking endpoints to FastAPI app (evc_tracker is resolved from `services` per request)."""
+    io_executor = io_executor or BoundedExecutor('io', max_workers=1, max_queue=32)
     
     @app.post("/api/evc/verifiers/register")
     async def register_verifier(request: VerifierRegistration):
         """Register a new verifier."""
-        if evc_tracker is None:
-            raise HTTPException(status_code=503, detail="EVC tracker not initialized")
+        evc_tracker = await services.get('evc_tracker')
         
         try:
-            verifier = evc_tracker.register_verifier(
+            verifier = await io_executor.run(
+                evc_tracker.register_verifier,
                 name=request.name,
                 role=request.role,
                 organization=request.organization,
@@ -158,6 +162,8 @@ def add_evc_endpoints(app, evc_tracker):
                 "status": "registered",
                 "verifier": verifier.to_dict()
             }
+        except ExecutorSaturatedError:
+            raise
         except Exception as e:
             logger.error(f"Error registering verifier: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -165,8 +171,7 @@ def add_evc_endpoints(app, evc_tracker):
     @app.get("/api/evc/verifiers")
     async def list_verifiers():
         """List all registered verifiers."""
-        if evc_tracker is None:
-            raise HTTPException(status_code=503, detail="EVC tracker not initialized")
+        evc_tracker = await services.get('evc_tracker')
         
         try:
             verifiers = [v.to_dict() for v in evc_tracker.verifiers_db.values()]
@@ -181,8 +186,7 @@ def add_evc_endpoints(app, evc_tracker):
     @app.get("/api/evc/verifiers/{verifier_id}/statistics")
     async def get_verifier_statistics(verifier_id: str):
         """Get statistics for a specific verifier."""
-        if evc_tracker is None:
-            raise HTTPException(status_code=503, detail="EVC tracker not initialized")
+        evc_tracker = await services.get('evc_tracker')
         
         try:
             stats = evc_tracker.get_verifier_statistics(verifier_id)
@@ -198,11 +202,11 @@ def add_evc_endpoints(app, evc_tracker):
     @app.post("/api/evc/evidence/submit")
     async def submit_evidence(request: EvidenceSubmission):
         """Submit new evidence for verification."""
-        if evc_tracker is None:
-            raise HTTPException(status_code=503, detail="EVC tracker not initialized")
+        evc_tracker = await services.get('evc_tracker')
         
         try:
-            evidence = evc_tracker.submit_evidence(
+            evidence = await io_executor.run(
+                evc_tracker.submit_evidence,
                 title=request.title,
                 content=request.content,
                 evidence_type=request.evidence_type,
@@ -219,6 +223,8 @@ def add_evc_endpoints(app, evc_tracker):
                 "status": "submitted",
                 "evidence": evidence.to_dict()
             }
+        except ExecutorSaturatedError:
+            raise
         except Exception as e:
             logger.error(f"Error submitting evidence: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -226,8 +232,7 @@ def add_evc_endpoints(app, evc_tracker):
     @app.get("/api/evc/evidence/{evidence_id}")
     async def get_evidence(evidence_id: str):
         """Get specific evidence by ID."""
-        if evc_tracker is None:
-            raise HTTPException(status_code=503, detail="EVC tracker not initialized")
+        evc_tracker = await services.get('evc_tracker')
         
         try:
             evidence = evc_tracker.get_evidence(evidence_id)
@@ -243,16 +248,15 @@ def add_evc_endpoints(app, evc_tracker):
     @app.get("/api/evc/evidence/status/{status}")
     async def get_evidence_by_status(status: str):
         """Get all evidence with specific status."""
-        if evc_tracker is None:
-            raise HTTPException(status_code=503, detail="EVC tracker not initialized")
+        evc_tracker = await services.get('evc_tracker')
         
         try:
             evidence_list = evc_tracker.get_evidence_by_status(status)
-            return {
+            return json_response({
                 "status": status,
                 "count": len(evidence_list),
                 "evidence": [e.to_dict() for e in evidence_list]
-            }
+            })
         except Exception as e:
             logger.error(f"Error getting evidence by status: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -260,11 +264,11 @@ def add_evc_endpoints(app, evc_tracker):
     @app.post("/api/evc/evidence/{evidence_id}/review")
     async def review_evidence(evidence_id: str, request: EvidenceReview):
         """Review evidence."""
-        if evc_tracker is None:
-            raise HTTPException(status_code=503, detail="EVC tracker not initialized")
+        evc_tracker = await services.get('evc_tracker')
         
         try:
-            success = evc_tracker.review_evidence(
+            success = await io_executor.run(
+                evc_tracker.review_evidence,
                 evidence_id=evidence_id,
                 verifier_id=request.verifier_id,
                 approve=request.approve,
@@ -280,7 +284,7 @@ def add_evc_endpoints(app, evc_tracker):
                 "evidence_id": evidence_id,
                 "approved": request.approve
             }
-        except HTTPException:
+        except (HTTPException, ExecutorSaturatedError):
             raise
         except Exception as e:
             logger.error(f"Error reviewing evidence: {e}")
@@ -289,11 +293,10 @@ def add_evc_endpoints(app, evc_tracker):
     @app.post("/api/evc/evidence/{evidence_id}/approve")
     async def approve_evidence(evidence_id: str, approver_id: str):
         """Give final approval to evidence."""
-        if evc_tracker is None:
-            raise HTTPException(status_code=503, detail="EVC tracker not initialized")
+        evc_tracker = await services.get('evc_tracker')
         
         try:
-            success = evc_tracker.approve_evidence(evidence_id, approver_id)
+            success = await io_executor.run(evc_tracker.approve_evidence, evidence_id, approver_id)
             
             if not success:
                 raise HTTPException(status_code=404, detail="Evidence or approver not found")
@@ -302,7 +305,7 @@ def add_evc_endpoints(app, evc_tracker):
                 "status": "approved",
                 "evidence_id": evidence_id
             }
-        except HTTPException:
+        except (HTTPException, ExecutorSaturatedError):
             raise
         except Exception as e:
             logger.error(f"Error approving evidence: {e}")
@@ -311,12 +314,14 @@ def add_evc_endpoints(app, evc_tracker):
     @app.get("/api/evc/statistics")
     async def get_evc_statistics():
         """Get overall EVC system statistics."""
-        if evc_tracker is None:
-            raise HTTPException(status_code=503, detail="EVC tracker not initialized")
+        evc_tracker = await services.get('evc_tracker')
         
         try:
-            stats = evc_tracker.get_system_statistics()
+            # Expires overdue evidence, which saves the evidence file
+            stats = await io_executor.run(evc_tracker.get_system_statistics)
             return stats
+        except ExecutorSaturatedError:
+            raise
         except Exception as e:
             logger.error(f"Error getting EVC statistics: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -356,21 +361,22 @@ class YearComparisonRequest(BaseModel):
     aggregation: str = "average"
 
 
-def add_historical_endpoints(app, historical_archive):
-    """Add historical archive endpoints to FastAPI app."""
+def add_historical_endpoints(app, services: ServiceContainer, io_executor: Optional[BoundedExecutor] = None):
+    """Add historical archive endpoints to FastAPI app (historical_archive is resolved from `services` per request)."""
+    io_executor = io_executor or BoundedExecutor('io', max_workers=1, max_queue=32)
     
     @app.post("/api/historical/add")
     async def add_data_point(request: DataPointSubmission):
         """Add a historical data point."""
-        if historical_archive is None:
-            raise HTTPException(status_code=503, detail="Historical archive not initialized")
+        historical_archive = await services.get('historical_archive')
         
         try:
             from src.historical.archive import DataCategory
             
             category = DataCategory(request.category.lower())
             
-            success = historical_archive.add_data_point(
+            success = await io_executor.run(
+                historical_archive.add_data_point,
                 category=category,
                 timestamp=request.timestamp,
                 value=request.value,
@@ -390,6 +396,8 @@ def add_historical_endpoints(app, historical_archive):
             }
         except ValueError as e:
             raise HTTPException(status_code=400, detail=f"Invalid category: {request.category}")
+        except ExecutorSaturatedError:
+            raise
         except Exception as e:
             logger.error(f"Error adding data point: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -397,8 +405,7 @@ def add_historical_endpoints(app, historical_archive):
     @app.post("/api/historical/trend")
     async def analyze_trend(request: TrendRequest):
         """Analyze trend in historical data."""
-        if historical_archive is None:
-            raise HTTPException(status_code=503, detail="Historical archive not initialized")
+        historical_archive = await services.get('historical_archive')
         
         try:
             from src.historical.archive import DataCategory
@@ -428,8 +435,7 @@ def add_historical_endpoints(app, historical_archive):
     @app.post("/api/historical/compare")
     async def compare_years(request: YearComparisonRequest):
         """Compare data between two years."""
-        if historical_archive is None:
-            raise HTTPException(status_code=503, detail="Historical archive not initialized")
+        historical_archive = await services.get('historical_archive')
         
         try:
             from src.historical.archive import DataCategory
@@ -467,8 +473,7 @@ def add_historical_endpoints(app, historical_archive):
         threshold: float = 2.0
     ):
         """Detect anomalies in historical data."""
-        if historical_archive is None:
-            raise HTTPException(status_code=503, detail="Historical archive not initialized")
+        historical_archive = await services.get('historical_archive')
         
         try:
             from src.historical.archive import DataCategory
@@ -503,8 +508,7 @@ def add_historical_endpoints(app, historical_archive):
         years: int = 3
     ):
         """Get seasonal pattern for data."""
-        if historical_archive is None:
-            raise HTTPException(status_code=503, detail="Historical archive not initialized")
+        historical_archive = await services.get('historical_archive')
         
         try:
             from src.historical.archive import DataCategory
@@ -532,8 +536,7 @@ def add_historical_endpoints(app, historical_archive):
     @app.get("/api/historical/statistics")
     async def get_historical_statistics():
         """Get historical archive statistics."""
-        if historical_archive is None:
-            raise HTTPException(status_code=503, detail="Historical archive not initialized")
+        historical_archive = await services.get('historical_archive')
         
         try:
             stats = historical_archive.get_statistics()
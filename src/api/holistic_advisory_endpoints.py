@@ -7,16 +7,11 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional, Dict
 import logging
 
-from src.district.district_context import DistrictContextEngine
-from src.profitability.margin_calculator import GrossMarginCalculator
-from src.recommendations.adaptive_engine import AdaptiveRecommendationEngine
-
 logger = logging.getLogger(__name__)
 
-# Initialize engines
-district_engine = DistrictContextEngine()
-margin_calculator = GrossMarginCalculator()
-recommendation_engine = AdaptiveRecommendationEngine()
+# Engines are resolved per request from the service container (the district
+# and recommendation engines are built on first use)
+_services = None
 
 router = APIRouter(prefix="/advisory", tags=["holistic-advisory"])
 
@@ -24,6 +19,7 @@ router = APIRouter(prefix="/advisory", tags=["holistic-advisory"])
 @router.get("/districts")
 async def list_districts():
     """List all available districts."""
+    district_engine = await _services.get('district_engine')
     try:
         districts = district_engine.list_all_districts()
         return {
@@ -38,6 +34,7 @@ async def list_districts():
 @router.get("/district/{district}")
 async def get_district_overview(district: str):
     """Get comprehensive overview for a district."""
+    district_engine = await _services.get('district_engine')
     try:
         overview = district_engine.get_district_overview(district)
         if "error" in overview:
@@ -51,6 +48,7 @@ async def get_district_overview(district: str):
 @router.get("/district/{district}/cited")
 async def get_district_cited(district: str):
     """Get district data with full citations and evidence."""
+    district_engine = await _services.get('district_engine')
     try:
         # Get cited data
         cited_data = district_engine.district_cited_data.get(district)
@@ -83,6 +81,7 @@ async def get_district_cited(district: str):
 @router.get("/district/{district}/viable-crops")
 async def get_viable_crops(district: str):
     """Get viable crop recommendations for a district."""
+    district_engine = await _services.get('district_engine')
     try:
         viable = district_engine.get_viable_crops(district)
         if not viable:
@@ -104,6 +103,7 @@ async def get_margin_analysis(
     price_per_tonne: Optional[float] = Query(None, description="Override price in ZWL")
 ):
     """Get gross margin analysis for a crop in a district."""
+    margin_calculator = await _services.get('margin_calculator')
     try:
         margin = margin_calculator.calculate_margin(
             crop=crop,
@@ -120,6 +120,7 @@ async def get_margin_analysis(
 @router.post("/compare-crops/{district}")
 async def compare_crops(district: str, crops: List[str]):
     """Compare margins across multiple crops in a district."""
+    margin_calculator = await _services.get('margin_calculator')
     try:
         if not crops:
             raise HTTPException(status_code=400, detail="No crops provided")
@@ -138,6 +139,7 @@ async def compare_crops(district: str, crops: List[str]):
 @router.get("/breakeven/{crop}/{district}")
 async def get_breakeven(crop: str, district: str):
     """Get breakeven analysis for a crop in a district."""
+    margin_calculator = await _services.get('margin_calculator')
     try:
         analysis = margin_calculator.get_breakeven_analysis(crop, district)
         return analysis
@@ -149,6 +151,7 @@ async def get_breakeven(crop: str, district: str):
 @router.get("/costs/{crop}")
 async def get_cost_breakdown(crop: str):
     """Get detailed cost breakdown for a crop."""
+    margin_calculator = await _services.get('margin_calculator')
     try:
         breakdown = margin_calculator.get_cost_breakdown(crop)
         return breakdown
@@ -160,6 +163,7 @@ async def get_cost_breakdown(crop: str):
 @router.post("/scenarios/{crop}/{district}")
 async def scenario_analysis(crop: str, district: str, scenarios: List[Dict]):
     """Analyze different yield/price scenarios."""
+    margin_calculator = await _services.get('margin_calculator')
     try:
         results = margin_calculator.scenario_analysis(crop, district, scenarios)
         return {
@@ -184,6 +188,9 @@ async def get_holistic_advisory(crop: str, district: str):
     - Supply chain options
     - Nearby city opportunities
     """
+    district_engine = await _services.get('district_engine')
+    margin_calculator = await _services.get('margin_calculator')
+    recommendation_engine = await _services.get('recommendation_engine')
     try:
         # Get all required data
         overview = district_engine.get_district_overview(district)
@@ -239,6 +246,8 @@ async def get_advisory_summary(crop: str, district: str):
 @router.get("/market/{district}/{crop}")
 async def get_market_strategy(district: str, crop: str):
     """Get market strategy and sales recommendations for a crop in a district."""
+    district_engine = await _services.get('district_engine')
+    recommendation_engine = await _services.get('recommendation_engine')
     try:
         market_info = district_engine.get_market_recommendations(district, crop)
         difficulty = district_engine.get_difficulty_assessment(district)
@@ -260,6 +269,7 @@ async def get_market_strategy(district: str, crop: str):
 @router.get("/difficulty/{district}")
 async def get_difficulty_assessment(district: str):
     """Get farming difficulty assessment for a district."""
+    district_engine = await _services.get('district_engine')
     try:
         assessment = district_engine.get_difficulty_assessment(district)
         return assessment
@@ -271,6 +281,7 @@ async def get_difficulty_assessment(district: str):
 @router.get("/seasonal-calendar/{district}")
 async def get_seasonal_calendar(district: str):
     """Get seasonal farming calendar for a district."""
+    district_engine = await _services.get('district_engine')
     try:
         calendar = district_engine.get_seasonal_calendar(district)
         return calendar
@@ -282,6 +293,7 @@ async def get_seasonal_calendar(district: str):
 @router.get("/nearby-districts/{district}")
 async def get_nearby_districts(district: str):
     """Get nearby districts for supply chain optimization."""
+    district_engine = await _services.get('district_engine')
     try:
         nearby = district_engine.get_nearby_districts(district)
         return {
@@ -340,6 +352,14 @@ async def get_batch_advisory(queries: List[Dict]):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def add_holistic_advisory_endpoints(app):
-    """Add holistic advisory endpoints to the FastAPI app."""
+def add_holistic_advisory_endpoints(app, services):
+    """Add holistic advisory endpoints to the FastAPI app.
+    
+    Args:
+        app: FastAPI app
+        services: ServiceContainer providing district_engine, margin_calculator
+            and recommendation_engine
+    """
+    global _services
+    _services = services
     app.include_router(router)
@@ -3,23 +3,39 @@ FastAPI application for Agriculture RAG Platform.
 Provides REST API endpoints for querying the knowledge base.
 """
 
+import asyncio
+import json
+import math
 import os
 import sys
+import time
 from pathlib import Path
 from typing import List, Dict, Optional
 import logging
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
 import yaml
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-import threading
+from src.agents.llm_scheduler import llm_priority_scope
+from src.agents.executors import ExecutorGroup, ExecutorSaturatedError
+from src.monitoring.metrics import REGISTRY
+from src.monitoring.tracing import SlowQueryLog, set_attributes, start_trace
+from src.monitoring import collectors
+from src.api.readiness import ReadinessGate, ServiceUnavailableError
+from src.api.services import ServiceContainer
+from src.api.prefork import PreforkServer, process_memory, shared_store, split_limits, worker_id
+from src.api.rate_limit import RateLimiter, RateLimitMiddleware
+from src.api.static_responses import StaticResponseCache
+from src.api.responses import (
+    CompressionMiddleware, json_response, parse_fields, project, set_fast_json, truncate_sources
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,6 +43,7 @@ logger = logging.getLogger(__name__)
 # Global flags for lazy loading
 models_loaded = False
 loading_models = False
+_background_tasks = set()  # Keeps startup tasks (service loading, LLM warm-up) referenced
 
 # Load configuration with fallback
 try:
@@ -48,6 +65,10 @@ except Exception as e:
         'llm': {'model': 'mistral', 'base_url': 'http://localhost:11434'}
     }
 
+# Allow perf runs to swap the LLM backend without editing config.yaml
+if os.environ.get('LLM_PROVIDER'):
+    config['llm']['provider'] = os.environ['LLM_PROVIDER']
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Agriculture RAG Platform",
@@ -55,6 +76,122 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Bounded thread pools for blocking work (embedding/search, disk I/O)
+executors = ExecutorGroup.from_config(config.get('executors', {}))
+
+# Requests needing a subsystem that is still loading wait for it (up to a deadline)
+readiness = ReadinessGate.from_config(config.get('readiness', {}))
+# Builds each service once, concurrently where dependencies allow (see register_services)
+services = ServiceContainer.from_config(readiness, config.get('services', {}))
+
+
+@app.exception_handler(ServiceUnavailableError)
+async def service_unavailable_handler(request: Request, exc: ServiceUnavailableError):
+    """A subsystem failed or is still loading after the wait deadline."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after))}
+    )
+
+
+# Reference data and frontend files serialized once, served with ETags
+static_responses = StaticResponseCache.from_config(config.get('static_responses', {}))
+FRONTEND_DIR = Path(__file__).parent.parent.parent / "frontend"
+FRONTEND_DATA_FILES = ('crop_budgets_data.json', 'livestock_budgets_data.json')
+
+
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturatedError):
+    """Shed load with a retry hint instead of queueing without bound."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after))}
+    )
+
+
+# Per-client token buckets for LLM-backed and lookup routes. Added first so it is
+# innermost: rejections still get CORS headers and show up in request metrics.
+rate_limit_config = config.get('rate_limit', {})
+rate_limiter = RateLimiter.from_config(rate_limit_config) if rate_limit_config.get('enabled', True) else None
+if rate_limiter is not None:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
+
+def configure_workers(workers: int):
+    """Split per-process limits between pre-forked workers (called by the master before forking)."""
+    split_limits(config, workers)
+    if workers > 1 and rate_limiter is not None and rate_limiter.shared_path is None:
+        shared_config = config['rate_limit']['shared']
+        rate_limiter.share(shared_config.get('path', '/dev/shm/agri-rate-limit'), shared_config.get('slots', 65536))
+
+
+HTTP_REQUESTS = REGISTRY.counter('agri_http_requests_total', 'HTTP requests', ['method', 'route', 'status'])
+HTTP_DURATION = REGISTRY.histogram(
+    'agri_http_request_duration_seconds', 'HTTP request latency until response start', ['method', 'route']
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge('agri_http_requests_in_flight', 'HTTP requests being handled')
+_route_paths: Dict = {}
+
+
+def _route_template(request: Request) -> str:
+    """Route path template (e.g. /weather/{district_name}) so labels stay low-cardinality."""
+    endpoint = request.scope.get('endpoint')
+    if endpoint is None:
+        return 'unmatched'
+    path = _route_paths.get(endpoint)
+    if path is None:
+        # Routes are also registered after startup (extended endpoints); refresh on a miss
+        _route_paths.update({getattr(r, 'endpoint', None): r.path for r in app.routes})
+        path = _route_paths.get(endpoint, 'unmatched')
+    return path
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count and time every HTTP request across all routers."""
+    start = time.perf_counter()
+    HTTP_IN_FLIGHT.labels().inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.labels().dec()
+        route = _route_template(request)
+        HTTP_DURATION.labels(request.method, route).observe(time.perf_counter() - start)
+        HTTP_REQUESTS.labels(request.method, route, status).inc()
+
+
+tracing_config = config.get('tracing', {})
+slow_query_log = SlowQueryLog.from_config(tracing_config) if tracing_config.get('enabled', True) else None
+trace_header = tracing_config.get('debug_header', 'X-Debug-Trace')
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Trace every request, log slow ones and return the trace inline when asked."""
+    if slow_query_log is None:
+        return await call_next(request)
+    
+    with start_trace(f"{request.method} {request.url.path}") as trace:
+        response = await call_next(request)
+    response.headers['X-Trace-Id'] = trace.trace_id
+    slow_query_log.maybe_write(trace, method=request.method, path=request.url.path, status=response.status_code)
+    
+    if trace_header and request.headers.get(trace_header) and \
+            response.headers.get('content-type', '').startswith('application/json'):
+        body = b''.join([chunk async for chunk in response.body_iterator])
+        data = json.loads(body)
+        if isinstance(data, dict):
+            data['trace'] = trace.to_dict()
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in ('content-length', 'content-type')}
+        return JSONResponse(content=data, status_code=response.status_code, headers=headers)
+    return response
+
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -64,15 +201,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# orjson for the large-payload routes; gzip/brotli for bodies above the threshold.
+# Added last so it is outermost and compresses what the tracing middleware returns.
+set_fast_json(config['api'].get('fast_json', True))
+compression_config = config['api'].get('compression', {})
+if compression_config.get('enabled', True):
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=compression_config.get('minimum_size', 1024),
+        gzip_level=compression_config.get('gzip_level', 6),
+        brotli_quality=compression_config.get('brotli_quality', 4),
+        brotli_enabled=compression_config.get('brotli', True)
+    )
+
 # Initialize vector store, agent, geo context, weather API, and market prices
 vector_store = None
 rag_agent = None
 geo_context = None
 weather_api = None
 market_api = None
+intent_router = None
 data_sync = None
 evc_tracker = None
 historical_archive = None
+llm_client = None
+chat_sessions = None
+STARTUP_SERVICES = ('geo_context', 'weather_api', 'market_api', 'intent_router')
+SERVICE_GLOBALS = {
+    'vector_store', 'rag_agent', 'geo_context', 'weather_api', 'market_api', 'intent_router',
+    'data_sync', 'evc_tracker', 'historical_archive', 'llm_client', 'chat_sessions'
+}
 
 
 class QueryRequest(BaseModel):
@@ -82,6 +240,21 @@ class QueryRequest(BaseModel):
     district: Optional[str] = None
     latitude: Optional[float] = None
     longitude: Optional[float] = None
+    fields: Optional[List[str]] = None  # Projection, e.g. ["response", "sources"]; None returns everything
+    source_chars: Optional[int] = Field(default=None, ge=0)  # Cap on each source's content
+
+
+class BatchQueryItem(BaseModel):
+    id: Optional[str] = None
+    query: str
+    district: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+class BatchQueryRequest(BaseModel):
+    items: List[BatchQueryItem]
+    include_translations: bool = False
 
 
 class ChatMessage(BaseModel):
@@ -94,6 +267,8 @@ class ChatRequest(BaseModel):
     district: Optional[str] = None
     latitude: Optional[float] = None
     longitude: Optional[float] = None
+    fields: Optional[List[str]] = None  # Projection over CHAT_FIELDS; None returns response, role, degraded
+    source_chars: Optional[int] = Field(default=None, ge=0)
 
 
 class QueryResponse(BaseModel):
@@ -106,97 +281,314 @@ class QueryResponse(BaseModel):
     translations: Optional[Dict] = None
     confidence: Optional[Dict] = None
     reconciliation: Optional[Dict] = None
+    context_stats: Optional[Dict] = None
+    cache: Optional[str] = None
+    data: Optional[Dict] = None
+    degraded: bool = False
 
 
-def load_heavy_models():
-    """Load ML models in background thread."""
-    global vector_store, rag_agent, data_sync, evc_tracker, historical_archive, models_loaded, loading_models
+QUERY_FIELDS = set(QueryResponse.model_fields)
+CHAT_FIELDS = {'response', 'role', 'degraded', 'sources'}
+CHAT_DEFAULT_FIELDS = {'response', 'role', 'degraded'}
+SEARCH_FIELDS = {'content', 'metadata', 'distance', 'id', 'similarity_score'}
+
+
+def _requested_fields(fields, allowed: set) -> Optional[set]:
+    """Parse a projection, rejecting names the endpoint does not return."""
+    fields = parse_fields(fields)
+    unknown = fields - allowed if fields else None
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Valid: {', '.join(sorted(allowed))}"
+        )
+    return fields
+
+
+def register_services():
+    """Declare every service and its dependencies; heavy imports stay inside the factories.
     
-    if loading_models or models_loaded:
-        return
+    Independent services (LLM client, vector store, geo/weather/market data)
+    build concurrently; each consumer gets the same instance, so the agent,
+    its context enricher, the intent router and the district endpoints share
+    one GeoContext, and the agent and translation share one translator.
+    Rarely used stores and engines are built on first request. Services
+    marked preload are read-only; a pre-fork master builds them once and its
+    workers share them (see src/api/prefork.py).
+    """
+    project_root = Path(__file__).parent.parent.parent
+    chat_config = config.get('chat', {})
     
-    loading_models = True
-    logger.info("Background: Loading heavy ML models...")
+    async def build_llm_client():
+        from src.agents.llm_backends import create_llm_backend
+        client = create_llm_backend(config['llm'])
+        # Load the LLM into memory while the embedding model and vector store load
+        _background_tasks.add(asyncio.create_task(client.warm_up()))
+        return client
     
-    try:
+    def build_embedding_model():
+        from src.embeddings.vector_store import load_embedding_model
+        return load_embedding_model(config['embeddings']['model_name'])
+    
+    def build_geo_context():
+        from src.geo.geo_context import GeoContext
+        return GeoContext()
+    
+    def build_weather_api():
+        from src.weather.weather_api import WeatherAPI
+        return WeatherAPI()
+    
+    def build_market_api():
+        from src.markets.market_api import MarketPricesAPI
+        return MarketPricesAPI()
+    
+    def build_margin_calculator():
+        from src.profitability.margin_calculator import GrossMarginCalculator
+        return GrossMarginCalculator()
+    
+    def build_intent_router(geo_context, weather_api, market_api, margin_calculator):
+        from src.agents.intent_router import IntentRouter
+        return IntentRouter(
+            geo_context, weather_api, market_api, margin_calculator,
+            gross_margins=config.get('router', {}).get('gross_margins', False)
+        )
+    
+    def build_chat_sessions():
+        from src.agents.chat_sessions import ChatSessionStore
+        return ChatSessionStore.from_config(chat_config)
+    
+    def build_vector_store(embedding_model):
         from src.embeddings.vector_store import VectorStore
+        vector_db_path = project_root / "data" / "vector_db"
+        if not vector_db_path.exists():
+            raise FileNotFoundError(f"no vector database at {vector_db_path}")
+        return VectorStore(
+            persist_directory=str(vector_db_path),
+            collection_name=config['vector_store']['collection_name'],
+            embedding_model=embedding_model
+        )
+    
+    def build_translator(llm_client):
+        from src.translation.local_language import LocalLanguageTranslator
+        return LocalLanguageTranslator(
+            llm_model=config['llm']['model'],
+            llm_base_url=config['llm']['base_url'],
+            client=llm_client
+        )
+    
+    def build_rag_agent(vector_store, llm_client, geo_context, translator):
         from src.agents.rag_agent import AgricultureRAGAgent
+        from src.agents.context_packer import ContextPacker
+        from src.agents.context_compressor import ContextCompressor
+        from src.agents.answer_cache import AnswerCache
+        from src.agents.conversation_memory import ConversationCompactor
+        from src.agents.circuit_breaker import CircuitBreaker
+        from src.agents.tool_fanout import ToolFanout
         
-        vector_db_path = Path(__file__).parent.parent.parent / "data" / "vector_db"
-        if vector_db_path.exists():
-            vector_store = VectorStore(
-                persist_directory=str(vector_db_path),
-                collection_name=config['vector_store']['collection_name'],
-                embedding_model=config['embeddings']['model_name']
-            )
-            rag_agent = AgricultureRAGAgent(
-                vector_store=vector_store,
-                llm_model=config['llm']['model'],
-                llm_base_url=config['llm']['base_url']
-            )
-            logger.info("✓ Vector store and RAG agent loaded")
+        compression_config = config.get('context', {}).get('compression', {})
+        cache_config = config.get('cache', {})
+        
+        def reload_geo_data():
+            geo_context.reload()
+            if 'districts' in static_responses:
+                static_responses.refresh('districts')
         
+        agent = AgricultureRAGAgent(
+            vector_store=vector_store,
+            llm_model=config['llm']['model'],
+            llm_base_url=config['llm']['base_url'],
+            llm_client=llm_client,
+            context_packer=ContextPacker.from_config(
+                config.get('context', {}), chunk_overlap=config['embeddings'].get('chunk_overlap')
+            ),
+            context_compressor=(
+                ContextCompressor.from_config(compression_config, vector_store.embedding_model)
+                if compression_config.get('enabled') else None
+            ),
+            answer_cache=(
+                AnswerCache.from_config(
+                    cache_config, data_files=[str(geo_context.provinces_json_path)], on_data_change=reload_geo_data
+                )
+                if cache_config.get('enabled', True) else None
+            ),
+            chat_drift_threshold=chat_config.get('drift_threshold', 0.75),
+            llm_keep_alive=chat_config.get('keep_alive', '30m'),
+            llm_deadline_seconds=config['llm'].get('deadline_seconds'),
+            circuit_breaker=CircuitBreaker.from_config(config['llm'].get('circuit_breaker', {})),
+            retrieval_mode=config.get('retrieval', {}).get('mode', 'semantic'),
+            tool_fanout=ToolFanout.from_config(
+                vector_store, config.get('retrieval', {}).get('fanout', {}),
+                search_executor=executors.search, io_executor=executors.io
+            ),
+            executors=executors,
+            geo_context=geo_context,
+            translator=translator
+        )
+        agent.conversation_compactor = ConversationCompactor.from_config(chat_config, agent.llm)
+        return agent
+    
+    # Writable JSON stores: when pre-forked, each worker's copy reloads what others wrote
+    def build_data_sync():
         from src.external.data_sync import ExternalDataSync
+        return shared_store(ExternalDataSync, './data/external_sync', {
+            'synced_data': '_load_synced_data', 'sync_log': '_load_sync_log', 'config': '_load_config'
+        }, writes=('sync_source',))
+    
+    def build_evc_tracker():
         from src.verification.evc_tracker import EVCTracker
+        return shared_store(EVCTracker, './data/evc', {
+            'evidence_db': '_load_evidence', 'verifiers_db': '_load_verifiers', 'workflow_history': '_load_workflow_log'
+        }, writes=(
+            'register_verifier', 'submit_evidence', 'assign_verifiers', 'review_evidence', 'approve_evidence',
+            # Both expire overdue evidence and save it
+            'get_expired_evidence', 'get_system_statistics'
+        ))
+    
+    def build_historical_archive():
         from src.historical.archive import HistoricalDataArchive
-        
-        data_sync = ExternalDataSync()
-        evc_tracker = EVCTracker()
-        historical_archive = HistoricalDataArchive()
-        
-        # Register extended endpoints
-        from src.api.endpoints_extended import add_sync_endpoints, add_evc_endpoints, add_historical_endpoints
-        from src.api.holistic_advisory_endpoints import add_holistic_advisory_endpoints
-        from src.api.district_complete_endpoints import add_complete_district_endpoints
-        if data_sync:
-            add_sync_endpoints(app, data_sync)
-        if evc_tracker:
-            add_evc_endpoints(app, evc_tracker)
-        if historical_archive:
-            add_historical_endpoints(app, historical_archive)
-        add_holistic_advisory_endpoints(app)
-        if vector_store:
-            add_complete_district_endpoints(app, vector_store)
-        
-        models_loaded = True
-        logger.info("✓ All heavy models loaded successfully")
+        return shared_store(
+            HistoricalDataArchive, './data/historical', {'timeseries_db': '_load_data'}, writes=('add_data_point',)
+        )
+    
+    def build_district_engine():
+        from src.district.district_context import DistrictContextEngine
+        return DistrictContextEngine()
+    
+    def build_recommendation_engine():
+        from src.recommendations.adaptive_engine import AdaptiveRecommendationEngine
+        return AdaptiveRecommendationEngine()
+    
+    services.register('llm_client', build_llm_client)
+    services.register('embedding_model', build_embedding_model, preload=True)
+    services.register('geo_context', build_geo_context, preload=True)
+    services.register('weather_api', build_weather_api)
+    services.register('market_api', build_market_api, preload=True)
+    services.register('margin_calculator', build_margin_calculator, preload=True)
+    if config.get('router', {}).get('enabled', True):
+        services.register(
+            'intent_router', build_intent_router,
+            depends_on=('geo_context', 'weather_api', 'market_api', 'margin_calculator')
+        )
+    services.register('chat_sessions', build_chat_sessions)
+    # Chroma's SQLite connection is per process, so each worker opens its own
+    services.register('vector_store', build_vector_store, depends_on=('embedding_model',))
+    services.register('translator', build_translator, depends_on=('llm_client',))
+    services.register(
+        'rag_agent', build_rag_agent, depends_on=('vector_store', 'llm_client', 'geo_context', 'translator')
+    )
+    # Only a handful of routes use these; build them when first requested
+    services.register('data_sync', build_data_sync, lazy=True)
+    services.register('evc_tracker', build_evc_tracker, lazy=True)
+    services.register('historical_archive', build_historical_archive, lazy=True)
+    services.register('district_engine', build_district_engine, lazy=True, preload=True)
+    services.register('recommendation_engine', build_recommendation_engine, lazy=True, preload=True)
+
+
+def publish_service(name: str, instance):
+    """Expose a freshly built service through the module global of the same name."""
+    if name in SERVICE_GLOBALS:
+        globals()[name] = instance
+    if name == 'vector_store':
+        # Requests read the cached index version; ingestion by other processes is picked up here
+        _background_tasks.add(asyncio.create_task(instance.watch_index_version(executors.io)))
+
+
+async def load_services():
+    """Build the eager services concurrently, each once its dependencies are ready."""
+    global models_loaded, loading_models
+    
+    loading_models = True
+    logger.info("Background: loading services...")
+    try:
+        await services.start(on_ready=publish_service)
+        failed = [s['service'] for s in services.timeline()['services'] if 'error' in s]
+        models_loaded = not failed
+        timeline = services.timeline()
+        logger.info(
+            f"✓ Services loaded in {timeline['time_to_ready_ms']:.0f}ms "
+            f"({timeline['serial_ms']:.0f}ms if built one after another)"
+            + (f"; unavailable: {', '.join(failed)}" if failed else "")
+        )
     except Exception as e:
-        logger.error(f"Failed to load models: {e}")
+        logger.error(f"Failed to load services: {e}")
+        # Requests parked on anything not loaded yet get a 503 instead of waiting out the deadline
+        readiness.fail_pending(e)
     finally:
         loading_models = False
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Fast startup - only init lightweight services."""
-    global geo_context, weather_api, market_api
-    
+    """Fast startup - wait only for the lightweight reference data."""
     logger.info("✓ Fast boot: lightweight services only")
     
-    try:
-        from src.geo.geo_context import GeoContext
-        geo_context = GeoContext()
-        logger.info("✓ Geographic context ready")
-    except Exception as e:
-        logger.warning(f"GeoContext init failed: {e}")
+    if not len(services):  # A pre-fork master has already registered (and preloaded) them
+        register_services()
+    _background_tasks.add(asyncio.create_task(load_services()))
     
-    try:
-        from src.weather.weather_api import WeatherAPI
-        weather_api = WeatherAPI()
-        logger.info("✓ Weather API ready")
-    except Exception as e:
-        logger.warning(f"WeatherAPI init failed: {e}")
+    # The static responses and the intent router's fast paths use these, so serve once they are in
+    await services.wait_for(*(name for name in STARTUP_SERVICES if name in services))
+    precompute_static_responses()
+    register_extended_endpoints()
+    logger.info("✓ API ready! Heavy models loading in background...")
+
+
+def register_extended_endpoints():
+    """Register the extended routes up front; each binds its service on first use.
     
-    try:
-        from src.markets.market_api import MarketPricesAPI
-        market_api = MarketPricesAPI()
-        logger.info("✓ Market API ready")
-    except Exception as e:
-        logger.warning(f"Markets init failed: {e}")
+    Requests arriving while a service loads wait for it instead of getting a
+    404 (route not yet added) or a 503 (service still None); lazy services
+    are built by the first request that needs them.
+    """
+    from src.api.endpoints_extended import add_sync_endpoints, add_evc_endpoints, add_historical_endpoints
+    from src.api.holistic_advisory_endpoints import add_holistic_advisory_endpoints
+    from src.api.district_complete_endpoints import add_complete_district_endpoints
     
-    # Start background loading
-    threading.Thread(target=load_heavy_models, daemon=True).start()
-    logger.info("✓ API ready! Heavy models loading in background...")
+    add_sync_endpoints(app, services, io_executor=executors.io)
+    add_evc_endpoints(app, services, io_executor=executors.io)
+    add_historical_endpoints(app, services, io_executor=executors.io)
+    add_holistic_advisory_endpoints(app, services)
+    add_complete_district_endpoints(app, services, executors=executors)
+
+
+def precompute_static_responses():
+    """Serialize and compress the static reference responses once.
+    
+    Call static_responses.refresh() after reloading GeoContext or market
+    data; frontend files are rebuilt automatically when they change on disk.
+    """
+    files = [('index', FRONTEND_DIR / "index.html", 'text/html; charset=utf-8')] + [
+        (name, FRONTEND_DIR / name, 'application/json') for name in FRONTEND_DATA_FILES
+    ]
+    builders = []
+    if geo_context is not None:
+        builders.append(('districts', build_districts_payload))
+    if market_api is not None:
+        builders += [('markets', market_api.get_all_markets), ('market_trends', market_api.get_price_trends)]
+    
+    for key, path, media_type in files:
+        if path.exists():
+            try:
+                static_responses.register_file(key, str(path), media_type)
+            except Exception as e:
+                logger.warning(f"Could not precompute {key}: {e}")
+    for key, builder in builders:
+        try:
+            static_responses.register(key, builder)
+        except Exception as e:
+            logger.warning(f"Could not precompute {key}: {e}")
+    logger.info(f"✓ Precomputed {len(static_responses.get_stats()['entries'])} static responses")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled HTTP connections."""
+    if llm_client is not None:
+        await llm_client.close()
+    if weather_api is not None:
+        await weather_api.close()
+    services.shutdown()
+    executors.shutdown()
 
 
 @app.get("/health")
@@ -217,18 +609,54 @@ async def ready():
             "market_api": market_api is not None,
             "vector_store": vector_store is not None,
             "rag_agent": rag_agent is not None
-        }
+        },
+        "executors": executors.get_stats(),
+        "rate_limit": rate_limiter.get_stats() if rate_limiter else None,
+        "slow_query_log": slow_query_log.get_stats() if slow_query_log else None,
+        "subsystems": readiness.get_stats(),
+        "startup": services.timeline(),
+        "process": {"pid": os.getpid(), "worker": worker_id(), "memory": process_memory()},
+        "static_responses": static_responses.get_stats(),
+        "intent_router": intent_router.get_stats() if intent_router else None,
+        "llm": llm_client.get_stats() if llm_client else None,
+        "llm_circuit": rag_agent.llm.circuit_breaker.get_stats() if rag_agent else None,
+        "query_coalescing": rag_agent.single_flight.get_stats() if rag_agent else None,
+        "answer_cache": rag_agent.answer_cache.get_stats() if rag_agent and rag_agent.answer_cache else None,
+        "chat_sessions": chat_sessions.get_stats() if chat_sessions else None,
+        "conversation_memory": rag_agent.conversation_compactor.get_stats() if rag_agent else None
     }
 
 
+def collect_service_metrics():
+    """Copy subsystem stats into metrics at scrape time."""
+    collectors.record_executor_stats(executors.get_stats())
+    if rate_limiter is not None:
+        collectors.record_rate_limit_stats(rate_limiter.get_stats())
+    if intent_router is not None:
+        collectors.record_router_stats(intent_router.get_stats())
+    if llm_client is not None:
+        collectors.record_llm_stats(llm_client.get_stats())
+    if rag_agent is not None:
+        collectors.record_circuit_stats(rag_agent.llm.circuit_breaker.get_stats())
+        collectors.record_coalescing_stats(rag_agent.single_flight.get_stats())
+        if rag_agent.answer_cache is not None:
+            collectors.record_cache_stats(rag_agent.answer_cache.get_stats())
+
+
+REGISTRY.register_collector(collect_service_metrics)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text-format metrics."""
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/", response_class=HTMLResponse)
-async def root():
+async def root(request: Request):
     """Serve the main web interface."""
-    html_file = Path(__file__).parent.parent.parent / "frontend" / "index.html"
-    
-    if html_file.exists():
-        with open(html_file, 'r') as f:
-            return HTMLResponse(content=f.read())
+    if 'index' in static_responses:
+        return static_responses.respond('index', request)
     
     return HTMLResponse(content="""
     <html>
@@ -241,30 +669,63 @@ async def root():
     """)
 
 
+@app.get("/crop_budgets_data.json")
+@app.get("/livestock_budgets_data.json")
+async def frontend_data(request: Request):
+    """Budget data fetched by the tools and livestock pages (pre-compressed)."""
+    key = request.url.path.lstrip('/')
+    if key not in static_responses:
+        raise HTTPException(status_code=404, detail=f"{key} not available")
+    return static_responses.respond(key, request)
+
+
 
 
 @app.post("/query", response_model=QueryResponse)
 async def query_knowledge_base(request: QueryRequest):
-    """Query the agriculture knowledge base with optional location context."""
-    if rag_agent is None:
-        raise HTTPException(status_code=503, detail="RAG agent not initialized")
+    """Query the agriculture knowledge base with optional location context.
+    
+    `fields` limits the response to the listed sections; translations,
+    reconciliation and citations are only computed when requested.
+    `source_chars` caps the content of each returned source.
+    """
+    set_attributes(query=request.query, district=request.district)
+    fields = _requested_fields(request.fields, QUERY_FIELDS)
+    result = None
+    if intent_router is not None:
+        # Structured lookups (prices, weather, rainfall, margins) skip retrieval and the LLM
+        try:
+            result = await intent_router.route(
+                request.query,
+                district=request.district,
+                lat=request.latitude,
+                lon=request.longitude
+            )
+        except Exception as e:
+            logger.warning(f"Intent router failed, using RAG agent: {e}")
+    
+    if result is None:
+        await readiness.get('rag_agent')
     
     try:
-        # Process query with location context and enhanced features
-        result = rag_agent.query(
-            user_query=request.query,
-            district=request.district,
-            lat=request.latitude,
-            lon=request.longitude,
-            include_translations=True
-        )
+        if result is None:
+            # Process query with location context and enhanced features
+            result = await rag_agent.query(
+                user_query=request.query,
+                district=request.district,
+                lat=request.latitude,
+                lon=request.longitude,
+                include_translations=fields is None or 'translations' in fields,
+                include_reconciliation=fields is None or 'reconciliation' in fields,
+                include_citations=fields is None or bool(fields & {'citations', 'confidence'})
+            )
         
         # Extract confidence from citations
         confidence = None
         if result.get('citations'):
             confidence = result['citations'].get('confidence')
         
-        return QueryResponse(
+        response = QueryResponse(
             query=result['query'],
             response=result['response'],
             sources=result.get('sources', []),
@@ -273,49 +734,232 @@ async def query_knowledge_base(request: QueryRequest):
             citations=result.get('citations'),
             translations=result.get('translations'),
             confidence=confidence,
-            reconciliation=result.get('reconciliation')
-        )
+            reconciliation=result.get('reconciliation'),
+            context_stats=result.get('context_stats'),
+            cache=result.get('cache'),
+            data=result.get('data'),
+            degraded=result.get('degraded', False)
+        ).model_dump()
+        response['sources'] = truncate_sources(response['sources'], request.source_chars)
+        return json_response(project(response, fields))
         
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         logger.error(f"Error processing query: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/query/batch")
+async def query_batch(request: BatchQueryRequest, http_request: Request):
+    """Answer many queries in one call, streaming NDJSON as each item completes.
+    
+    Each output line is {"index", "id", "query", "response", "sources", ...}
+    or {"index", "id", "error"} for items that failed.
+    """
+    await readiness.get('rag_agent')
+    
+    batch_config = config.get('batch', {})
+    max_items = batch_config.get('max_items', 500)
+    if len(request.items) > max_items:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {len(request.items)} items (max {max_items})")
+    client = getattr(http_request.state, 'rate_limit_client', None)
+    bucket = rate_limiter.classify(http_request.url.path) if client is not None else None
+    if bucket and len(request.items) > 1:
+        # A batch costs one token per item from its own bucket class (sized for
+        # max_items), so a full batch is admitted without touching /query's burst
+        burst = rate_limiter.classes[bucket]['burst']
+        if len(request.items) > burst:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch of {len(request.items)} queries exceeds the rate limit burst of {burst:g}; split it into smaller batches"
+            )
+        # The middleware charged one token; each further item costs one more
+        wait = rate_limiter.acquire(client, bucket, cost=len(request.items) - 1)
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded for a batch of {len(request.items)} queries",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))}
+            )
+    
+    items = [
+        {
+            'query': item.query,
+            'district': item.district,
+            'lat': item.latitude,
+            'lon': item.longitude
+        }
+        for item in request.items
+    ]
+    
+    async def stream():
+        with llm_priority_scope('batch'):
+            async for index, result in rag_agent.query_batch(
+                items,
+                include_translations=request.include_translations,
+                max_workers=batch_config.get('max_workers', 4)
+            ):
+                line = {'index': index, 'id': request.items[index].id}
+                if isinstance(result, Exception):
+                    line['error'] = str(result)
+                else:
+                    line.update({
+                        'query': result['query'],
+                        'response': result['response'],
+                        'sources': result.get('sources', []),
+                        'citations': result.get('citations'),
+                        'translations': result.get('translations'),
+                        'geo_context': result.get('geo_context'),
+                        'cache': result.get('cache'),
+                        'degraded': result.get('degraded', False)
+                    })
+                yield json.dumps(line, default=str) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @app.post("/chat")
 async def chat(request: ChatRequest):
-    """Handle multi-turn chat conversations with optional location context."""
-    if rag_agent is None:
-        raise HTTPException(status_code=503, detail="RAG agent not initialized")
+    """Handle multi-turn chat conversations with optional location context.
+    
+    Add "sources" to `fields` to get the retrieved evidence (capped by
+    `source_chars`) alongside the reply.
+    """
+    fields = _requested_fields(request.fields, CHAT_FIELDS) or CHAT_DEFAULT_FIELDS
+    await readiness.get('rag_agent')
     
     try:
         # Convert Pydantic models to dicts
         messages = [{"role": msg.role, "content": msg.content} for msg in request.messages]
         
         # Get response with location context
-        response = rag_agent.chat(
+        result = await rag_agent.chat(
             messages=messages,
             district=request.district,
             lat=request.latitude,
             lon=request.longitude
         )
         
-        return {
-            "response": response,
-            "role": "assistant"
-        }
+        return project({
+            "response": result['response'],
+            "role": "assistant",
+            "degraded": result['degraded'],
+            "sources": truncate_sources(result['sources'], request.source_chars)
+        }, fields)
         
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         logger.error(f"Error in chat: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket):
+    """Stateful chat: history, evidence and LLM context stay server-side.
+    
+    Protocol (JSON messages):
+        -> {"type": "start", "session_id": optional, "district": ..., "latitude": ..., "longitude": ...}
+        <- {"type": "session", "session_id": ..., "resumed": bool}
+        -> {"type": "message", "content": "..."}
+        <- {"type": "response", "content": ..., "retrieved": bool, "sources": [...], "latency_ms": ...}
+        -> {"type": "end"}
+    """
+    await websocket.accept()
+    
+    try:
+        await readiness.get('rag_agent')
+        await readiness.get('chat_sessions')
+    except ServiceUnavailableError as e:
+        await websocket.send_json({"type": "error", "detail": str(e), "retry_after": e.retry_after})
+        await websocket.close(code=1013)
+        return
+    
+    session = None
+    try:
+        while True:
+            data = await websocket.receive_json()
+            msg_type = data.get('type')
+            
+            if msg_type == 'start':
+                session = chat_sessions.get(data['session_id']) if data.get('session_id') else None
+                resumed = session is not None
+                if session is None:
+                    session = chat_sessions.create(
+                        district=data.get('district'),
+                        lat=data.get('latitude'),
+                        lon=data.get('longitude')
+                    )
+                await websocket.send_json({
+                    "type": "session",
+                    "session_id": session.session_id,
+                    "resumed": resumed
+                })
+            
+            elif msg_type == 'message':
+                if session is None:
+                    session = chat_sessions.create()
+                    await websocket.send_json({"type": "session", "session_id": session.session_id, "resumed": False})
+                
+                content = (data.get('content') or '').strip()
+                if not content:
+                    await websocket.send_json({"type": "error", "detail": "Empty message"})
+                    continue
+                
+                # The connection was admitted once; every turn reaches the LLM
+                client = getattr(websocket.state, 'rate_limit_client', None)
+                bucket = rate_limiter.classify(websocket.url.path) if client is not None else None
+                wait = rate_limiter.acquire(client, bucket) if bucket else 0
+                if wait:
+                    await websocket.send_json(
+                        {"type": "error", "detail": "Rate limit exceeded", "retry_after": max(1, math.ceil(wait))}
+                    )
+                    continue
+                
+                start = time.perf_counter()
+                try:
+                    with start_trace('ws_chat_turn', session_id=session.session_id, message=content) as trace:
+                        result = await rag_agent.chat_turn(session, content)
+                except ExecutorSaturatedError as e:
+                    await websocket.send_json({"type": "error", "detail": str(e), "retry_after": e.retry_after})
+                    continue
+                if slow_query_log is not None:
+                    slow_query_log.maybe_write(trace, path='/ws/chat')
+                await websocket.send_json({
+                    "type": "response",
+                    "content": result['response'],
+                    "degraded": result['degraded'],
+                    "retrieved": result['retrieved'],
+                    "sources": result['sources'],
+                    "turn": result['turn'],
+                    "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+                    "trace_id": trace.trace_id
+                })
+            
+            elif msg_type == 'end':
+                if session is not None:
+                    chat_sessions.delete(session.session_id)
+                await websocket.close()
+                return
+            
+            else:
+                await websocket.send_json({"type": "error", "detail": f"Unknown message type: {msg_type}"})
+    
+    except WebSocketDisconnect:
+        # Session stays in the store until its TTL so the client can resume
+        logger.info(f"Chat websocket disconnected (session {session.session_id if session else None})")
+    except Exception as e:
+        logger.error(f"Error in chat websocket: {e}")
+        await websocket.close(code=1011)
+
+
 @app.get("/categories")
 async def get_categories():
     """Get available document categories."""
-    if vector_store is None:
-        raise HTTPException(status_code=503, detail="Vector store not initialized")
+    await readiness.get('vector_store')
     
-    stats = vector_store.get_stats()
+    stats = await executors.search.run(vector_store.get_stats)
     return {
         "categories": stats.get('categories', []),
         "total_documents": stats['total_documents']
@@ -323,54 +967,77 @@ async def get_categories():
 
 
 @app.get("/search")
-async def search(q: str, category: Optional[str] = None, top_k: int = 5):
-    """Direct semantic search endpoint."""
-    if vector_store is None:
-        raise HTTPException(status_code=503, detail="Vector store not initialized")
+async def search(
+    q: str,
+    category: Optional[str] = None,
+    top_k: int = 5,
+    fields: Optional[str] = None,
+    source_chars: Optional[int] = None
+):
+    """Direct semantic search endpoint.
+    
+    `fields` (comma-separated, e.g. "metadata,similarity_score") projects
+    each result; `source_chars` caps each result's content.
+    """
+    if source_chars is not None and source_chars < 0:
+        raise HTTPException(status_code=400, detail="source_chars must be >= 0")
+    result_fields = _requested_fields(fields, SEARCH_FIELDS)
+    await readiness.get('vector_store')
     
     try:
         filter_meta = {'category': category} if category else None
         
-        results = vector_store.search_with_score_threshold(
+        results = await executors.search.run(
+            vector_store.search_with_score_threshold,
             query=q,
             top_k=top_k,
             score_threshold=0.5,
             filter_metadata=filter_meta
         )
         
+        results = truncate_sources(results, source_chars)
         return {
             "query": q,
-            "results": results
+            "results": [project(result, result_fields) for result in results]
         }
         
+    except ExecutorSaturatedError:
+        raise
     except Exception as e:
         logger.error(f"Error in search: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_districts_payload() -> Dict:
+    """Every district with its geographic summary (precomputed for /districts)."""
+    districts = []
+    for district_name in geo_context.get_all_districts():
+        district_info = geo_context.get_district_by_name(district_name)
+        if district_info:
+            districts.append({
+                'name': district_info['name'],
+                'province': district_info['province'],
+                'region': district_info['region'],
+                'rainfall': district_info['rainfall'],
+                'soil_type': district_info['soil_type']
+            })
+    
+    return {
+        "total": len(districts),
+        "districts": districts
+    }
+
+
 @app.get("/districts")
-async def get_districts():
+async def get_districts(request: Request):
     """Get all available districts with their geographic information."""
     if geo_context is None:
         raise HTTPException(status_code=503, detail="Geographic context not initialized")
     
     try:
-        districts = []
-        for district_name in geo_context.get_all_districts():
-            district_info = geo_context.get_district_by_name(district_name)
-            if district_info:
-                districts.append({
-                    'name': district_info['name'],
-                    'province': district_info['province'],
-                    'region': district_info['region'],
-                    'rainfall': district_info['rainfall'],
-                    'soil_type': district_info['soil_type']
-                })
-        
-        return {
-            "total": len(districts),
-            "districts": districts
-        }
+        if 'districts' not in static_responses:
+            static_responses.register('districts', build_districts_payload)
+        return static_responses.respond('districts', request)
         
     except Exception as e:
         logger.error(f"Error fetching districts: {e}")
@@ -454,18 +1121,36 @@ async def get_coordinates_weather(lat: float, lon: float):
 
 
 @app.get("/markets")
-async def get_all_markets():
+async def get_all_markets(request: Request):
     """Get list of all markets with pricing data."""
     if market_api is None:
         raise HTTPException(status_code=503, detail="Market service not initialized")
     
     try:
-        return market_api.get_all_markets()
+        if 'markets' not in static_responses:
+            static_responses.register('markets', market_api.get_all_markets)
+        return static_responses.respond('markets', request)
     except Exception as e:
         logger.error(f"Error fetching markets: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Registered before /markets/{district_name}, which would otherwise capture "trends"
+@app.get("/markets/trends")
+async def get_price_trends(request: Request):
+    """Get price trends for all commodities."""
+    if market_api is None:
+        raise HTTPException(status_code=503, detail="Market service not initialized")
+    
+    try:
+        if 'market_trends' not in static_responses:
+            static_responses.register('market_trends', market_api.get_price_trends)
+        return static_responses.respond('market_trends', request)
+    except Exception as e:
+        logger.error(f"Error fetching price trends: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/markets/{district_name}")
 async def get_district_market_prices(district_name: str):
     """Get market prices for a district."""
@@ -499,28 +1184,19 @@ async def get_commodity_comparison(commodity_name: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/markets/trends")
-async def get_price_trends():
-    """Get price trends for all commodities."""
-    if market_api is None:
-        raise HTTPException(status_code=503, detail="Market service not initialized")
-    
-    try:
-        return market_api.get_price_trends()
-    except Exception as e:
-        logger.error(f"Error fetching price trends: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
 if __name__ == "__main__":
     import uvicorn
     
     # Use PORT env var (Railway, Render, etc.) or fallback to config
     port = int(os.environ.get('PORT', config['api']['port']))
     
-    uvicorn.run(
-        "src.api.main:app",
-        host="0.0.0.0",
-        port=port,
-        reload=False  # Disable reload in production
-    )
+    if config['api'].get('prefork', {}).get('workers', 1) > 1:
+        # Workers share the models this process preloads before forking
+        PreforkServer.from_config(config['api']).run(sys.modules[__name__])
+    else:
+        uvicorn.run(
+            "src.api.main:app",
+            host="0.0.0.0",
+            port=port,
+            reload=False  # Disable reload in production
+        )
@@ -0,0 +1,374 @@
+"""
+Pre-fork serving for the Agriculture RAG Platform API.
+The master process loads the read-only services (embedding model, geo,
+market and district data) once, then forks workers that share those pages
+copy-on-write instead of each loading its own copy.
+
+    python -m src.api.prefork --workers 4
+"""
+
+import argparse
+import contextlib
+import fcntl
+import gc
+import math
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, Optional
+import logging
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+logger = logging.getLogger(__name__)
+
+_worker_id: Optional[int] = None
+
+
+def worker_id() -> Optional[int]:
+    """Index of this pre-forked worker, or None when serving from a single process."""
+    return _worker_id
+
+
+def process_memory(pid: Any = 'self') -> Dict[str, float]:
+    """Resident memory of a process (MB) from /proc/<pid>/smaps_rollup.
+
+    PSS charges each shared page to the processes mapping it in equal parts,
+    so the PSS of the master plus its workers is their combined footprint;
+    RSS counts shared pages in full for every process.
+    """
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    except OSError:
+        return {}
+    return {
+        'rss_mb': round(fields.get('Rss', 0), 1),
+        'pss_mb': round(fields.get('Pss', 0), 1),
+        'shared_mb': round(fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0), 1),
+        'private_mb': round(fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0), 1)
+    }
+
+
+class SharedFileStore:
+    """Keeps a JSON-file-backed store consistent across pre-forked workers.
+
+    Each worker holds its own in-memory copy and the stores rewrite whole
+    files on save, so uncoordinated workers would drop each other's writes.
+    Calls to the `writes` methods (run them on the io executor) hold an
+    exclusive flock on the store directory and first reload any file another
+    worker changed. Everything else is served from memory with no file I/O
+    on the caller's thread; at most every `check_interval` seconds a read
+    starts a background check that reloads changed files under a shared lock,
+    so reads may lag another worker's write by about that long.
+    """
+
+    def __init__(
+        self,
+        store_class: Callable[[str], Any],
+        storage_path: str,
+        loaders: Dict[str, str],
+        writes: Iterable[str],
+        check_interval: float = 1.0
+    ):
+        """
+        Build and wrap a store.
+
+        Args:
+            store_class: Store type, called with `storage_path`; it loads its files
+                under a shared lock so it never reads one half-written by another worker
+            storage_path: Directory holding the store's JSON files
+            loaders: In-memory attribute -> store method that loads it from disk
+            writes: Public methods that may save files
+            check_interval: Minimum seconds between checks for other workers' writes
+        """
+        self._loaders = loaders
+        self._writes = frozenset(writes)
+        self._check_interval = check_interval
+        self._directory = Path(storage_path)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self._directory / '.lock'
+        with self._locked(exclusive=False):
+            self._store = store_class(storage_path)
+            self._signature = self._files_signature()
+        self._checked_at = time.monotonic()
+        self._refreshing = threading.Lock()
+        self.reloads = 0
+
+    def _files_signature(self) -> tuple:
+        signature = []
+        for path in sorted(self._directory.glob('*.json')):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signature.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    @contextlib.contextmanager
+    def _locked(self, exclusive: bool):
+        # A fresh descriptor per use, so threads of one worker also exclude each other
+        with open(self._lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _reload_if_changed(self):
+        signature = self._files_signature()
+        if signature != self._signature:
+            for attribute, loader in self._loaders.items():
+                setattr(self._store, attribute, getattr(self._store, loader)())
+            self._signature = signature
+            self.reloads += 1
+
+    def _refresh(self):
+        try:
+            with self._locked(exclusive=False):
+                self._reload_if_changed()
+        except Exception as e:
+            logger.warning(f"Could not reload {self._directory}: {e}")
+        finally:
+            self._refreshing.release()
+
+    def _refresh_soon(self):
+        """Check for other workers' writes in the background, at most every check_interval."""
+        now = time.monotonic()
+        if now - self._checked_at < self._check_interval or not self._refreshing.acquire(blocking=False):
+            return
+        self._checked_at = now
+        threading.Thread(target=self._refresh, name='store-refresh', daemon=True).start()
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            return getattr(self._store, name)
+        if name not in self._writes:
+            self._refresh_soon()
+            return getattr(self._store, name)
+        value = getattr(self._store, name)
+
+        def call(*args, **kwargs):
+            with self._locked(exclusive=True):
+                self._reload_if_changed()
+                result = value(*args, **kwargs)
+                # Our own writes are not a reason to reload
+                self._signature = self._files_signature()
+            return result
+        return call
+
+
+def shared_store(
+    store_class: Callable[[str], Any],
+    storage_path: str,
+    loaders: Dict[str, str],
+    writes: Iterable[str]
+) -> Any:
+    """Build a file-backed store, kept consistent across workers when pre-forked."""
+    if _worker_id is None:
+        return store_class(storage_path)
+    return SharedFileStore(store_class, storage_path, loaders, writes)
+
+
+def split_limits(config: Dict, workers: int):
+    """Divide per-process limits in `config` between `workers` processes (in place).
+
+    Each worker runs its own LLM scheduler, so LLM concurrency and queue
+    limits are split to keep the host-wide totals near the configured ones
+    (never below one per worker). Rate-limit buckets switch to the shared
+    memory-mapped file so a client's budget is not multiplied by the number
+    of workers. Circuit breakers stay per worker: each opens after its own
+    failure_threshold failures, so a down LLM costs up to
+    workers x failure_threshold failed calls before every worker fails fast.
+    """
+    if workers <= 1:
+        return
+
+    def split(value: int) -> int:
+        return max(1, math.ceil(value / workers))
+
+    llm_config = config.setdefault('llm', {})
+    llm_config['max_concurrency'] = split(llm_config.get('max_concurrency', 2))
+    for backend in llm_config.get('backends') or []:
+        backend['max_concurrency'] = split(backend.get('max_concurrency', 2))
+    fake_config = llm_config.setdefault('fake', {})
+    fake_config['max_concurrency'] = split(fake_config.get('max_concurrency', 1))
+    queue_limits = llm_config.setdefault('scheduler', {}).setdefault('queue_limits', {})
+    for name, limit in list(queue_limits.items()):
+        queue_limits[name] = split(limit)
+
+    rate_limit_config = config.setdefault('rate_limit', {})
+    rate_limit_config.setdefault('shared', {})['enabled'] = True
+    logger.info(
+        f"Per-worker limits for {workers} workers: LLM concurrency {llm_config['max_concurrency']}, "
+        f"queue limits {queue_limits}; rate limit buckets shared"
+    )
+
+
+class PreforkServer:
+    """Master process: preloads shared services, binds the socket, forks and supervises workers."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        host: str = '0.0.0.0',
+        port: int = 8000,
+        graceful_timeout: float = 30.0,
+        backlog: int = 2048
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            workers: Worker processes to fork
+            host: Address to listen on
+            port: Port to listen on (all workers accept from one socket)
+            graceful_timeout: Seconds workers get to finish requests on shutdown
+            backlog: Listen backlog of the shared socket
+        """
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.graceful_timeout = graceful_timeout
+        self.backlog = backlog
+        self.children: Dict[int, int] = {}  # pid -> worker index
+        self.stopping = False
+        self.restarts = 0
+        self.sock: Optional[socket.socket] = None
+
+    @classmethod
+    def from_config(cls, api_config: Dict) -> 'PreforkServer':
+        """Build the server from the `api` section of config.yaml."""
+        prefork_config = api_config.get('prefork', {})
+        return cls(
+            workers=prefork_config.get('workers', 2),
+            host=api_config.get('host', '0.0.0.0'),
+            port=int(os.environ.get('PORT', api_config.get('port', 8000))),
+            graceful_timeout=prefork_config.get('graceful_timeout', 30.0),
+            backlog=prefork_config.get('backlog', 2048)
+        )
+
+    def run(self, api: ModuleType):
+        """Preload `api`'s shared services, fork the workers and supervise them until stopped.
+
+        Args:
+            api: The application module (src.api.main), already imported
+        """
+        # The master never runs inference; keep tokenizer thread pools out of the fork
+        os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+        start = time.perf_counter()
+        api.configure_workers(self.workers)
+        api.register_services()
+        api.services.preload()
+        # Move everything allocated so far out of the collector's reach, so
+        # collections in the workers don't write to (and un-share) those pages
+        gc.collect()
+        gc.freeze()
+        logger.info(
+            f"✓ Preloaded shared services in {time.perf_counter() - start:.1f}s "
+            f"(master memory: {process_memory()})"
+        )
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(self.backlog)
+        self.sock.set_inheritable(True)
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGALRM, self._kill)
+        for index in range(self.workers):
+            self._spawn(index, api.app)
+        logger.info(f"✓ Serving on {self.host}:{self.port} with {self.workers} pre-forked workers")
+        self._supervise(api.app)
+
+    def _spawn(self, index: int, app: Any):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._serve(index, app)
+            except BaseException:
+                logger.exception(f"Worker {index} crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = index
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def _serve(self, index: int, app: Any):
+        """Worker body: run uvicorn on the inherited socket."""
+        global _worker_id
+        _worker_id = index
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGALRM):
+            signal.signal(signum, signal.SIG_DFL)
+        import uvicorn
+        config = uvicorn.Config(app, lifespan='on', timeout_graceful_shutdown=int(self.graceful_timeout))
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def _supervise(self, app: Any):
+        """Reap workers and replace any that exit while the server is running."""
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index = self.children.pop(pid, None)
+            if index is None or self.stopping:
+                continue
+            logger.warning(
+                f"Worker {index} (pid {pid}) exited with code {os.waitstatus_to_exitcode(status)}; restarting"
+            )
+            self.restarts += 1
+            time.sleep(1)  # Don't spin if workers crash on startup
+            self._spawn(index, app)
+        self.sock.close()
+        logger.info("✓ All workers stopped")
+
+    def _stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info(f"Stopping {len(self.children)} workers...")
+        for pid in list(self.children):
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+        signal.alarm(int(self.graceful_timeout) + 5)
+
+    def _kill(self, signum, frame):
+        for pid in list(self.children):
+            logger.warning(f"Worker pid {pid} did not stop in time; killing")
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGKILL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API from pre-forked workers sharing preloaded services")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: api.prefork.workers)")
+    parser.add_argument('--host', help="Address to listen on (default: api.host)")
+    parser.add_argument('--port', type=int, help="Port to listen on (default: $PORT or api.port)")
+    args = parser.parse_args()
+
+    from src.api import main as api
+    server = PreforkServer.from_config(api.config['api'])
+    server.workers = args.workers or server.workers
+    server.host = args.host or server.host
+    server.port = args.port or server.port
+    server.run(api)
+
+
+if __name__ == "__main__":
+    # Run from the importable module: services look up worker_id() and
+    # shared_store() on src.api.prefork, not on this __main__ copy
+    from src.api import prefork
+    prefork.main()
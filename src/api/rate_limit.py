@@ -0,0 +1,278 @@
+"""
+Per-client token-bucket admission control for the API.
+LLM-backed routes and cheap lookup routes draw from separate buckets, so one
+client hammering /query is turned away with 429 before it reaches Ollama,
+without affecting anyone else.
+"""
+
+import fcntl
+import fnmatch
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+SLOT = struct.Struct('dd')  # tokens, last refill (time.monotonic)
+
+
+def _refill_and_take(tokens: float, updated: float, now: float, rate: float, burst: float, cost: float):
+    """One bucket step: (new tokens, seconds until `cost` is available or 0 if taken)."""
+    # A bucket never seen (updated 0) or from before a reboot starts full
+    tokens = burst if updated <= 0 or now < updated else min(burst, tokens + (now - updated) * rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate
+
+
+class LocalBuckets:
+    """Buckets of one class held in this process, least recently seen evicted first."""
+
+    def __init__(self, max_clients: int = 10000):
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, client: str, rate: float, burst: float, cost: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            state = self._buckets.get(client)
+            if state is None:
+                state = self._buckets[client] = [0.0, 0.0]
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            state[0], wait = _refill_and_take(state[0], state[1], now, rate, burst, cost)
+            state[1] = now
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SharedBuckets:
+    """Buckets of one class in a memory-mapped file, shared by every worker on the host.
+
+    Clients hash to one of `slots` fixed slots (colliding clients share a
+    bucket); each update holds a POSIX record lock on just that slot.
+    """
+
+    def __init__(self, path: str, slots: int = 65536):
+        self.path = path
+        self.slots = slots
+        size = slots * SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size != size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        # Record locks are per process; this serializes threads within it
+        self._lock = threading.Lock()
+
+    def take(self, client: str, rate: float, burst: float, cost: float) -> float:
+        offset = (zlib.crc32(client.encode()) % self.slots) * SLOT.size
+        now = time.monotonic()
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, SLOT.size, offset)
+            try:
+                tokens, updated = SLOT.unpack_from(self._map, offset)
+                tokens, wait = _refill_and_take(tokens, updated, now, rate, burst, cost)
+                SLOT.pack_into(self._map, offset, tokens, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, SLOT.size, offset)
+        return wait
+
+    def __len__(self) -> int:
+        return self.slots
+
+
+class RateLimiter:
+    """Token buckets per client and route class.
+
+    A client is an API key listed in `api_keys` (sent in `api_key_header`)
+    or else the client IP. Each class has a refill rate (tokens/second), a
+    burst size and the path patterns it covers; unmatched paths are not
+    limited.
+    """
+
+    def __init__(
+        self,
+        buckets: Dict[str, Dict],
+        api_key_header: str = 'X-API-Key',
+        api_keys: Iterable[str] = (),
+        trust_forwarded_for: bool = False,
+        max_clients: int = 10000,
+        shared_path: Optional[str] = None,
+        shared_slots: int = 65536
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            buckets: Class name -> {'rate', 'burst', 'paths'}; first match wins
+            api_key_header: Header carrying the client's API key
+            api_keys: Keys that identify a client; other requests are keyed by IP
+            trust_forwarded_for: Key on the first X-Forwarded-For address (behind a proxy)
+            max_clients: Buckets kept per class in process memory
+            shared_path: File to memory-map so workers on this host share buckets
+            shared_slots: Hash slots per class in the shared file
+        """
+        self.classes = {
+            name: {
+                'rate': float(spec['rate']),
+                'burst': float(spec['burst']),
+                'pattern': re.compile('|'.join(fnmatch.translate(p) for p in spec['paths']))
+            }
+            for name, spec in buckets.items()
+        }
+        self.api_key_header = api_key_header.lower().encode('latin-1')
+        self.api_keys = {key for key in api_keys if key}
+        self.trust_forwarded_for = trust_forwarded_for
+        self.shared_path = None
+        self._buckets = {name: LocalBuckets(max_clients) for name in self.classes}
+        if shared_path:
+            self.share(shared_path, shared_slots)
+        self.allowed = {name: 0 for name in self.classes}
+        self.rejected = {name: 0 for name in self.classes}
+        self._rejected_clients: "OrderedDict[str, int]" = OrderedDict()
+
+    @classmethod
+    def from_config(cls, rate_limit_config: Dict) -> 'RateLimiter':
+        """Build the limiter from the `rate_limit` section of config.yaml."""
+        shared_config = rate_limit_config.get('shared', {})
+        api_keys = list(rate_limit_config.get('api_keys') or [])
+        api_keys += os.environ.get('RATE_LIMIT_API_KEYS', '').split(',')
+        return cls(
+            buckets=rate_limit_config.get('buckets', {}),
+            api_key_header=rate_limit_config.get('api_key_header', 'X-API-Key'),
+            api_keys=[key.strip() for key in api_keys],
+            trust_forwarded_for=rate_limit_config.get('trust_forwarded_for', False),
+            max_clients=rate_limit_config.get('max_clients', 10000),
+            shared_path=shared_config.get('path') if shared_config.get('enabled') else None,
+            shared_slots=shared_config.get('slots', 65536)
+        )
+
+    def share(self, path: str, slots: int = 65536):
+        """Switch to buckets in memory-mapped files at `path`.<class> (before forking workers)."""
+        self.shared_path = path
+        self._buckets = {name: SharedBuckets(f"{path}.{name}", slots) for name in self.classes}
+
+    def classify(self, path: str) -> Optional[str]:
+        """The bucket class covering `path`, or None if it is not limited."""
+        for name, spec in self.classes.items():
+            if spec['pattern'].match(path):
+                return name
+        return None
+
+    def client_key(self, scope) -> str:
+        """Identify the caller of an ASGI request."""
+        headers = dict(scope.get('headers') or ())
+        key = headers.get(self.api_key_header)
+        if key:
+            key = key.decode('latin-1')
+            if key in self.api_keys:
+                # Keys never appear in stats or logs
+                return 'key:' + hashlib.sha256(key.encode()).hexdigest()[:12]
+        if self.trust_forwarded_for and b'x-forwarded-for' in headers:
+            return headers[b'x-forwarded-for'].decode('latin-1').split(',')[0].strip()
+        client = scope.get('client')
+        return client[0] if client else 'unknown'
+
+    def acquire(self, client: str, bucket: str, cost: float = 1.0) -> float:
+        """Take `cost` tokens from the client's bucket.
+
+        Returns:
+            0 if admitted, else seconds until the request would be admitted
+
+        Raises:
+            ValueError: If `cost` exceeds the burst, so it could never be admitted
+        """
+        spec = self.classes[bucket]
+        if cost > spec['burst']:
+            raise ValueError(f"Cost {cost} exceeds the '{bucket}' burst of {spec['burst']:g}")
+        wait = self._buckets[bucket].take(client, spec['rate'], spec['burst'], cost)
+        if wait:
+            self.rejected[bucket] += 1
+            self._rejected_clients[client] = self._rejected_clients.pop(client, 0) + 1
+            if len(self._rejected_clients) > 1000:
+                self._rejected_clients.popitem(last=False)
+        else:
+            self.allowed[bucket] += 1
+        return wait
+
+    def get_stats(self) -> Dict:
+        top = sorted(self._rejected_clients.items(), key=lambda item: item[1], reverse=True)[:5]
+        return {
+            'shared': self.shared_path is not None,
+            'buckets': {
+                name: {
+                    'rate': spec['rate'],
+                    'burst': spec['burst'],
+                    'allowed': self.allowed[name],
+                    'rejected': self.rejected[name],
+                    'clients': None if self.shared_path else len(self._buckets[name])
+                }
+                for name, spec in self.classes.items()
+            },
+            'top_rejected_clients': [{'client': client, 'rejected': count} for client, count in top]
+        }
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 (or closing a websocket) when a client's bucket is empty.
+
+    The client key is left in the request state (`rate_limit_client`) so
+    handlers can charge extra tokens, e.g. per item of a batch.
+    """
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] not in ('http', 'websocket'):
+            await self.app(scope, receive, send)
+            return
+        bucket = self.limiter.classify(scope['path'])
+        if bucket is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = self.limiter.client_key(scope)
+        scope.setdefault('state', {})['rate_limit_client'] = client
+        wait = self.limiter.acquire(client, bucket)
+        if not wait:
+            await self.app(scope, receive, send)
+            return
+
+        if scope['type'] == 'websocket':
+            # Closing before accept makes the server answer the handshake with 403
+            await send({'type': 'websocket.close', 'code': 1008})
+            return
+        retry_after = max(1, math.ceil(wait))
+        body = json.dumps({
+            'detail': f"Rate limit exceeded for {bucket} requests; retry in {retry_after}s",
+            'retry_after': retry_after
+        }).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 429,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(retry_after).encode()),
+                (b'x-ratelimit-bucket', bucket.encode()),
+                (b'x-ratelimit-limit', str(int(self.limiter.classes[bucket]['burst'])).encode())
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,197 @@
+"""
+Readiness gate for subsystems that load in the background.
+Requests that need a subsystem still loading are parked on an awaitable
+(up to a deadline) instead of failing with 503 and retrying.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class ServiceUnavailableError(Exception):
+    """A subsystem did not become ready before the request's deadline."""
+
+    def __init__(self, name: str, reason: str, retry_after: float, status_code: int = 503):
+        super().__init__(f"{name} {reason}")
+        self.name = name
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class _Subsystem:
+    __slots__ = ('name', 'state', 'instance', 'error', 'started_at', 'finished_at', 'event', 'parked', 'timed_out')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = PENDING
+        self.instance: Any = None
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.event: Optional[asyncio.Event] = None
+        self.parked = 0
+        self.timed_out = 0
+
+    @property
+    def load_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return round((self.finished_at or time.perf_counter()) - self.started_at, 3)
+
+
+class ReadinessGate:
+    """Tracks subsystem load state and parks requests until what they need is ready.
+
+    Loaders (possibly on another thread) report with loading()/ready()/failed();
+    request handlers call `await gate.get(name)`.
+    """
+
+    def __init__(self, timeout_seconds: float = 30.0, retry_after: float = 10.0):
+        """
+        Initialize the gate.
+
+        Args:
+            timeout_seconds: Longest a request waits for a loading subsystem
+            retry_after: Retry-After (seconds) sent when the wait times out
+        """
+        self.timeout_seconds = timeout_seconds
+        self.retry_after = retry_after
+        self.created_at = time.perf_counter()
+        self._subsystems: Dict[str, _Subsystem] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_config(cls, readiness_config: Dict) -> 'ReadinessGate':
+        """Build the gate from the `readiness` section of config.yaml."""
+        return cls(
+            timeout_seconds=readiness_config.get('timeout_seconds', 30.0),
+            retry_after=readiness_config.get('retry_after', 10.0)
+        )
+
+    def _subsystem(self, name: str) -> _Subsystem:
+        subsystem = self._subsystems.get(name)
+        if subsystem is None:
+            subsystem = self._subsystems.setdefault(name, _Subsystem(name))
+        return subsystem
+
+    def expect(self, *names: str):
+        """Declare subsystems that will load, so requests park rather than fail."""
+        with self._lock:
+            for name in names:
+                self._subsystem(name)
+
+    def start(self, name: str):
+        with self._lock:
+            subsystem = self._subsystem(name)
+            subsystem.state = LOADING
+            subsystem.started_at = time.perf_counter()
+
+    def ready(self, name: str, instance: Any = None):
+        """Publish a loaded subsystem and wake its waiters."""
+        self._finish(name, READY, instance=instance)
+        logger.info(f"✓ {name} ready ({self._subsystems[name].load_seconds}s)")
+
+    def failed(self, name: str, error: Any):
+        """Mark a subsystem as unavailable; waiters fail immediately."""
+        self._finish(name, FAILED, error=str(error))
+        logger.warning(f"{name} unavailable: {error}")
+
+    def _finish(self, name: str, state: str, instance: Any = None, error: Optional[str] = None):
+        with self._lock:
+            subsystem = self._subsystem(name)
+            if subsystem.started_at is None:
+                subsystem.started_at = time.perf_counter()
+            subsystem.finished_at = time.perf_counter()
+            subsystem.state = state
+            subsystem.instance = instance
+            subsystem.error = error
+            event = subsystem.event
+        if event is not None:
+            self._loop.call_soon_threadsafe(event.set)
+
+    def fail_pending(self, error: Any):
+        """Fail every subsystem that has not finished loading (e.g. the loader crashed)."""
+        for name, subsystem in list(self._subsystems.items()):
+            if subsystem.state in (PENDING, LOADING):
+                self.failed(name, error)
+
+    @contextlib.contextmanager
+    def loading(self, name: str):
+        """Time a load; yields a dict whose 'instance' is published on success.
+
+            with gate.loading('data_sync') as slot:
+                slot['instance'] = ExternalDataSync()
+        """
+        self.start(name)
+        slot = {'instance': None}
+        try:
+            yield slot
+        except Exception as e:
+            self.failed(name, e)
+            raise
+        self.ready(name, slot['instance'])
+
+    def peek(self, name: str) -> Any:
+        """The subsystem's instance if it is ready, else None (never waits)."""
+        subsystem = self._subsystems.get(name)
+        return subsystem.instance if subsystem is not None and subsystem.state == READY else None
+
+    async def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """Wait until `name` is ready and return its instance.
+
+        Raises:
+            ServiceUnavailableError: The subsystem failed, was never expected,
+                or did not load within the deadline
+        """
+        with self._lock:
+            subsystem = self._subsystems.get(name)
+            if subsystem is None:
+                raise ServiceUnavailableError(name, "not configured", self.retry_after)
+            if subsystem.state == READY:
+                return subsystem.instance
+            if subsystem.state == FAILED:
+                raise ServiceUnavailableError(name, f"failed to load: {subsystem.error}", self.retry_after)
+            if subsystem.event is None:
+                # Waiters run on the event loop; loaders may finish on another thread
+                self._loop = asyncio.get_running_loop()
+                subsystem.event = asyncio.Event()
+            event = subsystem.event
+            subsystem.parked += 1
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout or self.timeout_seconds)
+        except asyncio.TimeoutError:
+            subsystem.timed_out += 1
+            raise ServiceUnavailableError(name, "still loading", self.retry_after)
+        if subsystem.state == FAILED:
+            raise ServiceUnavailableError(name, f"failed to load: {subsystem.error}", self.retry_after)
+        return subsystem.instance
+
+    def get_stats(self) -> Dict:
+        """Per-subsystem state, load time (and when it finished after boot) and parked requests."""
+        stats = {}
+        for name, subsystem in list(self._subsystems.items()):
+            stats[name] = {
+                'state': subsystem.state,
+                'load_seconds': subsystem.load_seconds,
+                'ready_at_seconds': (
+                    round(subsystem.finished_at - self.created_at, 3) if subsystem.finished_at else None
+                ),
+                'parked_requests': subsystem.parked,
+                'timed_out': subsystem.timed_out
+            }
+            if subsystem.error:
+                stats[name]['error'] = subsystem.error
+        return stats
@@ -0,0 +1,204 @@
+"""
+Response encoding for the Agriculture RAG Platform API.
+Field projection and source truncation, fast JSON serialization (orjson when
+installed) and gzip/brotli compression of large responses negotiated from
+Accept-Encoding.
+"""
+
+import gzip
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+from starlette.datastructures import Headers, MutableHeaders
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'application/javascript'
+)
+
+_fast_json = True
+
+
+def set_fast_json(enabled: bool):
+    """Turn the fast serializer on or off for json_response()."""
+    global _fast_json
+    _fast_json = enabled
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes, with orjson if available."""
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (numpy values and non-str keys allowed)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, status_code: int = 200) -> JSONResponse:
+    """Render `content` as a FastJSONResponse when fast JSON is enabled.
+
+    Returning a Response from a route skips FastAPI's response_model
+    re-validation and jsonable_encoder walk, which dominate the cost of
+    large nested payloads (and would reject projected responses). With
+    fast JSON disabled the default encoder and JSONResponse are used.
+    """
+    if hasattr(content, 'model_dump'):
+        content = content.model_dump()
+    if not _fast_json:
+        return JSONResponse(content=jsonable_encoder(content), status_code=status_code)
+    return FastJSONResponse(content=content, status_code=status_code)
+
+
+def parse_fields(fields: Union[str, List[str], None]) -> Optional[Set[str]]:
+    """Normalize a `fields` projection ("a,b" or ["a", "b"]); None means every field."""
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    parsed = {f.strip() for f in fields if f.strip()}
+    return parsed or None
+
+
+def project(payload: Dict, fields: Optional[Set[str]]) -> Dict:
+    """Keep only the requested top-level keys of `payload`."""
+    if fields is None:
+        return payload
+    return {key: value for key, value in payload.items() if key in fields}
+
+
+def truncate_sources(sources: List[Dict], source_chars: Optional[int]) -> List[Dict]:
+    """Cap each source's 'content' at `source_chars` characters.
+
+    Sources may be shared with the answer cache, so truncated entries are
+    copies flagged with 'truncated': True.
+    """
+    if source_chars is None:
+        return sources
+    truncated = []
+    for source in sources:
+        content = source.get('content')
+        if isinstance(content, str) and len(content) > source_chars:
+            source = dict(source, content=content[:source_chars], truncated=True)
+        truncated.append(source)
+    return truncated
+
+
+def negotiate_encoding(accept_encoding: str, brotli_enabled: bool = True) -> Optional[str]:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header (None if neither is acceptable)."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+    candidates = (['br'] if brotli is not None and brotli_enabled else []) + ['gzip']
+    best = None
+    for encoding in candidates:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return best[0] if best else None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete responses above `minimum_size`.
+
+    Streaming responses (e.g. /query/batch NDJSON) pass through untouched so
+    each line still reaches the client as soon as it is produced.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        brotli_enabled: bool = True,
+        compressible_types: Iterable[str] = COMPRESSIBLE_TYPES
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli_enabled = brotli_enabled
+        self.compressible_types = tuple(compressible_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get('accept-encoding', ''), self.brotli_enabled)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message['type'] == 'http.response.start':
+                # Hold the headers until the body shows whether compression applies
+                start_message = message
+                return
+            if message['type'] != 'http.response.body' or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get('body', b'')
+            headers = MutableHeaders(raw=list(start['headers']))
+            content_type = headers.get('content-type', '')
+            if (
+                message.get('more_body', False)
+                or len(body) < self.minimum_size
+                or 'content-encoding' in headers
+                or not content_type.startswith(self.compressible_types)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers['Content-Encoding'] = encoding
+            headers['Content-Length'] = str(len(compressed))
+            headers.add_vary_header('Accept-Encoding')
+            await send({**start, 'headers': headers.raw})
+            await send({'type': 'http.response.body', 'body': compressed})
+
+        await self.app(scope, receive, send_compressed)
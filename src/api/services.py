@@ -0,0 +1,249 @@
+"""
+Dependency-aware service container for the Agriculture RAG Platform API.
+Each service is built once from its declared dependencies; independent
+services initialize concurrently and rarely used ones on first use.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+import logging
+
+from src.api.readiness import ReadinessGate, ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Builds and shares singleton services, reporting progress to a ReadinessGate.
+
+    Eager services start as soon as their dependencies are ready, so
+    independent ones load at the same time; blocking constructors run on a
+    small thread pool and async factories on the event loop. Lazy services
+    are built on the first get(). Every consumer receives the same instance.
+    Read-only services can be preloaded by a pre-fork master (see prefork.py)
+    so every worker shares them.
+    """
+
+    def __init__(self, gate: ReadinessGate, init_workers: int = 4):
+        """
+        Initialize the container.
+
+        Args:
+            gate: Readiness gate that parks requests while services load
+            init_workers: Threads running blocking constructors concurrently
+        """
+        self.gate = gate
+        self._specs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._preloaded: Dict[str, Any] = {}
+        self._timeline: Dict[str, Dict[str, Any]] = {}
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=init_workers, thread_name_prefix='service-init')
+        self._on_ready: Optional[Callable[[str, Any], None]] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, gate: ReadinessGate, services_config: Dict) -> 'ServiceContainer':
+        """Build the container from the `services` section of config.yaml."""
+        return cls(gate, init_workers=services_config.get('init_workers', 4))
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[..., Any],
+        depends_on: Iterable[str] = (),
+        lazy: bool = False,
+        preload: bool = False
+    ):
+        """Declare a service.
+
+        Args:
+            name: Service name used by get() and as the dependency name
+            factory: Called with each dependency as a keyword argument;
+                may be a coroutine function
+            depends_on: Services that must be built first
+            lazy: Build on first get() instead of at start()
+            preload: Read-only and fork-safe (no threads, sockets or event
+                loop); built by preload() before workers are forked
+        """
+        self._specs[name] = {
+            'factory': factory, 'depends_on': tuple(depends_on), 'lazy': lazy, 'preload': preload
+        }
+        self.gate.expect(name)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def preload(self):
+        """Build the preload services now, on this thread, without an event loop.
+
+        Called by the pre-fork master so workers inherit the instances; start()
+        and get() then return them instead of building their own.
+        """
+        def build(name: str) -> Any:
+            if name in self._preloaded:
+                return self._preloaded[name]
+            spec = self._specs[name]
+            if not spec['preload'] or asyncio.iscoroutinefunction(spec['factory']):
+                raise ValueError(f"{name} cannot be preloaded")
+            dependencies = {dep: build(dep) for dep in spec['depends_on']}
+            self.gate.start(name)
+            entry = self._timeline[name] = {
+                'start': time.perf_counter(),
+                'depends_on': list(spec['depends_on']),
+                'lazy': spec['lazy'],
+                'thread': threading.current_thread().name,
+                'preloaded': True
+            }
+            try:
+                instance = spec['factory'](**dependencies)
+            except Exception as e:
+                entry['end'] = time.perf_counter()
+                entry['error'] = str(e)
+                self.gate.failed(name, e)
+                raise
+            entry['end'] = time.perf_counter()
+            self._preloaded[name] = instance
+            self.gate.ready(name, instance)
+            return instance
+
+        for name, spec in self._specs.items():
+            if spec['preload']:
+                try:
+                    build(name)
+                except Exception as e:
+                    # The workers get a 503 for it, as they would for any failed service
+                    logger.warning(f"Could not preload {name}: {e}")
+
+    async def start(self, on_ready: Optional[Callable[[str, Any], None]] = None):
+        """Build every eager service, each as soon as its dependencies are ready.
+
+        Returns once all eager services are built or failed. `on_ready(name,
+        instance)` runs on the event loop as each service (eager or lazy)
+        becomes available.
+        """
+        self._on_ready = on_ready
+        self.started_at = time.perf_counter()
+        eager = [name for name, spec in self._specs.items() if not spec['lazy']]
+        await asyncio.gather(*(self._ensure(name) for name in eager), return_exceptions=True)
+        self.finished_at = time.perf_counter()
+        logger.info(f"✓ Services ready in {self.finished_at - self.started_at:.2f}s")
+
+    async def wait_for(self, *names: str):
+        """Wait until the named services are built (or failed), without a deadline."""
+        await asyncio.gather(*(self._ensure(name) for name in names), return_exceptions=True)
+
+    def _ensure(self, name: str) -> asyncio.Future:
+        """The (shared) build of `name`, starting it if needed."""
+        if name not in self._specs:
+            raise ServiceUnavailableError(name, "not configured", self.gate.retry_after)
+        task = self._tasks.get(name)
+        if task is None:
+            task = self._tasks[name] = asyncio.ensure_future(self._build(name))
+        # A cancelled caller must not cancel a build other callers share
+        return asyncio.shield(task)
+
+    async def _build(self, name: str) -> Any:
+        if name in self._preloaded:
+            if self._on_ready is not None:
+                self._on_ready(name, self._preloaded[name])
+            return self._preloaded[name]
+        spec = self._specs[name]
+        try:
+            dependencies = {dep: await self._ensure(dep) for dep in spec['depends_on']}
+        except Exception as e:
+            self.gate.failed(name, f"dependency failed: {e}")
+            raise
+
+        self.gate.start(name)
+        start = time.perf_counter()
+        entry = self._timeline[name] = {
+            'start': start,
+            'depends_on': list(spec['depends_on']),
+            'lazy': spec['lazy']
+        }
+        try:
+            if asyncio.iscoroutinefunction(spec['factory']):
+                entry['thread'] = threading.current_thread().name
+                instance = await spec['factory'](**dependencies)
+            else:
+                def construct():
+                    entry['thread'] = threading.current_thread().name
+                    return spec['factory'](**dependencies)
+                instance = await asyncio.get_running_loop().run_in_executor(self._pool, construct)
+        except Exception as e:
+            entry['end'] = time.perf_counter()
+            entry['error'] = str(e)
+            self.gate.failed(name, e)
+            raise
+        entry['end'] = time.perf_counter()
+        self.gate.ready(name, instance)
+        if self._on_ready is not None:
+            self._on_ready(name, instance)
+        return instance
+
+    async def get(self, name: str) -> Any:
+        """The service instance; lazy services are built now, loading ones waited for.
+
+        Raises:
+            ServiceUnavailableError: The service (or a dependency) failed, or
+                did not load within the gate's deadline
+        """
+        instance = self.gate.peek(name)
+        if instance is not None:
+            return instance
+        spec = self._specs.get(name)
+        if spec is not None and spec['lazy']:
+            try:
+                return await asyncio.wait_for(self._ensure(name), self.gate.timeout_seconds)
+            except asyncio.TimeoutError:
+                raise ServiceUnavailableError(name, "still loading", self.gate.retry_after)
+            except ServiceUnavailableError:
+                raise
+            except Exception as e:
+                raise ServiceUnavailableError(name, f"failed to load: {e}", self.gate.retry_after)
+        return await self.gate.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def peek(self, name: str) -> Any:
+        """The instance if already built, else None (never builds or waits)."""
+        return self.gate.peek(name)
+
+    def timeline(self) -> Dict:
+        """Startup timeline: when each service started and finished, relative to start()."""
+        origin = self.started_at or time.perf_counter()
+
+        def ms(t):
+            return round((t - origin) * 1000, 1) if t is not None else None
+
+        services = []
+        for name, entry in sorted(self._timeline.items(), key=lambda item: item[1]['start']):
+            services.append({
+                'service': name,
+                'start_ms': ms(entry['start']),
+                'end_ms': ms(entry.get('end')),
+                'duration_ms': round((entry['end'] - entry['start']) * 1000, 1) if 'end' in entry else None,
+                'depends_on': entry['depends_on'],
+                'lazy': entry['lazy'],
+                'thread': entry.get('thread'),
+                'preloaded': entry.get('preloaded', False),
+                **({'error': entry['error']} if 'error' in entry else {})
+            })
+        serial_ms = sum(s['duration_ms'] or 0 for s in services if not s['lazy'] and not s['preloaded'])
+        return {
+            'time_to_ready_ms': ms(self.finished_at),
+            'serial_ms': round(serial_ms, 1),
+            'services': services,
+            'lazy_pending': [
+                name for name, spec in self._specs.items()
+                if spec['lazy'] and name not in self._tasks and name not in self._preloaded
+            ]
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,193 @@
+"""
+Precomputed responses for static reference endpoints.
+Bodies are serialized (and gzip/brotli compressed) once at startup, carry a
+strong ETag, and are answered with 304 when the client already has them.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from src.api.responses import brotli, dumps, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+
+class PrecomputedResponse:
+    """One response body, its compressed variants and its ETag."""
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str, min_compress_bytes: int = 1024):
+        self.body = body
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants: Dict[str, bytes] = {}
+        if len(body) >= min_compress_bytes:
+            # Built once, so use the strongest settings
+            self.variants['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(body, quality=11)
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        # Each encoding is a different representation, so it gets its own strong tag
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """Whether If-None-Match names any representation of this body."""
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag == '*':
+                return True
+            tag = tag[2:] if tag.startswith('W/') else tag
+            if tag.strip('"').split('-')[0] == self.digest:
+                return True
+        return False
+
+
+class StaticResponseCache:
+    """Serves precomputed bodies for endpoints whose data only changes on reload.
+
+    Each key has a builder that returns the content (serialized as JSON) or,
+    for files, the raw bytes. Builders run on register() and refresh(); file
+    entries are rebuilt when a watched file's mtime changes.
+    """
+
+    def __init__(
+        self,
+        max_age: int = 300,
+        html_max_age: int = 0,
+        check_interval: float = 5.0,
+        min_compress_bytes: int = 1024
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_age: Cache-Control max-age for data responses (seconds)
+            html_max_age: Cache-Control max-age for HTML (0 = always revalidate)
+            check_interval: Seconds between mtime checks of watched files
+            min_compress_bytes: Smaller bodies are not pre-compressed
+        """
+        self.max_age = max_age
+        self.html_max_age = html_max_age
+        self.check_interval = check_interval
+        self.min_compress_bytes = min_compress_bytes
+        self._entries: Dict[str, PrecomputedResponse] = {}
+        self._builders: Dict[str, Dict[str, Any]] = {}
+        self.served = 0
+        self.not_modified = 0
+        self.rebuilds = 0
+
+    @classmethod
+    def from_config(cls, static_config: Dict) -> 'StaticResponseCache':
+        """Build the cache from the `static_responses` section of config.yaml."""
+        return cls(
+            max_age=static_config.get('max_age', 300),
+            html_max_age=static_config.get('html_max_age', 0),
+            check_interval=static_config.get('check_interval', 5.0),
+            min_compress_bytes=static_config.get('min_compress_bytes', 1024)
+        )
+
+    def register(
+        self,
+        key: str,
+        builder: Callable[[], Any],
+        media_type: str = 'application/json',
+        watch: Optional[List[str]] = None
+    ):
+        """Register and immediately build a response.
+
+        Args:
+            key: Name used by respond()
+            builder: Returns the content; bytes are served as-is, anything else as JSON
+            media_type: Content type of the body
+            watch: Files whose modification rebuilds the entry
+        """
+        self._builders[key] = {
+            'builder': builder,
+            'media_type': media_type,
+            'watch': watch or [],
+            'mtimes': None,
+            'checked_at': 0.0
+        }
+        self._build(key)
+
+    def register_file(self, key: str, path: str, media_type: str):
+        """Serve a file from memory, rebuilt when it changes on disk."""
+        def read():
+            with open(path, 'rb') as f:
+                return f.read()
+        self.register(key, read, media_type=media_type, watch=[path])
+
+    def refresh(self, key: Optional[str] = None):
+        """Rebuild one entry (or all) after the underlying data was reloaded."""
+        for name in [key] if key else list(self._builders):
+            self._build(name)
+
+    def _mtimes(self, paths: List[str]) -> tuple:
+        return tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+
+    def _build(self, key: str):
+        spec = self._builders[key]
+        content = spec['builder']()
+        body = content if isinstance(content, bytes) else dumps(content)
+        if spec['media_type'].startswith('text/html'):
+            cache_control = f"public, max-age={self.html_max_age}, must-revalidate"
+        else:
+            cache_control = f"public, max-age={self.max_age}"
+        self._entries[key] = PrecomputedResponse(body, spec['media_type'], cache_control, self.min_compress_bytes)
+        spec['mtimes'] = self._mtimes(spec['watch'])
+        spec['checked_at'] = time.monotonic()
+        self.rebuilds += 1
+        logger.info(f"Precomputed {key}: {len(body)} bytes, variants {sorted(self._entries[key].variants)}")
+
+    def _current(self, key: str) -> PrecomputedResponse:
+        spec = self._builders[key]
+        if spec['watch'] and time.monotonic() - spec['checked_at'] >= self.check_interval:
+            spec['checked_at'] = time.monotonic()
+            if self._mtimes(spec['watch']) != spec['mtimes']:
+                self._build(key)
+        return self._entries[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def respond(self, key: str, request: Request) -> Response:
+        """The precomputed response for `key`, or 304 if the client's copy is current."""
+        entry = self._current(key)
+        encoding = negotiate_encoding(request.headers.get('accept-encoding', ''))
+        if encoding not in entry.variants:
+            encoding = None
+        headers = {
+            'ETag': entry.etag(encoding),
+            'Cache-Control': entry.cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and entry.matches(if_none_match):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        self.served += 1
+        if encoding:
+            headers['Content-Encoding'] = encoding
+            return Response(content=entry.variants[encoding], media_type=entry.media_type, headers=headers)
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+    def get_stats(self) -> Dict:
+        return {
+            'entries': {
+                key: {'bytes': len(entry.body), **{enc: len(body) for enc, body in entry.variants.items()}}
+                for key, entry in self._entries.items()
+            },
+            'served': self.served,
+            'not_modified': self.not_modified,
+            'rebuilds': self.rebuilds
+        }
@@ -3,8 +3,10 @@ Vector store module for agriculture RAG platform.
 Handles document embeddings and similarity search using ChromaDB.
 """
 
+import asyncio
 import os
-from typing import List, Dict, Optional, Tuple
+import uuid
+from typing import List, Dict, Optional, Tuple, Union
 import logging
 
 import chromadb
@@ -14,11 +16,20 @@ import numpy as np
 from tqdm import tqdm
 
 from ..ingestion.document_processor import Document
+from ..monitoring.metrics import timed
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def load_embedding_model(model_name: str) -> SentenceTransformer:
+    """Load a sentence-transformers model (from SENTENCE_TRANSFORMERS_HOME if set)."""
+    logger.info(f"Loading embedding model: {model_name}")
+    # Use cache folder if set (for Docker pre-downloaded models)
+    cache_folder = os.environ.get('SENTENCE_TRANSFORMERS_HOME', None)
+    return SentenceTransformer(model_name, cache_folder=cache_folder)
+
+
 class VectorStore:
     """Manages document embeddings and retrieval using ChromaDB."""
     
@@ -26,16 +37,16 @@ class VectorStore:
         self, 
         persist_directory: str,
         collection_name: str = "agriculture_docs",
-        embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+        embedding_model: Union[str, SentenceTransformer] = "sentence-transformers/all-MiniLM-L6-v2",
+        version_check_interval: float = 5.0
     ):
         self.persist_directory = persist_directory
         self.collection_name = collection_name
         
-        # Initialize embedding model
-        logger.info(f"Loading embedding model: {embedding_model}")
-        # Use cache folder if set (for Docker pre-downloaded models)
-        cache_folder = os.environ.get('SENTENCE_TRANSFORMERS_HOME', None)
-        self.embedding_model = SentenceTransformer(embedding_model, cache_folder=cache_folder)
+        # Initialize embedding model (or share one already loaded, e.g. by the pre-fork master)
+        if isinstance(embedding_model, str):
+            embedding_model = load_embedding_model(embedding_model)
+        self.embedding_model = embedding_model
         
         # Initialize ChromaDB
         os.makedirs(persist_directory, exist_ok=True)
@@ -50,8 +61,61 @@ class VectorStore:
             metadata={"hnsw:space": "cosine"}
         )
         
+        # Persisted alongside the collection and bumped on every change, so ingestion
+        # by another process (or pre-forked worker) also invalidates derived caches
+        self._marker_path = os.path.join(persist_directory, f"{collection_name}.version")
+        self.version_check_interval = version_check_interval
+        self._index_version = self._read_index_version()
+        
         logger.info(f"Vector store initialized. Collection '{collection_name}' has {self.collection.count()} documents")
     
+    def _read_index_version(self) -> Tuple[int, Optional[str]]:
+        try:
+            with open(self._marker_path) as f:
+                marker = f.read().strip()
+        except FileNotFoundError:
+            marker = None
+        # The count also catches writers that don't update the marker
+        return self.collection.count(), marker
+    
+    def _bump_index_version(self):
+        tmp_path = f"{self._marker_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp_path, self._marker_path)
+        self.refresh_index_version()
+    
+    @property
+    def index_version(self) -> Tuple[int, Optional[str]]:
+        """Changes whenever the collection does, in this process or another.
+        
+        Never blocks: writes through this store update it at once, and
+        watch_index_version() picks up other processes' writes.
+        """
+        return self._index_version
+    
+    def refresh_index_version(self) -> Tuple[int, Optional[str]]:
+        """Re-read the version from the collection and its marker file (blocking)."""
+        try:
+            self._index_version = self._read_index_version()
+        except Exception as e:
+            logger.warning(f"Could not read index version: {e}")
+        return self._index_version
+    
+    async def watch_index_version(self, executor):
+        """Refresh index_version on `executor` every version_check_interval seconds.
+        
+        Run as a background task; the reads stay off the event loop.
+        """
+        if not self.version_check_interval:
+            return
+        while True:
+            await asyncio.sleep(self.version_check_interval)
+            try:
+                await executor.run(self.refresh_index_version)
+            except Exception as e:
+                logger.warning(f"Index version refresh skipped: {e}")
+    
     def embed_texts(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
         """Generate embeddings for a list of texts."""
         embeddings = []
@@ -105,24 +169,37 @@ class VectorStore:
                 metadatas=batch_metadatas
             )
         
+        self._bump_index_version()
         logger.info(f"Successfully added {len(documents)} documents. Total: {self.collection.count()}")
     
+    @timed('embedding')
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a single query (unit-normalized) for search or similarity checks."""
+        return self.embedding_model.encode(query, normalize_embeddings=True).tolist()
+    
     def search(
         self,
         query: str,
         top_k: int = 5,
-        filter_metadata: Optional[Dict] = None
+        filter_metadata: Optional[Dict] = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict]:
-        """Search for similar documents."""
+        """Search for similar documents.
+        
+        Pass query_embedding when the caller has already embedded the query.
+        """
         # Generate query embedding
-        query_embedding = self.embedding_model.encode(query).tolist()
+        if query_embedding is None:
+            with timed('embedding'):
+                query_embedding = self.embedding_model.encode(query).tolist()
         
         # Search
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k,
-            where=filter_metadata
-        )
+        with timed('vector_search'):
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=top_k,
+                where=filter_metadata
+            )
         
         # Format results
         formatted_results = []
@@ -142,10 +219,16 @@ class VectorStore:
         query: str,
         top_k: int = 5,
         score_threshold: float = 0.7,
-        filter_metadata: Optional[Dict] = None
+        filter_metadata: Optional[Dict] = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict]:
         """Search with a minimum similarity score threshold."""
-        results = self.search(query, top_k=top_k * 2, filter_metadata=filter_metadata)
+        results = self.search(
+            query,
+            top_k=top_k * 2,
+            filter_metadata=filter_metadata,
+            query_embedding=query_embedding
+        )
         
         # Filter by score (lower distance = higher similarity for cosine)
         # Convert distance to similarity score: similarity = 1 - distance
@@ -159,9 +242,73 @@ class VectorStore:
         
         return filtered_results[:top_k]
     
+    @timed('embedding')
+    def embed_queries(self, queries: List[str], batch_size: int = 64) -> List[List[float]]:
+        """Embed many queries (unit-normalized) in one batched encode."""
+        embeddings = self.embedding_model.encode(
+            queries,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return embeddings.tolist()
+    
+    def search_batch(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        score_threshold: float = 0.7,
+        filter_metadata: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        """Search for many queries in a single collection query.
+        
+        Returns one list of results per query embedding, filtered by
+        score_threshold like search_with_score_threshold.
+        """
+        if not query_embeddings:
+            return []
+        
+        with timed('vector_search_batch'):
+            results = self.collection.query(
+                query_embeddings=query_embeddings,
+                n_results=top_k * 2,
+                where=filter_metadata
+            )
+        
+        batched = []
+        for q in range(len(query_embeddings)):
+            filtered_results = []
+            documents = results['documents'][q] if results['documents'] else []
+            for i in range(len(documents)):
+                distance = results['distances'][q][i] if 'distances' in results else None
+                if distance is None:
+                    continue
+                similarity = 1 - distance
+                if similarity >= score_threshold:
+                    filtered_results.append({
+                        'content': documents[i],
+                        'metadata': results['metadatas'][q][i],
+                        'distance': distance,
+                        'id': results['ids'][q][i],
+                        'similarity_score': similarity
+                    })
+            batched.append(filtered_results[:top_k])
+        
+        return batched
+    
+    def categories_present(self, categories: List[str]) -> List[str]:
+        """Those of `categories` with at least one document (one metadata lookup each)."""
+        present = []
+        for category in categories:
+            if self.collection.get(where={'category': category}, limit=1, include=[])['ids']:
+                present.append(category)
+        return present
+    
     def delete_collection(self):
         """Delete the current collection."""
         self.client.delete_collection(name=self.collection_name)
+        self._bump_index_version()
         logger.info(f"Deleted collection: {self.collection_name}")
     
     def get_stats(self) -> Dict:
@@ -13,6 +13,8 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import time
 
+from ..monitoring.metrics import timed
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -293,6 +295,7 @@ class ExternalDataSync:
                 return {k: DataEntry(**v) for k, v in data.items()}
         return {}
     
+    @timed('json_persist')
     def _save_synced_data(self):
         """Save synced data to disk."""
         data_dict = {k: v.to_dict() for k, v in self.synced_data.items()}
@@ -307,6 +310,7 @@ class ExternalDataSync:
                 return [SyncRecord(**record) for record in data]
         return []
     
+    @timed('json_persist')
     def _save_sync_log(self):
         """Save sync log to disk."""
         with open(self.sync_log_path, 'w') as f:
@@ -10,9 +10,9 @@ from .geo_context import GeoContext
 class ContextEnricher:
     """Enriches queries and prompts with geographic context."""
     
-    def __init__(self):
-        """Initialize the context enricher with geo data."""
-        self.geo = GeoContext()
+    def __init__(self, geo_context: Optional[GeoContext] = None):
+        """Initialize the context enricher with geo data (a shared GeoContext if given)."""
+        self.geo = geo_context or GeoContext()
     
     def build_agrievidence_prompt(
         self,
@@ -20,7 +20,8 @@ class ContextEnricher:
         retrieved_chunks: List[Dict],
         district: Optional[str] = None,
         lat: Optional[float] = None,
-        lon: Optional[float] = None
+        lon: Optional[float] = None,
+        geo_context: Optional[Dict] = None
     ) -> str:
         """
         Build the AgriEvidence prompt with location context.
@@ -31,12 +32,14 @@ class ContextEnricher:
             district: District name (optional)
             lat: Latitude (optional)
             lon: Longitude (optional)
+            geo_context: Already-resolved geographic context (skips the lookup)
             
         Returns:
             Complete prompt string with context
         """
         # Get geographic context
-        geo_context = self._get_geo_context(district, lat, lon)
+        if geo_context is None:
+            geo_context = self._get_geo_context(district, lat, lon)
         
         # Format retrieved evidence
         evidence_text = self._format_evidence(retrieved_chunks)
@@ -153,11 +156,17 @@ Please provide a location-specific answer with proper citations."""
         
         evidence_lines = []
         for i, chunk in enumerate(retrieved_chunks, 1):
-            source = chunk.get('metadata', {}).get('source', 'Unknown')
-            page = chunk.get('metadata', {}).get('page', 'N/A')
+            metadata = chunk.get('metadata', {})
+            # Packed chunks are labelled with their retrieval rank, the citation number
+            rank = metadata.get('chunk_rank', i)
+            source = metadata.get('source', 'Unknown')
             content = chunk.get('content', chunk.get('text', ''))
+            if len(metadata.get('pages') or ()) > 1:
+                pages = f"Pages {', '.join(str(p) for p in metadata['pages'])}"
+            else:
+                pages = f"Page {metadata.get('page', 'N/A')}"
             
-            evidence_lines.append(f"[Source {i}] {source} (Page {page})")
+            evidence_lines.append(f"[Source {rank}] {source} ({pages})")
             evidence_lines.append(content)
             evidence_lines.append("")  # Blank line between sources
         
@@ -22,18 +22,26 @@ class GeoContext:
         if provinces_json_path is None:
             provinces_json_path = Path(__file__).parent / "provinces.json"
         
-        with open(provinces_json_path, 'r') as f:
-            self.data = json.load(f)
+        self.provinces_json_path = provinces_json_path
+        self.reload()
+    
+    def reload(self):
+        """Re-read the province data file, e.g. after it was edited on disk."""
+        with open(self.provinces_json_path, 'r') as f:
+            data = json.load(f)
         
         # Build district lookup index for fast access
-        self.district_index = {}
-        for province in self.data['provinces']:
+        district_index = {}
+        for province in data['provinces']:
             for district in province['districts']:
                 district_key = district['name'].lower()
-                self.district_index[district_key] = {
+                district_index[district_key] = {
                     **district,
                     'province': province['name']
                 }
+        
+        # Swap both at once so concurrent lookups never see a half-built index
+        self.data, self.district_index = data, district_index
     
     def get_district_by_name(self, district_name: str) -> Optional[Dict]:
         """
@@ -13,6 +13,8 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import statistics
 
+from ..monitoring.metrics import timed
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -114,6 +116,7 @@ class HistoricalDataArchive:
                 return db
         return {}
     
+    @timed('json_persist')
     def _save_data(self):
         """Save time-series data."""
         data = {}
@@ -0,0 +1,18 @@
+"""Metrics and monitoring for the Agriculture RAG Platform."""
+
+from .metrics import REGISTRY, Counter, Gauge, Histogram, MetricsRegistry, timed
+from .tracing import SlowQueryLog, Trace, set_attributes, span, start_trace
+
+__all__ = [
+    'REGISTRY',
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'MetricsRegistry',
+    'timed',
+    'SlowQueryLog',
+    'Trace',
+    'set_attributes',
+    'span',
+    'start_trace'
+]
@@ -0,0 +1,122 @@
+"""
+Scrape-time collectors that copy subsystem get_stats() into metrics.
+Each function takes the dictionary a component already reports in /ready,
+so the components themselves stay free of metrics code.
+"""
+
+from typing import Dict
+
+from .metrics import REGISTRY
+
+CIRCUIT_STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+LLM_QUEUE_DEPTH = REGISTRY.gauge('agri_llm_queue_depth', 'LLM requests waiting per priority class', ['priority'])
+LLM_QUEUE_WAIT = REGISTRY.gauge(
+    'agri_llm_queue_wait_seconds', 'Recent LLM queue wait per priority class', ['priority', 'quantile']
+)
+LLM_DISPATCHED = REGISTRY.counter('agri_llm_dispatched_total', 'LLM requests dispatched', ['priority'])
+LLM_REJECTED = REGISTRY.counter('agri_llm_rejected_total', 'LLM requests rejected by full queues', ['priority'])
+LLM_ACTIVE = REGISTRY.gauge('agri_llm_active_requests', 'LLM requests running on the backend')
+LLM_BACKEND_HEALTHY = REGISTRY.gauge('agri_llm_backend_healthy', 'Whether a pooled LLM server is healthy', ['backend'])
+LLM_BACKEND_OUTSTANDING = REGISTRY.gauge(
+    'agri_llm_backend_outstanding', 'Requests outstanding on a pooled LLM server', ['backend']
+)
+LLM_BACKEND_SERVED = REGISTRY.counter('agri_llm_backend_served_total', 'Requests served per LLM server', ['backend'])
+LLM_BACKEND_FAILURES = REGISTRY.counter('agri_llm_backend_failures_total', 'Failures per LLM server', ['backend'])
+LLM_HEDGED = REGISTRY.counter('agri_llm_hedged_total', 'Hedged LLM requests', ['outcome'])
+LLM_SESSION_CALLS = REGISTRY.counter('agri_llm_session_calls_total', 'LLM calls by model residency', ['residency'])
+LLM_SESSION_LATENCY = REGISTRY.gauge(
+    'agri_llm_session_latency_seconds', 'Recent LLM call latency by model residency', ['residency', 'quantile']
+)
+LLM_KEEP_ALIVE_PINGS = REGISTRY.counter('agri_llm_keep_alive_pings_total', 'Keep-alive pings sent to the LLM')
+CIRCUIT_STATE = REGISTRY.gauge('agri_llm_circuit_state', 'LLM circuit state (0 closed, 1 half-open, 2 open)')
+CIRCUIT_OPENED = REGISTRY.counter('agri_llm_circuit_opened_total', 'Times the LLM circuit opened')
+CIRCUIT_REJECTED = REGISTRY.counter('agri_llm_circuit_rejected_total', 'LLM calls refused by the open circuit')
+CACHE_LOOKUPS = REGISTRY.counter('agri_answer_cache_lookups_total', 'Answer cache lookups', ['result'])
+CACHE_ENTRIES = REGISTRY.gauge('agri_answer_cache_entries', 'Answers held in the cache')
+COALESCED = REGISTRY.counter('agri_query_coalescing_total', 'Queries executed or coalesced', ['result'])
+IN_FLIGHT_QUERIES = REGISTRY.gauge('agri_query_in_flight', 'Distinct queries being computed')
+EXECUTOR_QUEUED = REGISTRY.gauge('agri_executor_queued', 'Jobs waiting for an executor thread', ['pool'])
+EXECUTOR_RUNNING = REGISTRY.gauge('agri_executor_running', 'Jobs running on an executor', ['pool'])
+EXECUTOR_JOBS = REGISTRY.counter('agri_executor_jobs_total', 'Executor jobs by outcome', ['pool', 'result'])
+ROUTER_QUERIES = REGISTRY.counter('agri_intent_router_queries_total', 'Queries seen by the intent router', ['intent'])
+RATE_LIMIT_REQUESTS = REGISTRY.counter(
+    'agri_rate_limit_requests_total', 'Requests admitted or rejected by per-client rate limits', ['bucket', 'result']
+)
+RATE_LIMIT_CLIENTS = REGISTRY.gauge('agri_rate_limit_clients', 'Clients with a bucket in this process', ['bucket'])
+
+
+def _quantiles(gauge, labels, mean, p95):
+    gauge.labels(*labels, 'mean').set(mean or 0.0)
+    gauge.labels(*labels, '0.95').set(p95 or 0.0)
+
+
+def record_llm_stats(stats: Dict):
+    """LLM stack stats: scheduler queues, pooled servers and session residency."""
+    scheduler = stats.get('scheduler')
+    if scheduler:
+        LLM_ACTIVE.set(scheduler['active'])
+        for priority, queue in scheduler['classes'].items():
+            LLM_QUEUE_DEPTH.labels(priority).set(queue['queue_depth'])
+            LLM_DISPATCHED.labels(priority).set(queue['dispatched'])
+            LLM_REJECTED.labels(priority).set(queue['rejected'])
+            _quantiles(LLM_QUEUE_WAIT, (priority,), queue['mean_wait_seconds'], queue['p95_wait_seconds'])
+
+    for backend in stats.get('backends', []):
+        url = backend.get('base_url', backend['backend'])
+        LLM_BACKEND_HEALTHY.labels(url).set(1 if backend['healthy'] else 0)
+        LLM_BACKEND_OUTSTANDING.labels(url).set(backend['outstanding'])
+        LLM_BACKEND_SERVED.labels(url).set(backend['served'])
+        LLM_BACKEND_FAILURES.labels(url).set(backend['failures'])
+    if 'hedged' in stats:
+        LLM_HEDGED.labels('launched').set(stats['hedged'])
+        LLM_HEDGED.labels('won').set(stats['hedge_wins'])
+
+    session = stats.get('session')
+    if session:
+        LLM_KEEP_ALIVE_PINGS.labels().set(session['keep_alive_pings'])
+        for residency in ('cold', 'warm'):
+            summary = session[residency]
+            LLM_SESSION_CALLS.labels(residency).set(summary['calls'])
+            _quantiles(LLM_SESSION_LATENCY, (residency,), summary['mean_seconds'], summary['p95_seconds'])
+
+
+def record_circuit_stats(stats: Dict):
+    CIRCUIT_STATE.set(CIRCUIT_STATES.get(stats['state'], 0))
+    CIRCUIT_OPENED.labels().set(stats['times_opened'])
+    CIRCUIT_REJECTED.labels().set(stats['rejected'])
+
+
+def record_cache_stats(stats: Dict):
+    CACHE_ENTRIES.set(stats['entries'])
+    CACHE_LOOKUPS.labels('exact_hit').set(stats['hits_exact'])
+    CACHE_LOOKUPS.labels('semantic_hit').set(stats['hits_semantic'])
+    CACHE_LOOKUPS.labels('miss').set(stats['misses'])
+
+
+def record_coalescing_stats(stats: Dict):
+    COALESCED.labels('executed').set(stats['executed'])
+    COALESCED.labels('coalesced').set(stats['coalesced'])
+    IN_FLIGHT_QUERIES.set(stats['in_flight'])
+
+
+def record_executor_stats(stats: Dict):
+    for pool, pool_stats in stats.items():
+        EXECUTOR_QUEUED.labels(pool).set(pool_stats['queued'])
+        EXECUTOR_RUNNING.labels(pool).set(pool_stats['running'])
+        EXECUTOR_JOBS.labels(pool, 'completed').set(pool_stats['completed'])
+        EXECUTOR_JOBS.labels(pool, 'rejected').set(pool_stats['rejected'])
+
+
+def record_router_stats(stats: Dict):
+    for intent, count in stats['routed'].items():
+        ROUTER_QUERIES.labels(intent).set(count)
+    ROUTER_QUERIES.labels('fallthrough').set(stats['fallthrough'])
+
+
+def record_rate_limit_stats(stats: Dict):
+    for bucket, bucket_stats in stats['buckets'].items():
+        RATE_LIMIT_REQUESTS.labels(bucket, 'allowed').set(bucket_stats['allowed'])
+        RATE_LIMIT_REQUESTS.labels(bucket, 'rejected').set(bucket_stats['rejected'])
+        if bucket_stats['clients'] is not None:
+            RATE_LIMIT_CLIENTS.labels(bucket).set(bucket_stats['clients'])
@@ -0,0 +1,193 @@
+"""
+Per-request span tracing for the Agriculture RAG Platform.
+Spans live in a context variable, so they follow asyncio tasks and jobs
+submitted to the bounded executors; slow traces go to a rotating JSONL log.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """One timed stage; children are the stages it ran."""
+
+    __slots__ = ('name', 'start', 'end', 'attributes', 'children', 'error')
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attributes = attributes or {}
+        self.children: List['Span'] = []
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict:
+        origin = self.start if origin is None else origin
+        span = {
+            'name': self.name,
+            'start_ms': round((self.start - origin) * 1000, 2),
+            'duration_ms': round(self.duration_ms, 2)
+        }
+        if self.attributes:
+            span['attributes'] = self.attributes
+        if self.error:
+            span['error'] = self.error
+        if self.children:
+            span['children'] = [child.to_dict(origin) for child in list(self.children)]
+        return span
+
+
+class Trace:
+    """Root span of one request plus its id."""
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.root = Span(name, attributes)
+
+    def finish(self):
+        if self.root.end is None:
+            self.root.end = time.perf_counter()
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms
+
+    def to_dict(self) -> Dict:
+        return {'trace_id': self.trace_id, **self.root.to_dict()}
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('current_span', default=None)
+
+
+@contextlib.contextmanager
+def start_trace(name: str, **attributes):
+    """Start a trace; spans opened inside (any task or executor job) attach to it."""
+    trace = Trace(name, attributes)
+    token = _current_span.set(trace.root)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.root.error = type(e).__name__
+        raise
+    finally:
+        trace.finish()
+        _current_span.reset(token)
+
+
+def enter_span(name: str, **attributes):
+    """Open a child of the current span; returns a token for exit_span (None if no trace)."""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    span = Span(name, attributes)
+    parent.children.append(span)
+    return span, _current_span.set(span)
+
+
+def exit_span(handle, error: Optional[BaseException] = None):
+    if handle is None:
+        return
+    span, token = handle
+    span.end = time.perf_counter()
+    if error is not None:
+        span.error = type(error).__name__
+    try:
+        _current_span.reset(token)
+    except ValueError:
+        # Token from another context (e.g. a generator resumed elsewhere)
+        pass
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """Trace a stage; a no-op outside a trace."""
+    handle = enter_span(name, **attributes)
+    try:
+        yield
+    except BaseException as e:
+        exit_span(handle, e)
+        handle = None
+        raise
+    finally:
+        exit_span(handle)
+
+
+def set_attributes(**attributes):
+    """Annotate the current span (e.g. with token counts the LLM reported)."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+class SlowQueryLog:
+    """Writes traces slower than a threshold to a rotating JSONL file."""
+
+    def __init__(
+        self,
+        path: str = "logs/slow_queries.jsonl",
+        threshold_ms: float = 5000.0,
+        sample_rate: float = 1.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5
+    ):
+        """
+        Initialize the slow query log.
+
+        Args:
+            path: JSONL file (rotated to path.1, path.2, ...)
+            threshold_ms: Traces at least this slow are candidates
+            sample_rate: Fraction of slow traces written
+            max_bytes: Size at which the file rotates
+            backup_count: Rotated files kept
+        """
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.written = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self._logger = logging.getLogger(f"{__name__}.slow_queries")
+        self._logger.handlers = [handler]
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+
+    @classmethod
+    def from_config(cls, tracing_config: Dict) -> 'SlowQueryLog':
+        """Build the slow log from the `tracing` section of config.yaml."""
+        return cls(
+            path=tracing_config.get('slow_log_path', 'logs/slow_queries.jsonl'),
+            threshold_ms=tracing_config.get('slow_query_ms', 5000),
+            sample_rate=tracing_config.get('sample_rate', 1.0),
+            max_bytes=tracing_config.get('slow_log_max_bytes', 10 * 1024 * 1024),
+            backup_count=tracing_config.get('slow_log_backups', 5)
+        )
+
+    def maybe_write(self, trace: Trace, **fields) -> bool:
+        """Write `trace` if it is slow (and sampled); returns whether it was written."""
+        if trace.duration_ms < self.threshold_ms or random.random() >= self.sample_rate:
+            return False
+        record = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), **fields, 'trace': trace.to_dict()}
+        self._logger.info(json.dumps(record, default=str))
+        self.written += 1
+        return True
+
+    def get_stats(self) -> Dict:
+        return {
+            'threshold_ms': self.threshold_ms,
+            'sample_rate': self.sample_rate,
+            'written': self.written
+        }
@@ -3,9 +3,14 @@ Local Language Translation Module
 Auto-generates Shona and Ndebele summaries of agricultural advice
 """
 
+import asyncio
 import logging
 from typing import Dict, Optional
-import ollama
+
+from ..agents.llm_client import AsyncOllamaClient
+from ..agents.llm_backends import LLMBackend
+from ..agents.llm_scheduler import llm_priority_scope
+from ..monitoring.metrics import timed
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,10 +19,15 @@ logger = logging.getLogger(__name__)
 class LocalLanguageTranslator:
     """Translates agricultural advice into Shona and Ndebele."""
     
-    def __init__(self, llm_model: str = "mistral", llm_base_url: str = "http://localhost:11434"):
+    def __init__(
+        self,
+        llm_model: str = "mistral",
+        llm_base_url: str = "http://localhost:11434",
+        client: Optional[LLMBackend] = None
+    ):
         self.llm_model = llm_model
         self.llm_base_url = llm_base_url
-        self.client = ollama.Client(host=llm_base_url)
+        self.client = client or AsyncOllamaClient(base_url=llm_base_url)
         
         # Common agricultural terms in Shona and Ndebele
         self.agricultural_glossary = {
@@ -51,7 +61,7 @@ class LocalLanguageTranslator:
             }
         }
     
-    def extract_key_points(self, text: str) -> str:
+    async def extract_key_points(self, text: str) -> str:
         """Extract 2-3 key actionable points from the response."""
         prompt = f"""Extract 2-3 key actionable recommendations from this agricultural advice.
 Make them brief, practical, and suitable for translation.
@@ -61,7 +71,7 @@ Text: {text}
 Key Points (numbered list):"""
         
         try:
-            response = self.client.generate(
+            response = await self.client.generate(
                 model=self.llm_model,
                 prompt=prompt,
                 options={'temperature': 0.3}
@@ -72,7 +82,7 @@ Key Points (numbered list):"""
             # Fallback: take first 200 chars
             return text[:200] + "..."
     
-    def translate_to_shona(self, text: str) -> str:
+    async def translate_to_shona(self, text: str) -> str:
         """Translate agricultural advice to Shona."""
         # Include glossary context
         glossary_context = "\\n".join([f"{en} = {sn}" for en, sn in self.agricultural_glossary['shona'].items()])
@@ -88,7 +98,7 @@ English text: {text}
 Shona translation:"""
         
         try:
-            response = self.client.generate(
+            response = await self.client.generate(
                 model=self.llm_model,
                 prompt=prompt,
                 options={'temperature': 0.5}
@@ -98,7 +108,7 @@ Shona translation:"""
             logger.error(f"Error translating to Shona: {e}")
             return f"[Translation unavailable: {str(e)}]"
     
-    def translate_to_ndebele(self, text: str) -> str:
+    async def translate_to_ndebele(self, text: str) -> str:
         """Translate agricultural advice to Ndebele."""
         # Include glossary context
         glossary_context = "\\n".join([f"{en} = {nd}" for en, nd in self.agricultural_glossary['ndebele'].items()])
@@ -114,7 +124,7 @@ English text: {text}
 Ndebele translation:"""
         
         try:
-            response = self.client.generate(
+            response = await self.client.generate(
                 model=self.llm_model,
                 prompt=prompt,
                 options={'temperature': 0.5}
@@ -124,7 +134,8 @@ Ndebele translation:"""
             logger.error(f"Error translating to Ndebele: {e}")
             return f"[Translation unavailable: {str(e)}]"
     
-    def generate_multilingual_summary(
+    @timed('translation')
+    async def generate_multilingual_summary(
         self,
         full_response: str,
         include_shona: bool = True,
@@ -136,20 +147,27 @@ Ndebele translation:"""
         Returns:
             Dict with 'english', 'shona', and 'ndebele' keys
         """
-        # Extract key points
-        key_points = self.extract_key_points(full_response)
-        
-        result = {
-            'english': key_points
-        }
-        
-        if include_shona:
-            logger.info("Translating to Shona...")
-            result['shona'] = self.translate_to_shona(key_points)
-        
-        if include_ndebele:
-            logger.info("Translating to Ndebele...")
-            result['ndebele'] = self.translate_to_ndebele(key_points)
+        # Translations are queued behind interactive answers
+        with llm_priority_scope('background'):
+            # Extract key points
+            key_points = await self.extract_key_points(full_response)
+            
+            result = {
+                'english': key_points
+            }
+            
+            # Both translations depend only on the key points, so run them together
+            tasks = {}
+            if include_shona:
+                logger.info("Translating to Shona...")
+                tasks['shona'] = self.translate_to_shona(key_points)
+            
+            if include_ndebele:
+                logger.info("Translating to Ndebele...")
+                tasks['ndebele'] = self.translate_to_ndebele(key_points)
+            
+            translated = await asyncio.gather(*tasks.values())
+            result.update(zip(tasks.keys(), translated))
         
         return result
     
@@ -223,6 +241,6 @@ if __name__ == "__main__":
     print("Testing Local Language Translation:")
     print("=" * 50)
     
-    result = translator.generate_multilingual_summary(test_text)
+    result = asyncio.run(translator.generate_multilingual_summary(test_text))
     formatted = translator.format_for_display(result)
     print(formatted)
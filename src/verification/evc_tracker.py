@@ -12,6 +12,8 @@ from dataclasses import dataclass, asdict, field
 from enum import Enum
 import hashlib
 
+from ..monitoring.metrics import timed
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -140,6 +142,7 @@ class EVCTracker:
                 return db
         return {}
     
+    @timed('json_persist')
     def _save_evidence(self):
         """Save evidence database."""
         data = {eid: ev.to_dict() for eid, ev in self.evidence_db.items()}
@@ -154,6 +157,7 @@ class EVCTracker:
                 return {vid: Verifier(**vdata) for vid, vdata in data.items()}
         return {}
     
+    @timed('json_persist')
     def _save_verifiers(self):
         """Save verifiers database."""
         data = {vid: v.to_dict() for vid, v in self.verifiers_db.items()}
@@ -167,6 +171,7 @@ class EVCTracker:
                 return json.load(f)
         return []
     
+    @timed('json_persist')
     def _save_workflow_log(self):
         """Save workflow history log."""
         with open(self.workflow_log, 'w') as f:
@@ -9,6 +9,8 @@ from typing import Dict, Optional, List
 from datetime import datetime, timedelta
 import logging
 
+from ..monitoring.metrics import timed
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +34,7 @@ class WeatherAPI:
         if self.session and not self.session.closed:
             await self.session.close()
     
+    @timed('weather_current')
     async def get_current_weather(self, lat: float, lon: float) -> Optional[Dict]:
         """
         Get current weather conditions for a location.
@@ -77,6 +80,7 @@ class WeatherAPI:
             logger.error(f"Error fetching current weather: {e}")
             return None
     
+    @timed('weather_forecast')
     async def get_daily_forecast(self, lat: float, lon: float, days: int = 7) -> Optional[Dict]:
         """
         Get daily weather forecast.
@@ -132,6 +136,7 @@ class WeatherAPI:
             logger.error(f"Error fetching forecast: {e}")
             return None
     
+    @timed('weather_history')
     async def get_historical_precipitation(
         self, 
         lat: float, 
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test the two-tier answer cache and its invalidation when the district data
+on disk changes.
+"""
+
+import json
+import shutil
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.answer_cache import AnswerCache
+from src.agents.single_flight import query_key
+from src.geo.geo_context import GeoContext
+
+PROVINCES_JSON = Path(__file__).parent / "src" / "geo" / "provinces.json"
+
+
+def key(query, district='Chipinge'):
+    return query_key(query, district, index_version=1)
+
+
+def test_exact_and_semantic_hits():
+    cache = AnswerCache(semantic_threshold=0.95)
+    cache.put(key('when to plant maize'), [1.0, 0.0], {'query': 'when to plant maize'}, llm_seconds=2.0)
+
+    assert cache.get_exact(key('when to plant maize'))['query'] == 'when to plant maize'
+    assert cache.get_semantic(key('maize planting time'), [0.99, 0.141]) is not None
+    assert cache.get_semantic(key('maize planting time', district='Gwanda'), [1.0, 0.0]) is None
+    assert cache.get_semantic(key('how to dip cattle'), [0.0, 1.0]) is None
+
+    stats = cache.get_stats()
+    assert (stats['hits_exact'], stats['hits_semantic'], stats['misses']) == (1, 1, 2)
+    assert stats['saved_llm_seconds'] == 4.0
+
+
+def test_invalidate_one_district():
+    cache = AnswerCache()
+    cache.put(key('q1'), None, {'query': 'q1'})
+    cache.put(key('q2', district='Gwanda'), None, {'query': 'q2'})
+    cache.invalidate('Chipinge')
+    assert cache.get_exact(key('q1')) is None
+    assert cache.get_exact(key('q2', district='Gwanda')) is not None
+
+
+def test_data_change_reloads_geo_context_before_invalidating(tmp_path):
+    provinces = tmp_path / "provinces.json"
+    shutil.copy(PROVINCES_JSON, provinces)
+    geo = GeoContext(str(provinces))
+    cache = AnswerCache(data_files=[str(provinces)], data_check_interval=0, on_data_change=geo.reload)
+    cache.put(key('q'), None, {'query': 'q'})
+    original_region = geo.get_district_by_name('Chipinge')['region']
+
+    data = json.loads(provinces.read_text())
+    for province in data['provinces']:
+        for district in province['districts']:
+            if district['name'] == 'Chipinge':
+                district['region'] = 'Region V'
+    provinces.write_text(json.dumps(data) + "\n")
+
+    assert cache.get_exact(key('q')) is None
+    assert cache.invalidations == 1
+    assert geo.get_district_by_name('Chipinge')['region'] == 'Region V' != original_region
+
+
+def test_failed_reload_still_invalidates(tmp_path):
+    data_file = tmp_path / "provinces.json"
+    data_file.write_text("{}")
+
+    def reload():
+        raise ValueError("bad data")
+
+    cache = AnswerCache(data_files=[str(data_file)], data_check_interval=0, on_data_change=reload)
+    cache.put(key('q'), None, {'query': 'q'})
+    data_file.write_text('{"provinces": []}')
+    assert cache.get_exact(key('q')) is None
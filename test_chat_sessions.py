@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test server-side chat sessions: TTL expiry, least-recently-used eviction and
+follow-up turns.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.chat_sessions import ChatSessionStore
+from src.agents.llm_backends import FakeLLMBackend
+
+
+def test_sessions_expire_and_evict_least_recently_used():
+    store = ChatSessionStore(ttl_seconds=60, max_sessions=2)
+    first = store.create(district='Chipinge')
+    second = store.create()
+    first.last_active -= 30
+    second.last_active -= 30
+
+    assert store.get(first.session_id) is first  # touched: now most recent
+    third = store.create()  # evicts `second`
+    assert store.get(second.session_id) is None
+
+    for session in (first, third):
+        session.last_active -= 45
+    assert store.get(first.session_id) is first
+    for session in (first, third):
+        session.last_active -= 30
+    assert store.get(third.session_id) is None  # idle for 75 s
+    assert store.get(first.session_id) is first
+    assert store.get_stats() == {'active_sessions': 1, 'created': 3, 'expired': 2}
+
+
+class ChatStore:
+    """VectorStore double: every message embeds alike, so follow-ups never re-retrieve."""
+
+    index_version = 0
+    embedding_model = None
+
+    def embed_query(self, text):
+        return [1.0, 0.0]
+
+    def search_with_score_threshold(self, query, top_k=5, score_threshold=0.5, query_embedding=None):
+        return [{'content': "Dip cattle weekly in the rainy season to control ticks.",
+                 'metadata': {'source': 'cattle.pdf', 'filename': 'cattle.pdf', 'page': 12}, 'similarity_score': 0.9}]
+
+
+class ContextlessBackend(FakeLLMBackend):
+    """A backend that never returns resumable context, recording each prompt."""
+
+    def __init__(self):
+        super().__init__(time_scale=0)
+        self.prompts = []
+
+    async def generate(self, model, prompt, options=None, timeout=None, **kwargs):
+        self.prompts.append(prompt)
+        result = await super().generate(model, prompt, options=options, timeout=timeout, **kwargs)
+        result.pop('context')
+        return result
+
+
+def test_follow_up_resends_evidence_without_llm_context():
+    rag_agent = pytest.importorskip('src.agents.rag_agent', exc_type=ImportError)
+    backend = ContextlessBackend()
+    agent = rag_agent.AgricultureRAGAgent(vector_store=ChatStore(), llm_client=backend)
+    session = ChatSessionStore().create()
+
+    async def run():
+        first = await agent.chat_turn(session, "How often should I dip cattle?")
+        second = await agent.chat_turn(session, "And in the dry season?")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first['retrieved'] and not second['retrieved']
+    assert session.retrievals == 1 and session.llm_context is None
+    follow_up = backend.prompts[-1]
+    assert "Dip cattle weekly in the rainy season" in follow_up
+    assert "provided earlier in this conversation" not in follow_up
+    assert "USER: How often should I dip cattle?" in follow_up
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the LLM circuit breaker state machine and which LLM failures count
+against it.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.agents.llm_backends import FakeLLMBackend
+from src.agents.llm_scheduler import LLMScheduler
+
+
+def test_breaker_state_transitions():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED  # success reset the count
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    time.sleep(0.06)
+    breaker.check()  # the trial call
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # only one trial at a time
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN  # failed trial re-opens at once
+    time.sleep(0.06)
+    breaker.check()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.get_stats()['times_opened'] == 2
+
+
+def test_scheduler_reports_dispatch_after_queue_wait():
+    backend = FakeLLMBackend(base_latency_ms=50, tokens_per_second=1e6)
+    scheduler = LLMScheduler(backend, max_concurrency=1)
+    events = []
+
+    async def call(name):
+        await scheduler.generate('m', 'hello', on_dispatch=lambda: events.append(name))
+
+    async def run():
+        first = asyncio.ensure_future(call('first'))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(call('second'))
+        await asyncio.sleep(0.01)
+        assert events == ['first']  # second is still queued
+        await asyncio.gather(first, second)
+
+    asyncio.run(run())
+    assert events == ['first', 'second']
+
+
+def test_queue_timeout_does_not_trip_breaker():
+    """A call that spends its deadline waiting for a slot is overload, not a server fault."""
+    rag_agent = pytest.importorskip('src.agents.rag_agent', exc_type=ImportError)
+    backend = FakeLLMBackend(base_latency_ms=300, tokens_per_second=1e6)
+    scheduler = LLMScheduler(backend, max_concurrency=1)
+    breaker = CircuitBreaker(failure_threshold=1)
+    llm = rag_agent.OllamaLLM(client=scheduler, deadline_seconds=0.1, circuit_breaker=breaker)
+
+    async def run():
+        busy = asyncio.ensure_future(scheduler.generate('m', 'occupy the only slot'))
+        await asyncio.sleep(0)
+        with pytest.raises(rag_agent.LLMUnavailableError):
+            await llm.generate([{'role': 'user', 'content': 'hello'}])
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        # A dispatched call that overruns the deadline does count
+        await busy
+        with pytest.raises(rag_agent.LLMUnavailableError):
+            await llm.generate([{'role': 'user', 'content': 'hello'}])
+        assert breaker.state == CircuitBreaker.OPEN
+
+    asyncio.run(run())
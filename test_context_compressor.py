@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test query-focused context compression: which sentences are kept, and that
+compressed chunks keep the retrieval rank their citations refer to.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.context_compressor import ContextCompressor, split_sentences
+
+
+class KeywordEmbedding:
+    """Bag-of-words encoder over a fixed vocabulary, enough to rank sentences."""
+
+    VOCAB = ['maize', 'planting', 'rain', 'cattle', 'dip', 'tick']
+
+    def encode(self, texts, **kwargs):
+        vectors = np.array([[text.lower().count(word) + 1e-6 for word in self.VOCAB] for text in texts])
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def chunk(content, source, page, **metadata):
+    return {'content': content, 'metadata': {'source': source, 'filename': source, 'page': page, **metadata}}
+
+
+RETRIEVED = [
+    chunk("Maize planting starts with the rains. Weed early. Plant maize after 25 mm of rain.", 'maize.pdf', 2),
+    chunk("Dip cattle every week. Ticks spread disease. Cattle need dipping in summer.", 'cattle.pdf', 9),
+    chunk("Use certified seed. Late maize planting cuts yield. Store grain dry.", 'seed.pdf', 5),
+]
+QUERY = "When is maize planting after rain?"
+
+
+def test_split_sentences():
+    assert split_sentences("Plant at 25 mm. Apply 200 kg/ha.  \"Top dress\" later! Why? 3 weeks.") == [
+        "Plant at 25 mm.", "Apply 200 kg/ha.", "\"Top dress\" later!", "Why?", "3 weeks."
+    ]
+    assert split_sentences("Use 2.5 t/ha of lime.") == ["Use 2.5 t/ha of lime."]
+
+
+def test_keeps_query_relevant_sentences_and_drops_the_rest():
+    compressor = ContextCompressor(KeywordEmbedding(), top_sentences=3, neighbors=0, min_similarity=0.5)
+    result = compressor.compress(QUERY, RETRIEVED)
+
+    contents = [c['content'] for c in result['chunks']]
+    assert contents == [
+        "Maize planting starts with the rains. ... Plant maize after 25 mm of rain.",
+        "Late maize planting cuts yield.",
+    ]
+    assert result['stats']['sentences_total'] == 9
+    assert result['stats']['sentences_kept'] == 3
+    assert result['stats']['compressed_chars'] < result['stats']['original_chars']
+
+
+def test_neighbours_of_selected_sentences_are_kept():
+    compressor = ContextCompressor(KeywordEmbedding(), top_sentences=1, neighbors=1, min_similarity=0.5)
+    chunks = compressor.compress("maize planting", RETRIEVED)['chunks']
+    assert [c['content'] for c in chunks] == ["Use certified seed. Late maize planting cuts yield. Store grain dry."]
+
+
+def test_citation_ranks_survive_compression():
+    compressor = ContextCompressor(KeywordEmbedding(), top_sentences=3, neighbors=0, min_similarity=0.5)
+    chunks = compressor.compress(QUERY, RETRIEVED)['chunks']
+    assert [(c['metadata']['chunk_rank'], c['metadata']['page']) for c in chunks] == [(1, 2), (3, 5)]
+    assert all('chunk_rank' not in c['metadata'] for c in RETRIEVED)  # inputs are not modified
+
+    # Ranks assigned upstream (e.g. chunks already merged or filtered) are kept as they are
+    ranked = [chunk(c['content'], c['metadata']['source'], c['metadata']['page'], chunk_rank=rank)
+              for c, rank in zip(RETRIEVED, (2, 4, 7))]
+    chunks = compressor.compress(QUERY, ranked)['chunks']
+    assert [c['metadata']['chunk_rank'] for c in chunks] == [2, 7]
+
+
+def test_repeated_sentences_are_kept_once():
+    overlapping = RETRIEVED[:1] + [chunk("Plant maize after 25 mm of rain. Keep records.", 'maize.pdf', 3)]
+    compressor = ContextCompressor(KeywordEmbedding(), top_sentences=3, neighbors=0, min_similarity=0.5)
+    chunks = compressor.compress(QUERY, overlapping)['chunks']
+    assert sum(c['content'].count("Plant maize after 25 mm of rain.") for c in chunks) == 1
+
+
+def test_short_or_unrelated_context_is_left_whole():
+    compressor = ContextCompressor(KeywordEmbedding(), top_sentences=12, min_similarity=0.5)
+    assert compressor.compress(QUERY, RETRIEVED)['chunks'] is RETRIEVED  # fewer sentences than the budget
+
+    compressor = ContextCompressor(KeywordEmbedding(), top_sentences=2, min_similarity=0.99)
+    result = compressor.compress("cattle", RETRIEVED)  # no sentence is about cattle alone
+    assert result['chunks'] is RETRIEVED
+    assert result['stats']['sentences_kept'] == result['stats']['sentences_total']
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test that packed evidence keeps the retrieval rank of each chunk, so the
+[Source N] labels in the prompt match the citation numbers.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.citation_engine import CitationEngine
+from src.agents.context_compressor import ContextCompressor
+from src.agents.context_packer import ContextPacker
+from src.geo.enrich_context import ContextEnricher
+
+
+def chunk(source, page, words):
+    return {'content': ' '.join(words), 'metadata': {'source': source, 'filename': source, 'page': page}}
+
+
+WORDS = [f"w{i}" for i in range(200)]
+RETRIEVED = [
+    chunk('maize.pdf', 3, WORDS[:120]),
+    chunk('sorghum.pdf', 7, [f"s{i}" for i in range(60)]),
+    chunk('maize.pdf', 4, WORDS[100:200]),  # overlaps the first chunk
+    chunk('beans.pdf', 1, [f"b{i}" for i in range(60)]),
+]
+
+
+def test_merged_chunks_keep_rank_and_typed_page():
+    packed = ContextPacker(max_tokens=10000).pack(RETRIEVED)
+    assert packed.merged_spans == 1
+    ranks = [c['metadata']['chunk_rank'] for c in packed.chunks]
+    assert ranks == [1, 2, 4]
+
+    merged = packed.chunks[0]['metadata']
+    assert merged['page'] == 3
+    assert merged['pages'] == [3, 4]
+    assert merged['merged_ranks'] == [1, 3]
+
+
+def test_one_word_overlap_is_not_merged():
+    first = chunk('cattle.pdf', 1, "Dipping is compulsory in the".split() + [f"x{i}" for i in range(40)] + ["the"])
+    second = chunk('cattle.pdf', 40, ["the"] + "cattle dip tank schedule".split() + [f"y{i}" for i in range(40)])
+    packed = ContextPacker(max_tokens=10000).pack([first, second])
+    assert packed.merged_spans == 0
+    assert [c['metadata']['chunk_rank'] for c in packed.chunks] == [1, 2]
+    assert 'pages' not in packed.chunks[0]['metadata']
+
+
+def test_overlap_needs_neighbouring_pages():
+    far = [chunk('maize.pdf', 3, WORDS[:120]), chunk('maize.pdf', 40, WORDS[100:200])]
+    assert ContextPacker(max_tokens=10000).pack(far).merged_spans == 0
+    assert ContextPacker(max_tokens=10000, min_overlap_words=21).pack(RETRIEVED).merged_spans == 0
+    assert ContextPacker.from_config({'min_overlap_words': 50}, chunk_overlap=20).pack(RETRIEVED).merged_spans == 1
+
+
+def test_prompt_labels_match_citation_numbers():
+    packed = ContextPacker(max_tokens=10000).pack(RETRIEVED)
+    evidence = ContextEnricher(geo_context=object())._format_evidence(packed.chunks)
+    assert "[Source 1] maize.pdf (Pages 3, 4)" in evidence
+    assert "[Source 2] sorghum.pdf (Page 7)" in evidence
+    assert "[Source 4] beans.pdf (Page 1)" in evidence
+    assert "[Source 3]" not in evidence
+
+    citations = CitationEngine().format_citations(RETRIEVED)
+    numbers = {c['number']: c['filename'] for c in citations['sources']}
+    assert numbers[2] == 'sorghum.pdf' and numbers[4] == 'beans.pdf'
+
+
+def test_dropped_chunks_do_not_shift_labels():
+    chunks = [
+        chunk('a.pdf', 1, [f"a{i}" for i in range(40)]),
+        chunk('b.pdf', 2, [f"b{i}" for i in range(400)]),  # too big for what is left
+        chunk('c.pdf', 3, [f"c{i}" for i in range(40)]),
+    ]
+    packed = ContextPacker(max_tokens=300, min_chunk_tokens=1000).pack(chunks)
+    assert packed.dropped_chunks == 1
+    evidence = ContextEnricher(geo_context=object())._format_evidence(packed.chunks)
+    assert "[Source 1] a.pdf (Page 1)" in evidence
+    assert "[Source 3] c.pdf (Page 3)" in evidence
+
+
+class KeywordEmbedding:
+    """Bag-of-words encoder over a fixed vocabulary, enough to rank sentences."""
+
+    VOCAB = ['maize', 'planting', 'rain', 'cattle', 'dip', 'tick']
+
+    def encode(self, texts, **kwargs):
+        vectors = np.array([[text.lower().count(word) + 1e-6 for word in self.VOCAB] for text in texts])
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_compressed_chunks_keep_citation_numbers():
+    retrieved = [
+        {'content': "Maize planting starts with the rains. Plant maize after 25 mm of rain. Weed early.",
+         'metadata': {'source': 'maize.pdf', 'filename': 'maize.pdf', 'page': 2}},
+        {'content': "Dip cattle every week. Ticks spread disease. Cattle need dipping in summer.",
+         'metadata': {'source': 'cattle.pdf', 'filename': 'cattle.pdf', 'page': 9}},
+        {'content': "Late maize planting cuts yield. Rain after planting helps maize emerge. Use certified seed.",
+         'metadata': {'source': 'seed.pdf', 'filename': 'seed.pdf', 'page': 5}},
+    ]
+    compressor = ContextCompressor(KeywordEmbedding(), top_sentences=3, neighbors=0, min_similarity=0.5)
+    compressed = compressor.compress("When is maize planting after rain?", retrieved)['chunks']
+    assert [c['metadata']['chunk_rank'] for c in compressed] == [1, 3]
+
+    packed = ContextPacker(max_tokens=10000).pack(compressed)
+    evidence = ContextEnricher(geo_context=object())._format_evidence(packed.chunks)
+    assert "[Source 3] seed.pdf (Page 5)" in evidence
+    assert "[Source 2]" not in evidence
+
+    citations = CitationEngine().format_citations(packed.chunks)['sources']
+    assert [c['number'] for c in citations] == [1, 3]
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the rolling conversation summary that keeps chat prompts within their
+token budget.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.conversation_memory import MEMORY_PREFIX, ConversationCompactor
+from src.agents.llm_backends import FakeLLMBackend
+from src.agents.llm_client import LLMUnavailableError
+
+
+class FakeSummarizer:
+    """The OllamaLLM call interface, answered by the fake backend."""
+
+    def __init__(self, fail=False):
+        self.backend = FakeLLMBackend(template="Farmer in Chipinge asked about {prompt_tokens} tokens of topics.", time_scale=0)
+        self.fail = fail
+        self.prompts = []
+
+    async def __call__(self, prompt):
+        self.prompts.append(prompt)
+        if self.fail:
+            raise LLMUnavailableError("LLM is down")
+        return (await self.backend.generate('summarizer', prompt))['response']
+
+
+def conversation(turns):
+    messages = []
+    for i in range(turns):
+        messages.append({'role': 'user', 'content': f"Question {i} " + ' '.join(f"q{i}w{j}" for j in range(40))})
+        messages.append({'role': 'assistant', 'content': f"Answer {i} " + ' '.join(f"a{i}w{j}" for j in range(40))})
+    return messages
+
+
+async def settle(compactor):
+    while compactor._pending:
+        await asyncio.sleep(0.001)
+
+
+def test_short_history_is_sent_verbatim():
+    compactor = ConversationCompactor(FakeSummarizer(), max_history_tokens=10000)
+    messages = conversation(2)
+    assert compactor.compact(messages) == (messages, 0)
+
+
+def test_history_over_budget_is_summarized_then_reused():
+    llm = FakeSummarizer()
+    messages = conversation(5)
+    compactor = ConversationCompactor(llm, keep_recent_messages=4)
+    compactor.max_history_tokens = compactor._tokens(messages[-5:])
+
+    async def run():
+        trimmed, covered = compactor.compact(messages)
+        assert covered == 0
+        assert trimmed[-4:] == messages[-4:]
+        assert compactor._tokens(trimmed) <= compactor.max_history_tokens
+        await settle(compactor)
+        assert len(llm.prompts) == 1 and "Question 0" in llm.prompts[0] and "Question 3" not in llm.prompts[0]
+
+        compacted, covered = compactor.compact(messages)
+        assert covered == 6
+        assert compacted[0]['role'] == 'system' and compacted[0]['content'].startswith(MEMORY_PREFIX)
+        assert compacted[1:] == messages[6:]
+
+        # A client resending its full history next turn reuses the same summary
+        longer = messages + conversation(6)[10:]
+        compacted, covered = compactor.compact(longer)
+        assert covered == 6
+        await settle(compactor)
+        assert "Existing summary" in llm.prompts[-1]
+
+    asyncio.run(run())
+    assert compactor.get_stats()['summaries_written'] == 2
+
+
+def test_failed_summary_is_retried_on_a_later_turn():
+    llm = FakeSummarizer(fail=True)
+    messages = conversation(5)
+    compactor = ConversationCompactor(llm, keep_recent_messages=4)
+    compactor.max_history_tokens = compactor._tokens(messages[-5:])
+
+    async def run():
+        compactor.compact(messages)
+        await settle(compactor)
+        llm.fail = False
+        compactor.compact(messages)
+        await settle(compactor)
+        return compactor.compact(messages)
+
+    compacted, covered = asyncio.run(run())
+    assert covered == 6
+    assert len(llm.prompts) == 2
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test the bounded executors: blocking work runs off the event loop and
+overload is rejected with a Retry-After hint.
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.executors import BoundedExecutor, ExecutorGroup, ExecutorSaturatedError
+from src.agents.llm_scheduler import llm_priority, llm_priority_scope
+
+
+def test_jobs_run_on_pool_threads_with_caller_context():
+    executor = BoundedExecutor('search', max_workers=2)
+
+    def job():
+        return threading.current_thread().name, llm_priority.get()
+
+    async def run():
+        with llm_priority_scope('batch'):
+            return await executor.run(job)
+
+    thread, priority = asyncio.run(run())
+    assert thread.startswith('search-pool')
+    assert priority == 'batch'
+    assert executor.get_stats()['completed'] == 1
+    executor.shutdown()
+
+
+def test_full_queue_rejects_with_retry_after():
+    executor = BoundedExecutor('io', max_workers=1, max_queue=1, reject_status=429, max_retry_after=5)
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: 'queued'))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ExecutorSaturatedError) as error:
+            await executor.run(lambda: 'rejected')
+        release.set()
+        assert await queued == 'queued'
+        await running
+        return error.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 429
+    assert 1 <= error.retry_after <= 5
+    stats = executor.get_stats()
+    assert (stats['rejected'], stats['completed'], stats['queued']) == (1, 2, 0)
+    executor.shutdown()
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_job_ends():
+    executor = BoundedExecutor('io', max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def run():
+        job = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.01)
+        job.cancel()
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(lambda: None)  # the thread is still busy
+        release.set()
+        await asyncio.sleep(0.05)
+        assert await executor.run(lambda: 'free') == 'free'
+
+    asyncio.run(run())
+    executor.shutdown()
+
+
+def test_group_from_config():
+    group = ExecutorGroup.from_config({'search': {'max_workers': 3, 'max_queue': 10}})
+    stats = group.get_stats()
+    assert stats['search']['max_workers'] == 3
+    assert (stats['io']['max_workers'], stats['io']['max_queue']) == (1, 32)
+    group.shutdown()
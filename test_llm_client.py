@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test the async Ollama client against an in-process fake Ollama server:
+streamed and whole responses, the in-flight limit, and how failures and
+timeouts surface.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent / "scripts"))
+
+web = pytest.importorskip('aiohttp.web')
+from fake_ollama_server import build_app
+from src.agents.llm_backends import FakeLLMBackend
+from src.agents.llm_client import AsyncOllamaClient, LLMTimeoutError, LLMUnavailableError
+
+BACKEND = dict(base_latency_ms=50, tokens_per_second=1e4, prefill_tokens_per_second=1e6, max_concurrency=8)
+
+
+async def serve(app):
+    """Serve `app` on a free local port; returns (runner, base_url)."""
+    runner = web.AppRunner(app, shutdown_timeout=0.1)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+def run_against(scenario, app=None):
+    async def run():
+        runner, url = await serve(app or build_app(FakeLLMBackend(**BACKEND), 0.0, 0.0))
+        try:
+            return await scenario(url)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+def test_streamed_responses_are_collected():
+    expected = FakeLLMBackend(**BACKEND)
+    first_tokens = []
+
+    async def scenario(url):
+        client = AsyncOllamaClient(url)
+        try:
+            generated = await client.generate(
+                'mistral', "When to plant maize?", on_first_token=lambda: first_tokens.append('generate')
+            )
+            chatted = await client.chat(
+                'mistral', [{'role': 'user', 'content': "How to dip cattle?"}],
+                on_first_token=lambda: first_tokens.append('chat')
+            )
+            whole = await client.generate('mistral', "When to plant maize?", context=[1, 2, 3])
+        finally:
+            await client.close()
+        return generated, chatted, whole
+
+    generated, chatted, whole = run_against(scenario)
+    assert first_tokens == ['generate', 'chat']  # once per call
+    assert generated['response'] == expected.complete("When to plant maize?") == whole['response']
+    assert generated['done'] and generated['eval_count'] > 0
+    assert chatted['message'] == {'role': 'assistant', 'content': expected.complete("How to dip cattle?")}
+    assert whole['context'][:3] == [1, 2, 3]  # not streamed: the server's JSON as is
+
+
+def test_in_flight_calls_are_capped():
+    async def scenario(url):
+        client = AsyncOllamaClient(url, max_concurrency=2)
+        peak = 0
+
+        async def watch():
+            nonlocal peak
+            while True:
+                peak = max(peak, client.in_flight)
+                await asyncio.sleep(0.005)
+
+        watcher = asyncio.ensure_future(watch())
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(client.generate('mistral', f"Question {i}") for i in range(6)))
+        finally:
+            watcher.cancel()
+            await client.close()
+        return peak, time.perf_counter() - start, client.in_flight
+
+    peak, elapsed, in_flight = run_against(scenario)
+    assert peak == 2
+    assert elapsed >= 0.15  # three rounds of two 50 ms calls
+    assert in_flight == 0
+
+
+def test_stalled_call_times_out():
+    async def scenario(url):
+        client = AsyncOllamaClient(url, timeout=0.2)
+        try:
+            with pytest.raises(LLMTimeoutError):
+                await client.generate('mistral', "When to plant maize?")
+            with pytest.raises(LLMTimeoutError):
+                await client.generate('mistral', "When to plant maize?", timeout=0.05, on_first_token=lambda: None)
+        finally:
+            await client.close()
+        return client.in_flight
+
+    assert run_against(scenario, build_app(FakeLLMBackend(**BACKEND), 1.0, 2000)) == 0
+
+
+def failing_app():
+    async def generate(request):
+        body = await request.json()
+        if body['stream']:
+            response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+            await response.prepare(request)
+            await response.write(b'{"response": "Plant", "done": false}\n')
+            await response.write(b'{"error": "model runner crashed"}\n')
+            await response.write_eof()
+            return response
+        return web.json_response({'error': "model 'llama' not found"}, status=404)
+
+    app = web.Application()
+    app.router.add_post('/api/generate', generate)
+    return app
+
+
+def test_server_errors_raise():
+    async def scenario(url):
+        client = AsyncOllamaClient(url)
+        try:
+            with pytest.raises(RuntimeError, match="Ollama returned 404: .*not found"):
+                await client.generate('llama', "When to plant maize?")
+            with pytest.raises(RuntimeError, match="stream error: model runner crashed"):
+                await client.generate('llama', "When to plant maize?", on_first_token=lambda: None)
+            assert not await client.health_check(timeout=1)  # no /api/tags
+        finally:
+            await client.close()
+
+    run_against(scenario, failing_app())
+
+
+def test_llm_wrapper_maps_failures_to_unavailable():
+    rag_agent = pytest.importorskip('src.agents.rag_agent', exc_type=ImportError)
+
+    async def scenario(url):
+        clients = [AsyncOllamaClient(url, timeout=0.2), AsyncOllamaClient("http://127.0.0.1:9", timeout=5)]
+        llms = [rag_agent.OllamaLLM(client=client) for client in clients]
+        try:
+            for llm in llms:
+                with pytest.raises(LLMUnavailableError):
+                    await llm("When to plant maize?")
+        finally:
+            for client in clients:
+                await client.close()
+        return [llm.circuit_breaker.get_stats()['consecutive_failures'] for llm in llms]
+
+    assert run_against(scenario, build_app(FakeLLMBackend(**BACKEND), 1.0, 2000)) == [1, 1]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test the multi-server LLM pool against in-process fake Ollama servers:
+least-outstanding routing, failover and hedged requests.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent / "scripts"))
+
+web = pytest.importorskip('aiohttp.web')
+from fake_ollama_server import build_app
+from src.agents.llm_backends import FakeLLMBackend
+from src.agents.llm_client import AsyncOllamaClient
+from src.agents.llm_pool import LLMBackendPool
+
+
+async def start_server(stall_probability=0.0, stall_ms=0.0, max_concurrency=4):
+    """Serve a fake Ollama on a free local port; returns (runner, base_url)."""
+    backend = FakeLLMBackend(base_latency_ms=20, tokens_per_second=1e4, max_concurrency=max_concurrency)
+    runner = web.AppRunner(build_app(backend, stall_probability, stall_ms), shutdown_timeout=0.1)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def run_with_servers(scenario, *servers):
+    async def run():
+        started = [await start_server(**options) for options in servers]
+        try:
+            return await scenario([url for _, url in started])
+        finally:
+            for runner, _ in started:
+                await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+def test_calls_spread_over_least_outstanding_backends():
+    async def scenario(urls):
+        pool = LLMBackendPool([AsyncOllamaClient(url) for url in urls], health_check_interval=0)
+        results = await asyncio.gather(*(pool.generate('mistral', f"Question {i}") for i in range(4)))
+        await pool.close()
+        return results, pool.get_stats()
+
+    results, stats = run_with_servers(scenario, {}, {})
+    assert all(r['response'] for r in results)
+    assert [b['served'] for b in stats['backends']] == [2, 2]
+
+
+def test_unreachable_backend_fails_over_and_leaves_rotation():
+    async def scenario(urls):
+        dead = AsyncOllamaClient("http://127.0.0.1:9", timeout=5)
+        pool = LLMBackendPool([dead, AsyncOllamaClient(urls[0])], health_check_interval=0)
+        result = await pool.generate('mistral', "When to plant maize?")
+        await pool.generate('mistral', "How to dip cattle?")
+        health = await pool.check_health()
+        await pool.close()
+        return result, pool.get_stats(), health
+
+    result, stats, health = run_with_servers(scenario, {})
+    assert 'maize' in result['response']
+    assert [b['failures'] for b in stats['backends']] == [1, 0]
+    assert [b['served'] for b in stats['backends']] == [0, 2]  # second call skipped the unhealthy server
+    assert health == [False, True]
+
+
+def test_stalled_first_token_is_hedged():
+    async def scenario(urls):
+        pool = LLMBackendPool([AsyncOllamaClient(url) for url in urls], health_check_interval=0, hedge_after_ms=100)
+        result = await asyncio.wait_for(pool.generate('mistral', "When to plant maize?"), timeout=2)
+        await pool.close()
+        return result, pool.get_stats()
+
+    # The first server stalls far past the test's deadline before its first token
+    result, stats = run_with_servers(scenario, {'stall_probability': 1.0, 'stall_ms': 10000}, {})
+    assert result['response']
+    assert (stats['hedged'], stats['hedge_wins']) == (1, 1)
+    assert [b['outstanding'] for b in stats['backends']] == [0, 0]
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test the LLM scheduler: priority order, aging, bounded queues and clients
+that give up while queued.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.llm_backends import FakeLLMBackend
+from src.agents.llm_scheduler import LLMQueueFullError, LLMScheduler, llm_priority_scope
+
+
+async def hold(scheduler, priority, order, release):
+    async with scheduler.slot(priority):
+        order.append(priority)
+        await release.wait()
+
+
+def test_interactive_served_before_queued_background():
+    scheduler = LLMScheduler(FakeLLMBackend(), max_concurrency=1)
+    order = []
+
+    async def run():
+        release = asyncio.Event()
+        release.set()
+        gate = asyncio.Event()
+        busy = asyncio.ensure_future(hold(scheduler, 'batch', order, gate))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(hold(scheduler, p, order, release))
+                   for p in ('background', 'batch', 'interactive')]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(busy, *waiters)
+
+    asyncio.run(run())
+    assert order == ['batch', 'interactive', 'batch', 'background']
+
+
+def test_aging_promotes_long_waiting_background():
+    scheduler = LLMScheduler(FakeLLMBackend(), max_concurrency=1, aging_seconds=0.01)
+    order = []
+
+    async def run():
+        release = asyncio.Event()
+        release.set()
+        gate = asyncio.Event()
+        busy = asyncio.ensure_future(hold(scheduler, 'interactive', order, gate))
+        await asyncio.sleep(0)
+        background = asyncio.ensure_future(hold(scheduler, 'background', order, release))
+        await asyncio.sleep(0.05)  # five classes' worth of aging
+        interactive = asyncio.ensure_future(hold(scheduler, 'interactive', order, release))
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(busy, background, interactive)
+
+    asyncio.run(run())
+    assert order == ['interactive', 'background', 'interactive']
+
+
+def test_full_queue_rejects():
+    scheduler = LLMScheduler(FakeLLMBackend(), max_concurrency=1, queue_limits={'batch': 1})
+
+    async def run():
+        gate = asyncio.Event()
+        busy = asyncio.ensure_future(hold(scheduler, 'batch', [], gate))
+        queued = asyncio.ensure_future(hold(scheduler, 'batch', [], gate))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMQueueFullError):
+            await hold(scheduler, 'batch', [], gate)
+        gate.set()
+        await asyncio.gather(busy, queued)
+
+    asyncio.run(run())
+    assert scheduler.get_queue_stats()['classes']['batch']['rejected'] == 1
+
+
+def test_cancelled_waiters_free_their_queue_places():
+    scheduler = LLMScheduler(FakeLLMBackend(), max_concurrency=1, queue_limits={'interactive': 2})
+
+    async def run():
+        gate = asyncio.Event()
+        busy = asyncio.ensure_future(hold(scheduler, 'interactive', [], gate))
+        await asyncio.sleep(0)
+        for _ in range(5):  # clients that disconnect while queued
+            abandoned = [asyncio.ensure_future(hold(scheduler, 'interactive', [], gate)) for _ in range(2)]
+            await asyncio.sleep(0)
+            for task in abandoned:
+                task.cancel()
+            await asyncio.gather(*abandoned, return_exceptions=True)
+            assert scheduler.get_queue_stats()['classes']['interactive']['queue_depth'] == 0
+
+        order = []
+        queued = [asyncio.ensure_future(hold(scheduler, 'interactive', order, gate)) for _ in range(2)]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(busy, *queued)
+        assert order == ['interactive', 'interactive']
+
+    asyncio.run(run())
+    stats = scheduler.get_queue_stats()
+    assert stats['classes']['interactive']['rejected'] == 0
+    assert stats['active'] == 0
+
+
+def test_priority_follows_context():
+    scheduler = LLMScheduler(FakeLLMBackend(base_latency_ms=1, tokens_per_second=1e6), max_concurrency=1)
+
+    async def run():
+        with llm_priority_scope('background'):
+            await scheduler.generate('m', 'hello')
+
+    asyncio.run(run())
+    assert scheduler.get_queue_stats()['classes']['background']['dispatched'] == 1
+    with pytest.raises(ValueError):
+        with llm_priority_scope('urgent'):
+            pass
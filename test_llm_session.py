@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test that the LLM session keeps num_ctx stable per model, so Ollama is not
+made to reload the model when prompt sizes vary.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.llm_backends import FakeLLMBackend
+from src.agents.llm_session import LLMSessionManager
+
+
+class RecordingBackend(FakeLLMBackend):
+    """Fake backend remembering the num_ctx of every call."""
+
+    def __init__(self):
+        super().__init__(time_scale=0)
+        self.num_ctx = []
+
+    async def generate(self, model, prompt, options=None, timeout=None, **kwargs):
+        self.num_ctx.append((model, (options or {}).get('num_ctx')))
+        return await super().generate(model, prompt, options=options, timeout=timeout, **kwargs)
+
+
+def test_num_ctx_is_sticky_max_per_model():
+    backend = RecordingBackend()
+    session = LLMSessionManager(backend, 'mistral', ping_interval=0, context_sizes=[2048, 4096, 8192],
+                                default_num_ctx=2048)
+    short, long = 'short question', 'word ' * 4000
+
+    async def run():
+        await session.warm_up()
+        await session.generate('mistral', short)
+        await session.generate('mistral', long)
+        await session.generate('mistral', short)
+        await session.generate('other', short)
+        await session._load()
+
+    asyncio.run(run())
+    assert backend.num_ctx == [
+        ('mistral', 2048),  # warm-up
+        ('mistral', 2048),
+        ('mistral', 8192),
+        ('mistral', 8192),  # not shrunk back: that would reload the model
+        ('other', 2048),  # each model has its own size
+        ('mistral', 8192),  # keep-alive loads at the current size
+    ]
+    assert session.get_session_stats()['model_num_ctx'] == {'mistral': 8192, 'other': 2048}
+
+
+def test_explicit_num_ctx_is_respected():
+    backend = RecordingBackend()
+    session = LLMSessionManager(backend, 'mistral', ping_interval=0)
+    asyncio.run(session.generate('mistral', 'hello', options={'num_ctx': 1024}))
+    assert backend.num_ctx == [('mistral', 1024)]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test the Prometheus text rendering of metrics, the stage timer and the HTTP
+request metrics recorded by the API.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.monitoring.metrics import STAGE_ERRORS, STAGE_SECONDS, Counter, Histogram, timed
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram('agri_test_seconds', 'Test latency', ['route'], buckets=(1.0, 0.1))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.labels('/query').observe(value)
+
+    assert histogram.render() == [
+        '# HELP agri_test_seconds Test latency',
+        '# TYPE agri_test_seconds histogram',
+        'agri_test_seconds_bucket{route="/query",le="0.1"} 2',  # upper bounds are inclusive
+        'agri_test_seconds_bucket{route="/query",le="1"} 3',
+        'agri_test_seconds_bucket{route="/query",le="+Inf"} 4',
+        'agri_test_seconds_sum{route="/query"} 5.65',
+        'agri_test_seconds_count{route="/query"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter('agri_test_total', 'Test count', ['query'])
+    counter.labels('say "hi"\\n\nbye').inc(2)
+    assert counter.render()[-1] == 'agri_test_total{query="say \\"hi\\"\\\\n\\nbye"} 2'
+    with pytest.raises(ValueError):
+        counter.labels('a', 'b')
+
+
+def stage_counts(stage):
+    """(calls timed, calls that raised) for a stage."""
+    return sum(STAGE_SECONDS.labels(stage).counts), STAGE_ERRORS.labels(stage).value
+
+
+def test_timed_records_sync_and_async_errors():
+    @timed('test_sync_stage')
+    def parse(text):
+        if not text:
+            raise ValueError("empty")
+        return text.upper()
+
+    @timed('test_async_stage')
+    async def fetch(ok):
+        await asyncio.sleep(0)
+        if not ok:
+            raise RuntimeError("down")
+        return 'data'
+
+    assert parse('maize') == 'MAIZE'
+    with pytest.raises(ValueError):
+        parse('')
+    assert asyncio.run(fetch(True)) == 'data'
+    with pytest.raises(RuntimeError):
+        asyncio.run(fetch(False))
+    with pytest.raises(KeyError):
+        with timed('test_block_stage'):
+            raise KeyError('district')
+
+    assert stage_counts('test_sync_stage') == (2, 1)
+    assert stage_counts('test_async_stage') == (2, 1)
+    assert stage_counts('test_block_stage') == (1, 1)
+    assert parse.__name__ == 'parse' and asyncio.iscoroutinefunction(fetch)
+
+
+async def get(app, path):
+    sent = []
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    done = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '', 'headers': [],
+        'client': ('10.0.0.42', 5000), 'server': ('testserver', 80)
+    }
+    await app(scope, receive, send)
+    done.set()
+    status = next(m['status'] for m in sent if m['type'] == 'http.response.start')
+    return status, b''.join(m.get('body', b'') for m in sent if m['type'] == 'http.response.body').decode()
+
+
+def test_http_metrics_label_routes_by_template(monkeypatch):
+    main = pytest.importorskip('src.api.main', exc_type=ImportError)
+    monkeypatch.setattr(main, 'geo_context', None)  # the route answers 503 without loading anything
+
+    async def run():
+        for district in ('Zvimba', 'Binga'):
+            assert (await get(main.app, f"/district/{district}"))[0] == 503
+        assert (await get(main.app, "/no-such-page"))[0] == 404
+        return await get(main.app, "/metrics")
+
+    status, text = asyncio.run(run())
+    assert status == 200
+    requests = {
+        line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+        for line in text.splitlines() if line.startswith('agri_http_requests_total{')
+    }
+    assert requests['agri_http_requests_total{method="GET",route="/district/{district_name}",status="503"}'] >= 2
+    assert 'agri_http_requests_total{method="GET",route="unmatched",status="404"}' in requests
+    assert 'agri_http_request_duration_seconds_count{method="GET",route="/district/{district_name}"}' in text
+    assert 'Zvimba' not in text and 'Binga' not in text and 'no-such-page' not in text
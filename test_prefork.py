@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test pre-fork support: JSON stores shared between worker processes and the
+split of per-process limits between workers.
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.api.prefork import SharedFileStore, split_limits
+
+PROJECT_ROOT = Path(__file__).parent
+from src.api.rate_limit import RateLimiter
+
+
+class JsonStore:
+    """Minimal store in the style of EVCTracker: whole-file rewrite on every save."""
+
+    def __init__(self, storage_path):
+        self.storage_path = storage_path
+        self.items = self._load_items()
+
+    def _load_items(self):
+        path = Path(self.storage_path) / 'items.json'
+        return json.loads(path.read_text()) if path.exists() else {}
+
+    def add(self, key, value):
+        self.items[key] = value
+        (Path(self.storage_path) / 'items.json').write_text(json.dumps(self.items))
+
+    def count(self):
+        return len(self.items)
+
+
+def wrap(path, check_interval=0.05):
+    return SharedFileStore(JsonStore, path, {'items': '_load_items'}, writes=('add',), check_interval=check_interval)
+
+
+def test_concurrent_workers_keep_every_write(tmp_path):
+    children = []
+    for worker in range(4):
+        pid = os.fork()
+        if pid == 0:
+            store = wrap(tmp_path)
+            for i in range(25):
+                store.add(f"{worker}-{i}", i)
+            os._exit(0)
+        children.append(pid)
+    for pid in children:
+        assert os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]) == 0
+    assert len(json.loads((tmp_path / 'items.json').read_text())) == 100
+
+
+def test_reads_do_no_file_io_and_catch_up_in_background(tmp_path):
+    reader, writer = wrap(tmp_path), wrap(tmp_path)
+    checks = []
+    signature = reader._files_signature
+    reader._files_signature = lambda: checks.append(1) or signature()
+
+    writer.add('a', 1)
+    for _ in range(100):
+        reader.count()  # served from memory
+    assert len(checks) <= 1  # throttled to one background check per interval
+
+    deadline = time.monotonic() + 2
+    while reader.count() != 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert reader.items == {'a': 1}
+    assert reader.reloads == 1
+
+
+def test_writes_reload_first(tmp_path):
+    first, second = wrap(tmp_path, check_interval=3600), wrap(tmp_path, check_interval=3600)
+    first.add('a', 1)
+    second.add('b', 2)  # reloads 'a' before saving
+    assert json.loads((tmp_path / 'items.json').read_text()) == {'a': 1, 'b': 2}
+
+
+def test_split_limits_between_workers():
+    config = {
+        'llm': {
+            'max_concurrency': 4,
+            'backends': [{'base_url': 'http://a', 'max_concurrency': 3}],
+            'scheduler': {'queue_limits': {'interactive': 64, 'batch': 256, 'background': 1}}
+        },
+        'rate_limit': {'shared': {'enabled': False}}
+    }
+    split_limits(config, 4)
+    assert config['llm']['max_concurrency'] == 1
+    assert config['llm']['backends'][0]['max_concurrency'] == 1
+    assert config['llm']['scheduler']['queue_limits'] == {'interactive': 16, 'batch': 64, 'background': 1}
+    assert config['rate_limit']['shared']['enabled'] is True
+
+    single = {'llm': {'max_concurrency': 4}}
+    split_limits(single, 1)
+    assert single == {'llm': {'max_concurrency': 4}}
+
+
+def test_rate_limiter_switches_to_shared_buckets(tmp_path):
+    limiter = RateLimiter({'llm': {'rate': 0.001, 'burst': 2, 'paths': ['/query']}})
+    limiter.share(str(tmp_path / 'buckets'), slots=16)
+    other = RateLimiter({'llm': {'rate': 0.001, 'burst': 2, 'paths': ['/query']}},
+                        shared_path=str(tmp_path / 'buckets'), shared_slots=16)
+    assert limiter.acquire('1.2.3.4', 'llm') == 0
+    assert other.acquire('1.2.3.4', 'llm') == 0
+    assert limiter.acquire('1.2.3.4', 'llm') > 0  # the other instance drew from the same bucket
+    assert limiter.get_stats()['shared'] is True
+
+
+# Runs `python -m src.api.prefork` (runpy is what -m uses) against a stand-in
+# application module and uvicorn, so each worker reports what its services get
+ENTRY_POINT = textwrap.dedent("""
+    import os, runpy, sys, time, types
+
+    records = sys.argv[1]
+    api = types.ModuleType('src.api.main')
+    api.app = object()
+    api.config = {'api': {'host': '127.0.0.1', 'port': 0, 'prefork': {'workers': 2}}}
+    api.configure_workers = lambda workers: None
+    api.register_services = lambda: None
+    api.services = types.SimpleNamespace(preload=lambda: None)
+    sys.modules['src.api.main'] = api
+
+    class Store:
+        def __init__(self, path):
+            self.path = path
+
+    class Server:
+        def __init__(self, config):
+            pass
+
+        def run(self, sockets):
+            from src.api import prefork
+            store = prefork.shared_store(Store, records, {}, writes=())
+            with open(os.path.join(records, f"worker-{os.getpid()}"), 'w') as f:
+                f.write(f"{prefork.worker_id()} {type(store).__name__}")
+            time.sleep(60)
+
+    sys.modules['uvicorn'] = types.SimpleNamespace(Config=lambda app, **kwargs: None, Server=Server)
+    sys.argv = ['prefork', '--workers', '2']
+    runpy.run_module('src.api.prefork', run_name='__main__', alter_sys=True)
+""")
+
+
+def test_entry_point_workers_get_shared_stores(tmp_path):
+    master = subprocess.Popen([sys.executable, '-c', ENTRY_POINT, str(tmp_path)], cwd=PROJECT_ROOT)
+    try:
+        deadline = time.monotonic() + 20
+        while len(list(tmp_path.glob('worker-*'))) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        records = sorted(path.read_text() for path in tmp_path.glob('worker-*'))
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=20)
+    assert records == ['0 SharedFileStore', '1 SharedFileStore']
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Test per-client token buckets and how batch queries are charged and
+retrieved.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.llm_backends import FakeLLMBackend
+from src.api import rate_limit
+from src.api.readiness import ReadinessGate
+from src.api.rate_limit import LocalBuckets, RateLimiter, RateLimitMiddleware, SharedBuckets, _refill_and_take
+
+
+class FakeClock:
+    """Stands in for the `time` module inside rate_limit."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+
+def limiter(rate=1.0, burst=5):
+    return RateLimiter({'llm': {'rate': rate, 'burst': burst, 'paths': ['/query', '/query/batch']}})
+
+
+def test_refill_and_take():
+    assert _refill_and_take(0.0, 0.0, 50.0, rate=2.0, burst=10, cost=1) == (9.0, 0.0)  # new bucket starts full
+    assert _refill_and_take(0.0, 10.0, 12.0, rate=2.0, burst=10, cost=1) == (3.0, 0.0)  # 2 s at 2/s
+    assert _refill_and_take(3.0, 10.0, 100.0, rate=2.0, burst=10, cost=1) == (9.0, 0.0)  # capped at burst
+    assert _refill_and_take(0.5, 10.0, 10.0, rate=2.0, burst=10, cost=1) == (0.5, 0.25)  # refused, wait for the rest
+    assert _refill_and_take(0.0, 10.0, 5.0, rate=2.0, burst=10, cost=1) == (9.0, 0.0)  # clock went back: full
+
+
+@pytest.mark.parametrize('shared', [False, True])
+def test_bucket_refills_at_rate(monkeypatch, tmp_path, shared):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, 'time', clock)
+    buckets = SharedBuckets(str(tmp_path / 'llm'), slots=64) if shared else LocalBuckets()
+
+    for _ in range(3):
+        assert buckets.take('a', rate=0.5, burst=3, cost=1) == 0
+    assert buckets.take('a', rate=0.5, burst=3, cost=1) == pytest.approx(2.0)
+    assert buckets.take('b', rate=0.5, burst=3, cost=1) == 0  # other clients are unaffected
+
+    clock.now += 1.0
+    assert buckets.take('a', rate=0.5, burst=3, cost=1) == pytest.approx(1.0)  # half a token so far
+    clock.now += 1.0
+    assert buckets.take('a', rate=0.5, burst=3, cost=1) == 0
+    clock.now += 3600
+    for _ in range(3):
+        assert buckets.take('a', rate=0.5, burst=3, cost=1) == 0
+    assert buckets.take('a', rate=0.5, burst=3, cost=1) > 0
+
+
+def test_local_buckets_evict_least_recently_seen(monkeypatch):
+    monkeypatch.setattr(rate_limit, 'time', FakeClock())
+    buckets = LocalBuckets(max_clients=2)
+    buckets.take('a', rate=0.001, burst=1, cost=1)
+    buckets.take('b', rate=0.001, burst=1, cost=1)
+    assert buckets.take('a', rate=0.001, burst=1, cost=1) > 0  # touches 'a'
+    buckets.take('c', rate=0.001, burst=1, cost=1)  # evicts 'b'
+    assert len(buckets) == 2
+    assert buckets.take('b', rate=0.001, burst=1, cost=1) == 0  # forgotten, so full again
+    assert buckets.take('a', rate=0.001, burst=1, cost=1) == 0  # evicted in turn by 'b'
+
+
+def test_middleware_answers_429_with_retry_after():
+    rate_limiter = RateLimiter({'llm': {'rate': 0.1, 'burst': 1, 'paths': ['/query']}})
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope.get('state', {}).get('rate_limit_client'))
+
+    middleware = RateLimitMiddleware(app, rate_limiter)
+
+    async def request(path):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware({'type': 'http', 'path': path, 'headers': [], 'client': ('10.0.0.1', 5000)}, None, send)
+        return sent
+
+    async def run():
+        assert await request('/query') == []
+        rejected = await request('/query')
+        assert await request('/districts') == []  # not limited
+        return rejected
+
+    rejected = asyncio.run(run())
+    assert calls == ['10.0.0.1', None]
+    start = rejected[0]
+    assert start['status'] == 429
+    assert dict(start['headers'])[b'retry-after'] == b'10'
+    assert rate_limiter.get_stats()['buckets']['llm']['rejected'] == 1
+
+
+def test_cost_above_burst_is_refused_not_capped():
+    rate_limiter = limiter(burst=5)
+    with pytest.raises(ValueError):
+        rate_limiter.acquire('1.2.3.4', 'llm', cost=6)
+    assert rate_limiter.acquire('1.2.3.4', 'llm', cost=5) == 0
+    assert rate_limiter.acquire('1.2.3.4', 'llm', cost=1) > 0
+
+
+class FanoutStore:
+    """VectorStore double for batch retrieval; multi-query search must not be used in fanout mode."""
+
+    index_version = 0
+
+    def embed_queries(self, texts):
+        return [[1.0, float(i)] for i, _ in enumerate(texts)]
+
+    def search_batch(self, *args, **kwargs):
+        raise AssertionError("batch used the semantic multi-query search in fanout mode")
+
+
+class RecordingFanout:
+    def __init__(self):
+        self.queries = []
+
+    async def retrieve(self, query, query_embedding=None):
+        self.queries.append(query)
+        result = {'content': f"Evidence for {query}.", 'metadata': {'source': 'guide.pdf', 'filename': 'guide.pdf', 'page': 1},
+                  'similarity_score': 0.9}
+        return [result], {'tools': ['semantic_search'], 'categories': []}
+
+
+def test_batch_uses_fanout_retrieval():
+    rag_agent = pytest.importorskip('src.agents.rag_agent', exc_type=ImportError)
+    fanout = RecordingFanout()
+    agent = rag_agent.AgricultureRAGAgent(
+        vector_store=FanoutStore(),
+        llm_client=FakeLLMBackend(base_latency_ms=1, tokens_per_second=1e6),
+        retrieval_mode='fanout',
+        tool_fanout=fanout
+    )
+    items = [{'query': 'When to plant maize?'}, {'query': 'How to dip cattle?'}, {'query': 'When to plant maize?'}]
+
+    async def run():
+        return [result async for result in agent.query_batch(items)]
+
+    results = dict(asyncio.run(run()))
+    assert not any(isinstance(r, Exception) for r in results.values()), results
+    assert sorted(fanout.queries) == ['How to dip cattle?', 'When to plant maize?']  # duplicates coalesced
+    assert results[1]['tool_used'] == 'agentic_fanout_with_geo_context'
+
+
+class BatchAgent:
+    """Answers every batch item at once."""
+
+    async def query_batch(self, items, include_translations=False, max_workers=4):
+        for index, item in enumerate(items):
+            yield index, {'query': item['query'], 'response': f"Answer {index}", 'tool_used': 'fake'}
+
+
+async def post(app, path, payload, client):
+    body = json.dumps(payload).encode()
+    sent = []
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    done = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+        'client': (client, 5000), 'server': ('testserver', 80)
+    }
+    await app(scope, receive, send)
+    done.set()
+    status = next(m['status'] for m in sent if m['type'] == 'http.response.start')
+    return status, b''.join(m.get('body', b'') for m in sent if m['type'] == 'http.response.body')
+
+
+def test_default_config_admits_batches_larger_than_llm_burst(monkeypatch):
+    main = pytest.importorskip('src.api.main', exc_type=ImportError)
+    readiness = ReadinessGate()
+    readiness.ready('rag_agent', BatchAgent())
+    monkeypatch.setattr(main, 'readiness', readiness)
+    monkeypatch.setattr(main, 'rag_agent', BatchAgent())
+    llm_burst = main.rate_limiter.classes['llm']['burst']
+    items = [{'id': str(i), 'query': f"Question {i}"} for i in range(int(llm_burst) * 5)]
+
+    async def run():
+        first = await post(main.app, '/query/batch', {'items': items}, '10.0.0.34')
+        second = await post(main.app, '/query/batch', {'items': items}, '10.0.0.34')
+        return first, second
+
+    for status, body in asyncio.run(run()):
+        assert status == 200, body
+        lines = [json.loads(line) for line in body.decode().splitlines()]
+        assert sorted(line['index'] for line in lines) == list(range(len(items)))
+    # The batches drew from their own bucket, not the one guarding /query
+    assert main.rate_limiter.classify('/query/batch') == 'batch'
+    assert main.rate_limiter.acquire('10.0.0.34', 'llm', cost=llm_burst) == 0
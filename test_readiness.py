@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test the readiness gate: requests park until the subsystem they need has
+loaded, and fail fast once it is known to be unavailable.
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.api.readiness import ReadinessGate, ServiceUnavailableError
+
+
+def test_requests_park_until_a_loader_thread_finishes():
+    gate = ReadinessGate(timeout_seconds=5)
+    gate.expect('rag_agent')
+
+    def load():
+        with gate.loading('rag_agent') as slot:
+            slot['instance'] = 'agent'
+
+    async def run():
+        waiters = [asyncio.ensure_future(gate.get('rag_agent')) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert gate.peek('rag_agent') is None
+        threading.Thread(target=load).start()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(run()) == ['agent'] * 3
+    stats = gate.get_stats()['rag_agent']
+    assert stats['state'] == 'ready' and stats['parked_requests'] == 3
+    assert gate.peek('rag_agent') == 'agent'
+
+
+def test_failure_wakes_parked_requests():
+    gate = ReadinessGate(timeout_seconds=5)
+    gate.expect('vector_store')
+
+    async def run():
+        waiter = asyncio.ensure_future(gate.get('vector_store'))
+        await asyncio.sleep(0.01)
+        gate.failed('vector_store', FileNotFoundError("no vector database"))
+        with pytest.raises(ServiceUnavailableError, match="no vector database"):
+            await waiter
+        with pytest.raises(ServiceUnavailableError, match="failed to load"):
+            await gate.get('vector_store')  # later requests fail at once
+
+    asyncio.run(run())
+
+
+def test_timeout_and_unknown_subsystems():
+    gate = ReadinessGate(timeout_seconds=0.02, retry_after=7)
+    gate.expect('translator')
+
+    async def run():
+        with pytest.raises(ServiceUnavailableError, match="still loading") as error:
+            await gate.get('translator')
+        assert error.value.retry_after == 7
+        with pytest.raises(ServiceUnavailableError, match="not configured"):
+            await gate.get('weather_api')
+
+    asyncio.run(run())
+    assert gate.get_stats()['translator']['timed_out'] == 1
+
+
+def test_fail_pending_after_loader_crash():
+    gate = ReadinessGate()
+    gate.expect('rag_agent', 'translator')
+    gate.ready('translator', 'translator')
+    gate.fail_pending(RuntimeError("loader crashed"))
+    stats = gate.get_stats()
+    assert stats['rag_agent']['state'] == 'failed'
+    assert stats['translator']['state'] == 'ready'
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test response encoding: field projection, source truncation,
+Accept-Encoding negotiation and compression of complete (but not streamed)
+responses.
+"""
+
+import asyncio
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.api import responses
+from src.api.readiness import ReadinessGate
+from src.api.responses import CompressionMiddleware, negotiate_encoding, project, truncate_sources
+
+
+def test_negotiate_encoding(monkeypatch):
+    monkeypatch.setattr(responses, 'brotli', None)
+    assert negotiate_encoding('gzip, deflate') == 'gzip'
+    assert negotiate_encoding('br') is None
+    assert negotiate_encoding('gzip;q=0') is None
+    assert negotiate_encoding('*') == 'gzip'
+    assert negotiate_encoding('') is None
+
+    monkeypatch.setattr(responses, 'brotli', object())
+    assert negotiate_encoding('gzip, br') == 'br'
+    assert negotiate_encoding('gzip;q=1.0, br;q=0.5') == 'gzip'
+    assert negotiate_encoding('gzip, br', brotli_enabled=False) == 'gzip'
+    assert negotiate_encoding('br;q=bogus, gzip') == 'gzip'
+
+
+def test_projection_and_truncation():
+    payload = {'response': 'Plant early.', 'sources': [], 'timings': {}}
+    assert project(payload, {'response'}) == {'response': 'Plant early.'}
+    assert project(payload, None) is payload
+
+    sources = [{'content': 'x' * 50}, {'content': 'short'}]
+    truncated = truncate_sources(sources, 10)
+    assert truncated[0] == {'content': 'x' * 10, 'truncated': True}
+    assert truncated[1] is sources[1]
+    assert sources[0]['content'] == 'x' * 50  # shared input untouched
+
+
+def run_app(body, content_type=b'application/json', chunks=1, accept=b'gzip'):
+    """Send `body` through CompressionMiddleware; returns the messages the client receives."""
+    async def app(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode())]})
+        size = len(body) // chunks
+        for i in range(chunks):
+            part = body[i * size:] if i == chunks - 1 else body[i * size:(i + 1) * size]
+            await send({'type': 'http.response.body', 'body': part, 'more_body': i < chunks - 1})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'path': '/query', 'headers': [(b'accept-encoding', accept)]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, None, send))
+    return dict(sent[0]['headers']), sent[1:]
+
+
+def test_large_json_is_gzipped():
+    body = json.dumps({'sources': ['maize'] * 200}).encode()
+    headers, messages = run_app(body)
+    assert headers[b'content-encoding'] == b'gzip'
+    assert headers[b'vary'] == b'Accept-Encoding'
+    assert gzip.decompress(messages[0]['body']) == body
+    assert int(headers[b'content-length']) == len(messages[0]['body'])
+
+
+def test_small_streamed_or_binary_bodies_pass_through():
+    small = b'{"ok": true}'
+    headers, messages = run_app(small)
+    assert b'content-encoding' not in headers and messages[0]['body'] == small
+
+    lines = b''.join(json.dumps({'index': i}).encode() + b'\n' for i in range(100))
+    headers, messages = run_app(lines, content_type=b'application/x-ndjson', chunks=4)
+    assert b'content-encoding' not in headers
+    assert b''.join(m['body'] for m in messages) == lines
+
+    image = b'\x89PNG' + b'\x00' * 500
+    headers, _ = run_app(image, content_type=b'image/png')
+    assert b'content-encoding' not in headers
+
+    headers, _ = run_app(b'x' * 500, content_type=b'text/plain', accept=b'identity')
+    assert b'content-encoding' not in headers
+
+
+class SearchStore:
+    """VectorStore double returning one result in the shape of search_with_score_threshold."""
+
+    def search_with_score_threshold(self, query, top_k=5, score_threshold=0.5, filter_metadata=None):
+        return [{'content': "Plant maize after 25 mm of rain. " * 10, 'metadata': {'source': 'maize.pdf', 'page': 3},
+                 'distance': 0.1, 'id': 'maize-3', 'similarity_score': 0.9}]
+
+
+async def get(app, path, query_string):
+    sent = []
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    done = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': query_string.encode(), 'root_path': '',
+        'headers': [], 'client': ('10.0.0.45', 5000), 'server': ('testserver', 80)
+    }
+    await app(scope, receive, send)
+    done.set()
+    status = next(m['status'] for m in sent if m['type'] == 'http.response.start')
+    return status, json.loads(b''.join(m.get('body', b'') for m in sent if m['type'] == 'http.response.body'))
+
+
+def test_search_validates_fields(monkeypatch):
+    main = pytest.importorskip('src.api.main', exc_type=ImportError)
+    readiness = ReadinessGate()
+    readiness.ready('vector_store', SearchStore())
+    monkeypatch.setattr(main, 'readiness', readiness)
+    monkeypatch.setattr(main, 'vector_store', SearchStore())
+
+    async def run():
+        rejected = await get(main.app, '/search', 'q=maize&fields=content,score')
+        projected = await get(main.app, '/search', 'q=maize&fields=metadata,similarity_score&source_chars=20')
+        truncated = await get(main.app, '/search', 'q=maize&source_chars=20')
+        return rejected, projected, truncated
+
+    (status, body), projected, truncated = asyncio.run(run())
+    assert status == 422
+    assert body['detail'].startswith("Unknown fields: score.")
+    assert projected == (200, {'query': 'maize', 'results': [
+        {'metadata': {'source': 'maize.pdf', 'page': 3}, 'similarity_score': 0.9}
+    ]})
+    assert truncated[0] == 200 and set(truncated[1]['results'][0]) >= {'content', 'distance', 'id'}
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test the service container: independent services load concurrently,
+dependencies are built first and shared, and lazy services wait for use.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.api.readiness import ReadinessGate, ServiceUnavailableError
+from src.api.services import ServiceContainer
+
+
+def slow(value, seconds=0.1):
+    def factory(**dependencies):
+        time.sleep(seconds)
+        return (value, dependencies)
+    return factory
+
+
+def test_independent_services_load_concurrently():
+    services = ServiceContainer(ReadinessGate(), init_workers=4)
+    for name in ('embedding_model', 'geo_context', 'weather_api'):
+        services.register(name, slow(name))
+
+    async def build_agent(embedding_model, geo_context):
+        return ('rag_agent', embedding_model, geo_context)
+
+    services.register('rag_agent', build_agent, depends_on=('embedding_model', 'geo_context'))
+    ready = []
+
+    async def run():
+        await services.start(on_ready=lambda name, _: ready.append(name))
+        return await services.get('rag_agent')
+
+    agent = asyncio.run(run())
+    assert agent[1] is services.peek('embedding_model')  # shared instance
+    assert ready.index('rag_agent') > max(ready.index('embedding_model'), ready.index('geo_context'))
+    timeline = services.timeline()
+    assert timeline['serial_ms'] >= 300
+    assert timeline['time_to_ready_ms'] < 250  # the three 100 ms loads overlapped
+    services.shutdown()
+
+
+def test_lazy_services_build_on_first_use_only():
+    services = ServiceContainer(ReadinessGate())
+    calls = []
+    services.register('geo_context', lambda: calls.append('geo') or 'geo')
+    services.register('translator', lambda geo_context: calls.append('translator') or 'translator',
+                      depends_on=('geo_context',), lazy=True)
+
+    async def run():
+        await services.start()
+        assert services.timeline()['lazy_pending'] == ['translator']
+        results = await asyncio.gather(services.get('translator'), services.get('translator'))
+        assert results == ['translator', 'translator']
+
+    asyncio.run(run())
+    assert calls == ['geo', 'translator']
+    services.shutdown()
+
+
+def test_failed_dependency_fails_dependents():
+    gate = ReadinessGate()
+    services = ServiceContainer(gate)
+
+    def no_vector_db():
+        raise FileNotFoundError("no vector database")
+
+    services.register('vector_store', no_vector_db)
+    services.register('rag_agent', lambda vector_store: 'agent', depends_on=('vector_store',))
+    services.register('geo_context', lambda: 'geo')
+
+    async def run():
+        await services.start()
+        with pytest.raises(ServiceUnavailableError, match="dependency failed"):
+            await services.get('rag_agent')
+        return await services.get('geo_context')
+
+    assert asyncio.run(run()) == 'geo'
+    assert gate.get_stats()['vector_store']['error'] == 'no vector database'
+    services.shutdown()
+
+
+def test_preloaded_services_are_reused():
+    services = ServiceContainer(ReadinessGate())
+    services.register('geo_context', lambda: object(), preload=True)
+    services.register('weather_api', lambda geo_context: geo_context, depends_on=('geo_context',))
+    services.preload()
+    preloaded = services.peek('geo_context')
+
+    async def run():
+        await services.start()
+        return await services.get('weather_api')
+
+    assert asyncio.run(run()) is preloaded
+    assert services.timeline()['services'][0]['preloaded'] is True
+    services.shutdown()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test single-flight coalescing of identical in-flight queries.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.single_flight import SingleFlight, normalize_query, query_key
+
+
+def test_query_key_normalizes_text_and_buckets_coordinates():
+    assert normalize_query("  When to PLANT maize? ") == normalize_query("when to plant maize?")
+    assert query_key("When to plant maize?", "Chipinge ") == query_key("when to plant  maize?", "chipinge")
+    assert query_key("q", lat=-17.8312, lon=31.0521) == query_key("q", lat=-17.8341, lon=31.0479)
+    assert query_key("q", "Chipinge", index_version=1) != query_key("q", "Chipinge", index_version=2)
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'answer': 42}
+
+    async def run():
+        results = await asyncio.gather(*(flight.do('k', compute) for _ in range(5)))
+        assert all(r is results[0] for r in results)
+        await flight.do('k', compute)  # finished keys are recomputed
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    stats = flight.get_stats()
+    assert (stats['executed'], stats['coalesced'], stats['in_flight']) == (2, 4, 0)
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return 'done'
+
+    async def run():
+        first = asyncio.ensure_future(flight.do('k', compute))
+        second = asyncio.ensure_future(flight.do('k', compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == 'done'
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(run())
+
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    flight = SingleFlight()
+    attempts = []
+
+    async def compute():
+        attempts.append(1)
+        await asyncio.sleep(0)
+        raise RuntimeError("LLM down")
+
+    async def run():
+        results = await asyncio.gather(flight.do('k', compute), flight.do('k', compute), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await flight.do('k', compute)
+
+    asyncio.run(run())
+    assert len(attempts) == 2
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test precomputed static responses: ETags, 304 revalidation, compressed
+variants and rebuilds when the data changes.
+"""
+
+import gzip
+import json
+import os
+import sys
+from pathlib import Path
+
+from starlette.requests import Request
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.api.static_responses import StaticResponseCache
+
+
+def request(accept_encoding='', if_none_match=None):
+    headers = [(b'accept-encoding', accept_encoding.encode())]
+    if if_none_match:
+        headers.append((b'if-none-match', if_none_match.encode()))
+    return Request({'type': 'http', 'method': 'GET', 'path': '/districts', 'headers': headers})
+
+
+DISTRICTS = {'total': 2, 'districts': [{'name': f"District {i}", 'region': 'Region IV'} for i in range(2)] * 40}
+
+
+def test_etag_revalidation_per_encoding():
+    cache = StaticResponseCache(max_age=300)
+    cache.register('districts', lambda: DISTRICTS)
+
+    plain = cache.respond('districts', request())
+    assert json.loads(plain.body) == DISTRICTS
+    assert plain.headers['cache-control'] == 'public, max-age=300'
+    assert plain.headers['vary'] == 'Accept-Encoding'
+
+    zipped = cache.respond('districts', request('gzip'))
+    assert zipped.headers['content-encoding'] == 'gzip'
+    assert gzip.decompress(zipped.body) == plain.body
+    assert zipped.headers['etag'] != plain.headers['etag']
+
+    # Either representation's tag revalidates the same body
+    for etag in (plain.headers['etag'], zipped.headers['etag'], f"W/{plain.headers['etag']}", '*'):
+        assert cache.respond('districts', request('gzip', if_none_match=etag)).status_code == 304
+    assert cache.respond('districts', request(if_none_match='"stale"')).status_code == 200
+    assert cache.get_stats()['not_modified'] == 4
+
+
+def test_refresh_changes_etag():
+    data = {'total': 1, 'districts': ['Chipinge']}
+    cache = StaticResponseCache(min_compress_bytes=10 ** 6)
+    cache.register('districts', lambda: data)
+    before = cache.respond('districts', request('gzip'))
+    assert 'content-encoding' not in before.headers  # below min_compress_bytes
+
+    data = {'total': 2, 'districts': ['Chipinge', 'Gwanda']}
+    assert cache.respond('districts', request()).headers['etag'] == before.headers['etag']  # not rebuilt yet
+    cache.refresh('districts')
+    after = cache.respond('districts', request(if_none_match=before.headers['etag']))
+    assert after.status_code == 200
+    assert json.loads(after.body)['total'] == 2
+
+
+def test_watched_files_rebuild_when_modified(tmp_path):
+    page = tmp_path / 'index.html'
+    page.write_text('<h1>v1</h1>')
+    cache = StaticResponseCache(html_max_age=0, check_interval=0)
+    cache.register_file('index', str(page), 'text/html; charset=utf-8')
+    first = cache.respond('index', request())
+    assert first.body == b'<h1>v1</h1>'
+    assert first.headers['cache-control'] == 'public, max-age=0, must-revalidate'
+
+    page.write_text('<h1>v2</h1>')
+    stat = page.stat()
+    os.utime(page, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    second = cache.respond('index', request(if_none_match=first.headers['etag']))
+    assert second.status_code == 200 and second.body == b'<h1>v2</h1>'
+    assert cache.get_stats()['rebuilds'] == 2
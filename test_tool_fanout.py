@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test fan-out retrieval: category searches only for categories in the index,
+looked up off the event loop and refreshed when the index changes.
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.executors import BoundedExecutor
+
+tool_fanout = pytest.importorskip('src.agents.tool_fanout', exc_type=ImportError)
+
+
+class InMemoryStore:
+    """The parts of VectorStore that ToolFanout uses, over a fixed document list."""
+
+    def __init__(self, categories):
+        self.categories = list(categories)
+        self.index_version = 0
+        self.lookups = []
+
+    def categories_present(self, categories):
+        self.lookups.append(threading.current_thread().name)
+        return [c for c in categories if c in self.categories]
+
+    def embed_queries(self, texts):
+        return [[float(len(text))] for text in texts]
+
+    def search_batch(self, embeddings, top_k=5, score_threshold=0.5, filter_metadata=None):
+        category = (filter_metadata or {}).get('category', 'crop')
+        return [[{'id': f"{category}-{i}", 'content': category, 'metadata': {'category': category},
+                  'similarity_score': 0.9}] for i, _ in enumerate(embeddings)]
+
+
+def test_category_lookup_runs_on_io_pool_and_follows_index_version():
+    store = InMemoryStore(['crop'])
+    fanout = tool_fanout.ToolFanout(
+        store, search_executor=BoundedExecutor('search'), io_executor=BoundedExecutor('io', max_workers=1)
+    )
+    query = "When do I dip cattle and plant maize?"  # livestock and crop
+
+    async def run():
+        results, stats = await fanout.retrieve(query)
+        assert stats['categories'] == ['crop']  # no livestock documents indexed
+        await fanout.retrieve(query)
+        assert len(store.lookups) == 1  # cached while the index is unchanged
+
+        store.categories.append('livestock')
+        store.index_version += 1
+        results, stats = await fanout.retrieve(query)
+        assert sorted(stats['categories']) == ['crop', 'livestock']
+        assert 'category_search:livestock' in stats['tools']
+
+    asyncio.run(run())
+    assert len(store.lookups) == 2
+    assert all(name.startswith('io-pool') for name in store.lookups)
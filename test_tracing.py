@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test request tracing: span trees across tasks and executor jobs, and which
+traces the slow query log writes.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.executors import BoundedExecutor
+from src.monitoring import tracing
+from src.monitoring.tracing import SlowQueryLog, Trace, enter_span, exit_span, set_attributes, span, start_trace
+
+
+def names(tree):
+    """Span names as nested (name, [children]) pairs, children sorted."""
+    return tree['name'], sorted(names(child) for child in tree.get('children', []))
+
+
+def test_spans_nest_across_gather_and_executor_jobs():
+    executor = BoundedExecutor('search', max_workers=2)
+
+    def embed():
+        with span('embed'):
+            set_attributes(dims=384)
+
+    async def search(collection):
+        with span('search', collection=collection):
+            await asyncio.sleep(0)
+            await executor.run(embed)
+
+    async def run():
+        with start_trace('POST /query', path='/query') as trace:
+            with span('retrieval'):
+                await asyncio.gather(search('docs'), search('markets'))
+            with span('generate'):
+                pass
+        return trace
+
+    try:
+        trace = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    tree = trace.to_dict()
+    assert names(tree) == ('POST /query', [
+        ('generate', []),
+        ('retrieval', [('search', [('embed', [])]), ('search', [('embed', [])])]),
+    ])
+    assert tree['attributes'] == {'path': '/query'}
+    searches = tree['children'][0]['children']
+    assert sorted(s['attributes']['collection'] for s in searches) == ['docs', 'markets']
+    assert searches[0]['children'][0]['attributes'] == {'dims': 384}
+    assert tracing._current_span.get() is None
+
+
+def test_spans_outside_a_trace_are_no_ops():
+    assert enter_span('orphan') is None
+    exit_span(None)
+    with span('orphan'):
+        set_attributes(ignored=True)
+
+
+def test_errors_are_recorded_on_the_span_and_trace():
+    with pytest.raises(ValueError):
+        with start_trace('GET /weather') as trace:
+            with span('fetch'):
+                raise ValueError("upstream down")
+    tree = trace.to_dict()
+    assert tree['error'] == 'ValueError'
+    assert tree['children'][0]['error'] == 'ValueError'
+
+
+def finished_trace(duration_ms):
+    trace = Trace('POST /query')
+    trace.root.end = trace.root.start + duration_ms / 1000
+    return trace
+
+
+class FixedRandom:
+    def __init__(self, value):
+        self.value = value
+
+    def random(self):
+        return self.value
+
+
+def test_slow_log_threshold_and_sampling(monkeypatch, tmp_path):
+    log = SlowQueryLog(path=str(tmp_path / 'slow.jsonl'), threshold_ms=100, sample_rate=0.5)
+    monkeypatch.setattr(tracing, 'random', FixedRandom(0.2))
+    assert not log.maybe_write(finished_trace(99))
+    assert log.maybe_write(finished_trace(100))  # the threshold itself counts as slow
+    monkeypatch.setattr(tracing, 'random', FixedRandom(0.5))
+    assert not log.maybe_write(finished_trace(1000))  # sampled out
+    assert log.written == 1
+    assert log.get_stats() == {'threshold_ms': 100, 'sample_rate': 0.5, 'written': 1}
+
+
+def test_slow_log_writes_one_json_record_per_line(tmp_path):
+    path = tmp_path / 'logs' / 'slow.jsonl'
+    log = SlowQueryLog(path=str(path), threshold_ms=0)
+    with start_trace('POST /query') as trace:
+        with span('retrieval', top_k=5):
+            pass
+    log.maybe_write(trace, method='POST', path='/query', status=200)
+    log.maybe_write(finished_trace(12), method='GET', path='/districts', status=304)
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 2
+    first = records[0]
+    assert list(first) == ['time', 'method', 'path', 'status', 'trace']
+    assert (first['method'], first['path'], first['status']) == ('POST', '/query', 200)
+    assert first['trace']['trace_id'] == trace.trace_id
+    assert first['trace']['name'] == 'POST /query' and first['trace']['start_ms'] == 0
+    child = first['trace']['children'][0]
+    assert child['name'] == 'retrieval' and child['attributes'] == {'top_k': 5}
+    assert set(child) == {'name', 'start_ms', 'duration_ms', 'attributes'}
+    assert records[1]['trace']['duration_ms'] == pytest.approx(12, abs=0.01)
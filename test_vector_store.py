@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test that the vector store's index version follows changes made by other
+processes, so answer and single-flight caches are invalidated everywhere.
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent))
+
+from src.agents.executors import BoundedExecutor
+
+vector_store = pytest.importorskip('src.embeddings.vector_store', exc_type=ImportError)
+VectorStore, Document = vector_store.VectorStore, vector_store.Document
+
+
+class HashingEncoder:
+    """Deterministic stand-in for a SentenceTransformer (no model download)."""
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        vectors = np.array([[(hash((t, i)) % 1000) / 1000 + 0.001 for i in range(8)] for t in ([texts] if single else texts)])
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+
+def test_index_version_follows_other_writers(tmp_path):
+    reader = VectorStore(str(tmp_path), embedding_model=HashingEncoder())
+    writer = VectorStore(str(tmp_path), embedding_model=HashingEncoder())
+    before = reader.index_version
+
+    writer.add_documents([Document("Plant maize after 25 mm of rain.", {'source': 'a.pdf'}, 'a', 0)])
+    assert writer.index_version != before  # own writes show at once
+    assert reader.index_version == before  # reading never touches the collection or the marker
+    assert reader.refresh_index_version() == writer.index_version
+    assert reader.index_version == writer.index_version
+
+
+def test_index_version_is_refreshed_in_the_background(tmp_path):
+    reader = VectorStore(str(tmp_path), embedding_model=HashingEncoder(), version_check_interval=0.01)
+    writer = VectorStore(str(tmp_path), embedding_model=HashingEncoder())
+    io = BoundedExecutor('io', max_workers=1)
+    refresh_threads = set()
+    refresh = reader.refresh_index_version
+
+    def recording_refresh():
+        refresh_threads.add(threading.current_thread().name)
+        return refresh()
+
+    reader.refresh_index_version = recording_refresh
+
+    async def run():
+        watcher = asyncio.ensure_future(reader.watch_index_version(io))
+        writer.add_documents([Document("Dip cattle weekly.", {'source': 'b.pdf'}, 'b', 0)])
+        for _ in range(200):
+            if reader.index_version == writer.index_version:
+                break
+            await asyncio.sleep(0.01)
+        watcher.cancel()
+
+    try:
+        asyncio.run(run())
+    finally:
+        io.shutdown()
+    assert reader.index_version == writer.index_version
+    assert refresh_threads and all(name.startswith('io-pool') for name in refresh_threads)